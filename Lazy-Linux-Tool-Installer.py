@@ -1,983 +1,4374 @@
-#!/usr/bin/env python3
-"""
-Lazy Linux Tool Installer
-Automatically installs all Linux tools from README.md - perfect for lazy users!
-Just run it and it handles everything: checking, installing, and organizing tools.
-"""
-
-import subprocess
-import os
-import sys
-import shutil
-import argparse
-import hashlib
-import json
-import platform
-import tempfile
-import tarfile
-from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
-from enum import Enum
-
-# Network / command timeouts (seconds). Generous defaults for slow links.
-CONNECT_TIMEOUT = 30
-DOWNLOAD_MAX_TIME = 120
-NETWORK_CMD_TIMEOUT = 180
-DEFAULT_CMD_TIMEOUT = 60
-VALIDATE_CMD_TIMEOUT = 20
-INSTALL_BIN_DIR = "/usr/local/bin"
-ELF_MAGIC = b"\x7fELF"
-# Official eget.sh checksum from upstream README (may lag script updates).
-# Prefer GitHub release binaries over the bootstrap script for this reason.
-EGET_GITHUB_REPO = "zyedidia/eget"
-
-
-class InstallMethod(Enum):
-    """Installation methods for tools."""
-    APT = "apt"
-    PIP = "pip"
-    EGET = "eget"
-    SNAP = "snap"
-    NPM = "npm"
-    BUILTIN = "builtin"  # Already available (e.g., systemctl)
-    MANUAL = "manual"  # Requires manual installation
-
-
-@dataclass
-class Tool:
-    """Tool definition with installation details."""
-    name: str
-    command: str  # Command to check if installed
-    method: InstallMethod
-    package: str  # Package name for installation
-    description: str
-    category: str
-    requires_root: bool = True
-    github_repo: Optional[str] = None  # For eget installations
-    classic: bool = False  # For snap installations
-    requires_gui: bool = False  # Whether tool requires GUI (excluded in server mode)
-
-
-class SystemChecker:
-    """Check system compatibility and requirements."""
-    
-    @staticmethod
-    def is_debian_like() -> bool:
-        """Check if system is Debian-based."""
-        return shutil.which("apt-get") is not None
-    
-    @staticmethod
-    def is_root() -> bool:
-        """Check if running as root."""
-        return os.geteuid() == 0
-    
-    @staticmethod
-    def has_command(command: str) -> bool:
-        """Check if command exists in PATH."""
-        return shutil.which(command) is not None
-    
-    @staticmethod
-    def check_system() -> Tuple[bool, Optional[str]]:
-        """Comprehensive system check."""
-        if not SystemChecker.is_debian_like():
-            return False, "This script requires a Debian-based system (Ubuntu, Debian, Linux Mint)"
-        
-        if not SystemChecker.has_command("sudo"):
-            return False, "sudo is required but not found"
-
-        if not SystemChecker.has_command("curl"):
-            return False, "curl is required but not found"
-        
-        return True, None
-
-
-class Installer:
-    """Handle tool installation with different methods."""
-    
-    @staticmethod
-    def run_command(cmd: List[str], check: bool = False, capture_output: bool = False, timeout: int = DEFAULT_CMD_TIMEOUT) -> subprocess.CompletedProcess:
-        """Run command with proper error handling and timeout."""
-        try:
-            return subprocess.run(
-                cmd,
-                check=check,
-                capture_output=capture_output,
-                text=True,
-                timeout=timeout
-            )
-        except subprocess.TimeoutExpired:
-            # Return CompletedProcess with timeout exit code (124) to avoid crashes
-            print(f"Command timed out after {timeout}s: {' '.join(cmd)}")
-            return subprocess.CompletedProcess(cmd, 124)
-        except subprocess.CalledProcessError as e:
-            # Return CompletedProcess with actual error code for consistency
-            print(f"Error running command: {' '.join(cmd)}")
-            print(f"Error: {e}")
-            return subprocess.CompletedProcess(cmd, e.returncode)
-        except FileNotFoundError:
-            # Command missing from PATH - use standard exit code 127
-            print(f"Command not found: {cmd[0]}")
-            return subprocess.CompletedProcess(cmd, 127)
-
-    @staticmethod
-    def linux_goarch() -> Optional[str]:
-        """Map platform.machine() to Go/eget arch names."""
-        machine = platform.machine().lower()
-        arch_map = {
-            "x86_64": "amd64",
-            "amd64": "amd64",
-            "aarch64": "arm64",
-            "arm64": "arm64",
-            "armv7l": "arm",
-            "armv6l": "arm",
-            "i386": "386",
-            "i686": "386",
-        }
-        return arch_map.get(machine)
-
-    @staticmethod
-    def sha256_file(path: str) -> str:
-        """Compute SHA-256 hex digest of a file."""
-        digest = hashlib.sha256()
-        with open(path, "rb") as handle:
-            for chunk in iter(lambda: handle.read(1024 * 1024), b""):
-                digest.update(chunk)
-        return digest.hexdigest()
-
-    @staticmethod
-    def download_file(url: str, dest: str, timeout: int = NETWORK_CMD_TIMEOUT) -> bool:
-        """Download URL to dest via curl (no pipe-to-shell)."""
-        result = Installer.run_command(
-            [
-                "curl",
-                "--fail",
-                "--location",
-                "--silent",
-                "--show-error",
-                "--connect-timeout", str(CONNECT_TIMEOUT),
-                "--max-time", str(DOWNLOAD_MAX_TIME),
-                "--output", dest,
-                url,
-            ],
-            capture_output=True,
-            timeout=timeout,
-        )
-        return result.returncode == 0 and os.path.isfile(dest) and os.path.getsize(dest) > 0
-
-    @staticmethod
-    def fetch_latest_release_assets(repo: str) -> Tuple[Optional[str], List[dict]]:
-        """Return (tag_name, assets) from GitHub latest release API."""
-        api_url = f"https://api.github.com/repos/{repo}/releases/latest"
-        with tempfile.NamedTemporaryFile(prefix="gh-release-", suffix=".json", delete=False) as tmp:
-            json_path = tmp.name
-        try:
-            if not Installer.download_file(api_url, json_path):
-                print(f"Failed to fetch release metadata for {repo}")
-                return None, []
-            with open(json_path, "r", encoding="utf-8") as handle:
-                data = json.load(handle)
-            return data.get("tag_name"), data.get("assets") or []
-        except (OSError, json.JSONDecodeError, TypeError) as exc:
-            print(f"Failed to parse release metadata for {repo}: {exc}")
-            return None, []
-        finally:
-            try:
-                os.unlink(json_path)
-            except OSError:
-                pass
-
-    @staticmethod
-    def is_plausible_binary(path: str) -> bool:
-        """Reject non-files and non-ELF / non-script downloads before privilege move."""
-        if not os.path.isfile(path) or os.path.getsize(path) == 0:
-            return False
-        try:
-            with open(path, "rb") as handle:
-                magic = handle.read(4)
-        except OSError:
-            return False
-        # Linux ELF binaries (typical eget/croc artifacts) or scripts with shebang
-        return magic == ELF_MAGIC or magic.startswith(b"#!")
-
-    @staticmethod
-    def install_binary_to_path(src_path: str, binary_name: str) -> bool:
-        """Validate binary, then install into /usr/local/bin."""
-        if not Installer.is_plausible_binary(src_path):
-            print(f"Refusing to install {binary_name}: failed binary sanity check")
-            return False
-        try:
-            os.chmod(src_path, 0o755)
-        except OSError as exc:
-            print(f"Could not chmod {src_path}: {exc}")
-            return False
-        dest = os.path.join(INSTALL_BIN_DIR, binary_name)
-        move_result = Installer.run_command(
-            ["sudo", "mv", src_path, dest],
-            capture_output=True,
-        )
-        if move_result.returncode != 0:
-            return False
-        return Installer.validate_installed_command(binary_name)
-
-    @staticmethod
-    def validate_installed_command(command: str) -> bool:
-        """Confirm command is on PATH and responds to a version/help probe."""
-        if not SystemChecker.has_command(command):
-            # PATH may not include INSTALL_BIN_DIR in this process yet
-            candidate = os.path.join(INSTALL_BIN_DIR, command)
-            if not os.path.isfile(candidate):
-                print(f"Post-install check failed: {command} not found in PATH")
-                return False
-            invoke = candidate
-        else:
-            invoke = command
-
-        for flag in ("--version", "-V", "-v", "version", "--help", "-h"):
-            result = Installer.run_command(
-                [invoke, flag],
-                capture_output=True,
-                timeout=VALIDATE_CMD_TIMEOUT,
-            )
-            if result.returncode == 124:
-                continue
-            output = ((result.stdout or "") + (result.stderr or "")).strip()
-            # Accept success, or help/version text even when exit code is non-zero
-            if result.returncode == 0 or (output and result.returncode in (0, 1, 2)):
-                print(f"  ✓ Verified {command} responds to '{flag}'")
-                return True
-
-        print(f"Post-install check failed: {command} did not respond to version/help probes")
-        return False
-
-    @staticmethod
-    def verify_checksum(path: str, expected_hex: str) -> bool:
-        """Compare file SHA-256 to expected hex digest."""
-        expected = expected_hex.strip().lower()
-        actual = Installer.sha256_file(path).lower()
-        if actual != expected:
-            print(f"Checksum mismatch for {path}")
-            print(f"  expected: {expected}")
-            print(f"  actual:   {actual}")
-            return False
-        return True
-
-    @staticmethod
-    def parse_checksums_file(content: str) -> Dict[str, str]:
-        """Parse 'hash  filename' lines into {basename: hash}."""
-        mapping: Dict[str, str] = {}
-        for line in content.splitlines():
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            parts = line.split()
-            if len(parts) < 2:
-                continue
-            digest, name = parts[0], parts[-1]
-            # Allow "hash *filename" (binary mode marker)
-            name = name.lstrip("*")
-            mapping[os.path.basename(name)] = digest
-        return mapping
-    
-    @staticmethod
-    def install_via_apt(package: str) -> bool:
-        """Install package via apt-get."""
-        print(f"Installing {package} via apt...")
-        result = Installer.run_command(
-            ["sudo", "apt-get", "install", "-y", package],
-            capture_output=True,
-            timeout=NETWORK_CMD_TIMEOUT,
-        )
-        return result.returncode == 0
-    
-    @staticmethod
-    def install_via_pip(package: str) -> bool:
-        """Install package via pip3."""
-        print(f"Installing {package} via pip3...")
-        result = Installer.run_command(
-            ["pip3", "install", "--user", package],
-            capture_output=True,
-            timeout=NETWORK_CMD_TIMEOUT,
-        )
-        return result.returncode == 0
-    
-    @staticmethod
-    def install_via_npm(package: str) -> bool:
-        """Install a global npm package, pulling in npm itself if it is absent.
-
-        Node is not part of a base Debian install, so the one tool that ships
-        this way would otherwise fail on a clean machine with a bare
-        "npm: not found".
-        """
-        if not SystemChecker.has_command("npm"):
-            print("npm not found, installing npm first...")
-            if not Installer.install_via_apt("npm"):
-                print("Could not install npm")
-                return False
-        print(f"Installing {package} via npm...")
-        result = Installer.run_command(
-            ["sudo", "npm", "install", "-g", package],
-            capture_output=True,
-            timeout=NETWORK_CMD_TIMEOUT,
-        )
-        return result.returncode == 0
-
-    @staticmethod
-    def install_via_snap(package: str, classic: bool = False) -> bool:
-        """Install package via snap."""
-        print(f"Installing {package} via snap...")
-        cmd = ["sudo", "snap", "install"]
-        if classic:
-            cmd.append("--classic")
-        cmd.append(package)
-        result = Installer.run_command(cmd, capture_output=True, timeout=NETWORK_CMD_TIMEOUT)
-        return result.returncode == 0
-    
-    @staticmethod
-    def install_via_eget(repo: str, binary_name: str) -> bool:
-        """Install package via eget from GitHub (eget verifies release checksums when present)."""
-        if not SystemChecker.has_command("eget"):
-            print("eget not found, installing eget first...")
-            if not Installer.install_eget():
-                return False
-        
-        print(f"Installing {binary_name} via eget from {repo}...")
-        result = Installer.run_command(
-            ["eget", repo],
-            capture_output=True,
-            timeout=NETWORK_CMD_TIMEOUT,
-        )
-        
-        if result.returncode == 0 and os.path.exists(binary_name):
-            return Installer.install_binary_to_path(binary_name, binary_name)
-        print(f"eget did not produce expected binary '{binary_name}'")
-        return False
-    
-    @staticmethod
-    def install_eget() -> bool:
-        """Install eget from GitHub release binary (no curl|sh)."""
-        print("Installing eget from GitHub releases (verified download, no curl|sh)...")
-        arch = Installer.linux_goarch()
-        if not arch:
-            print(f"Unsupported architecture for eget: {platform.machine()}")
-            return False
-
-        tag, assets = Installer.fetch_latest_release_assets(EGET_GITHUB_REPO)
-        if not tag or not assets:
-            return False
-
-        version = tag.lstrip("v")
-        asset_name = f"eget-{version}-linux_{arch}.tar.gz"
-        asset = next((a for a in assets if a.get("name") == asset_name), None)
-        if not asset or not asset.get("browser_download_url"):
-            print(f"No eget release asset named {asset_name}")
-            return False
-
-        with tempfile.TemporaryDirectory(prefix="eget-install-") as tmpdir:
-            archive_path = os.path.join(tmpdir, asset_name)
-            if not Installer.download_file(asset["browser_download_url"], archive_path):
-                print("Failed to download eget archive")
-                return False
-
-            # Optional per-asset checksum if upstream publishes one
-            checksum_asset = next(
-                (
-                    a for a in assets
-                    if a.get("name") in (f"{asset_name}.sha256", f"{asset_name}.sha256sum")
-                ),
-                None,
-            )
-            if checksum_asset and checksum_asset.get("browser_download_url"):
-                checksum_path = os.path.join(tmpdir, checksum_asset["name"])
-                if Installer.download_file(checksum_asset["browser_download_url"], checksum_path):
-                    try:
-                        with open(checksum_path, "r", encoding="utf-8") as handle:
-                            expected = handle.read().split()[0]
-                    except (OSError, IndexError):
-                        print("Could not read eget checksum file")
-                        return False
-                    if not Installer.verify_checksum(archive_path, expected):
-                        return False
-                else:
-                    print("Warning: could not download eget checksum; continuing with binary checks")
-
-            try:
-                with tarfile.open(archive_path, "r:gz") as tar:
-                    # Find member named 'eget' (may be nested under a directory)
-                    member = next(
-                        (m for m in tar.getmembers() if Path(m.name).name == "eget" and m.isfile()),
-                        None,
-                    )
-                    if member is None:
-                        print("eget binary not found inside release archive")
-                        return False
-                    Installer._safe_tar_extract(tar, member, tmpdir)
-                    extracted = os.path.join(tmpdir, member.name)
-            except (tarfile.TarError, OSError) as exc:
-                print(f"Failed to extract eget archive: {exc}")
-                return False
-
-            # Copy out of tempdir before it is deleted (install moves the file)
-            staged = os.path.join(os.getcwd(), "eget")
-            try:
-                shutil.copy2(extracted, staged)
-            except OSError as exc:
-                print(f"Failed to stage eget binary: {exc}")
-                return False
-
-            return Installer.install_binary_to_path(staged, "eget")
-
-    @staticmethod
-    def _safe_tar_extract(tar: tarfile.TarFile, member: tarfile.TarInfo, dest_dir: str) -> None:
-        """Extract one member; use data filter on Python 3.12+ to block path traversal."""
-        try:
-            tar.extract(member, path=dest_dir, filter="data")
-        except TypeError:
-            # Python < 3.12 has no filter= kwarg
-            if os.path.isabs(member.name) or ".." in Path(member.name).parts:
-                raise tarfile.TarError(f"Refusing unsafe tar member path: {member.name}")
-            tar.extract(member, path=dest_dir)
-    
-    @staticmethod
-    def install_croc() -> bool:
-        """Install croc from GitHub releases with checksum verification (no curl|bash)."""
-        print("Installing croc from GitHub releases with checksum verification...")
-        arch = Installer.linux_goarch()
-        if not arch:
-            print(f"Unsupported architecture for croc: {platform.machine()}")
-            return False
-
-        # croc asset naming uses 64bit/ARM64 style labels
-        arch_to_croc = {
-            "amd64": "64bit",
-            "386": "32bit",
-            "arm64": "ARM64",
-            "arm": "ARM",
-        }
-        croc_arch = arch_to_croc.get(arch)
-        if not croc_arch:
-            print(f"No croc asset mapping for arch {arch}")
-            return False
-
-        tag, assets = Installer.fetch_latest_release_assets("schollz/croc")
-        if not tag or not assets:
-            return False
-
-        asset_name = f"croc_{tag}_Linux-{croc_arch}.tar.gz"
-        checksum_name = f"croc_{tag}_checksums.txt"
-        asset = next((a for a in assets if a.get("name") == asset_name), None)
-        checksum_asset = next((a for a in assets if a.get("name") == checksum_name), None)
-        if not asset or not asset.get("browser_download_url"):
-            print(f"No croc release asset named {asset_name}")
-            return False
-        if not checksum_asset or not checksum_asset.get("browser_download_url"):
-            print(f"No croc checksum file {checksum_name}; refusing unsigned install")
-            return False
-
-        with tempfile.TemporaryDirectory(prefix="croc-install-") as tmpdir:
-            archive_path = os.path.join(tmpdir, asset_name)
-            checksum_path = os.path.join(tmpdir, checksum_name)
-            if not Installer.download_file(asset["browser_download_url"], archive_path):
-                print("Failed to download croc archive")
-                return False
-            if not Installer.download_file(checksum_asset["browser_download_url"], checksum_path):
-                print("Failed to download croc checksums")
-                return False
-
-            try:
-                with open(checksum_path, "r", encoding="utf-8") as handle:
-                    checksums = Installer.parse_checksums_file(handle.read())
-            except OSError as exc:
-                print(f"Failed to read croc checksums: {exc}")
-                return False
-
-            expected = checksums.get(asset_name)
-            if not expected:
-                print(f"Checksum entry missing for {asset_name}")
-                return False
-            if not Installer.verify_checksum(archive_path, expected):
-                return False
-
-            try:
-                with tarfile.open(archive_path, "r:gz") as tar:
-                    member = next(
-                        (m for m in tar.getmembers() if Path(m.name).name == "croc" and m.isfile()),
-                        None,
-                    )
-                    if member is None:
-                        print("croc binary not found inside release archive")
-                        return False
-                    Installer._safe_tar_extract(tar, member, tmpdir)
-                    extracted = os.path.join(tmpdir, member.name)
-            except (tarfile.TarError, OSError) as exc:
-                print(f"Failed to extract croc archive: {exc}")
-                return False
-
-            staged = os.path.join(os.getcwd(), "croc")
-            try:
-                shutil.copy2(extracted, staged)
-            except OSError as exc:
-                print(f"Failed to stage croc binary: {exc}")
-                return False
-
-            return Installer.install_binary_to_path(staged, "croc")
-    
-    @staticmethod
-    def check_apt_available(package: str) -> bool:
-        """Check if package is available in apt repositories."""
-        # Regex anchors (^$) ensure exact match, not substring
-        result = Installer.run_command(
-            ["apt-cache", "search", "--names-only", "^" + package + "$"],
-            capture_output=True
-        )
-        return result.returncode == 0 and package in result.stdout
-
-
-class ToolManager:
-    """Manage tool definitions and installation."""
-    
-    # Define all tools from README.md
-    TOOLS: Dict[str, Tool] = {
-        # Desktop GUI Apps
-        "geany": Tool("geany", "geany", InstallMethod.APT, "geany",
-                     "GUI editor like notepad++", "Desktop GUI Apps", requires_gui=True),
-        "wireshark": Tool("wireshark", "wireshark", InstallMethod.APT, "wireshark",
-                         "Network packet reviewer", "Desktop GUI Apps", requires_gui=True),
-        "code": Tool("code", "code", InstallMethod.SNAP, "code",
-                    "Visual Studio Code", "Desktop GUI Apps", classic=True, requires_gui=True),
-        "guake": Tool("guake", "guake", InstallMethod.APT, "guake",
-                     "GUI terminal client", "Desktop GUI Apps", requires_gui=True),
-        "tabby": Tool("tabby", "tabby", InstallMethod.EGET, "tabby",
-                     "Modern terminal emulator", "Desktop GUI Apps",
-                     github_repo="Eugeny/tabby", requires_gui=True),
-        
-        # Terminal File Explorers
-        "xplr": Tool("xplr", "xplr", InstallMethod.EGET, "xplr",
-                    "Very graphical file explorer", "Terminal File Explorers",
-                    github_repo="sayanarijit/xplr"),
-        "nnn": Tool("nnn", "nnn", InstallMethod.APT, "nnn",
-                   "Efficient file explorer", "Terminal File Explorers"),
-        "lf": Tool("lf", "lf", InstallMethod.EGET, "lf",
-                  "Cross-platform file explorer", "Terminal File Explorers",
-                  github_repo="gokcehan/lf"),
-        
-        # LS-like Directory Viewers
-        "eza": Tool("eza", "eza", InstallMethod.EGET, "eza",
-                   "Modern ls replacement (exa successor)", "LS-like Directory Viewers",
-                   github_repo="eza-community/eza"),
-        "lsd": Tool("lsd", "lsd", InstallMethod.EGET, "lsd",
-                   "ls clone with icons", "LS-like Directory Viewers",
-                   github_repo="lsd-rs/lsd"),
-        
-        # Text Editors and Viewers
-        "micro": Tool("micro", "micro", InstallMethod.EGET, "micro",
-                     "User-friendly terminal editor", "Text Editors and Viewers",
-                     github_repo="micro-editor/micro"),
-        "ne": Tool("ne", "ne", InstallMethod.APT, "ne",
-                  "Terminal editor like nano", "Text Editors and Viewers"),
-        "vim": Tool("vim", "vim", InstallMethod.APT, "vim",
-                   "VI editor with extras", "Text Editors and Viewers"),
-        "nvim": Tool("nvim", "nvim", InstallMethod.APT, "neovim",
-                    "Modern vim alternative", "Text Editors and Viewers"),
-        "bat": Tool("bat", "batcat", InstallMethod.APT, "bat",
-                   "cat clone with syntax highlighting", "Text Editors and Viewers"),
-        
-        # Process Explorers
-        "glances": Tool("glances", "glances", InstallMethod.PIP, "glances",
-                       "System info in one glance", "Process Explorers"),
-        "htop": Tool("htop", "htop", InstallMethod.APT, "htop",
-                    "Supercharged top clone", "Process Explorers"),
-        "btop": Tool("btop", "btop", InstallMethod.EGET, "btop",
-                    "TUI CLI graphics process monitor", "Process Explorers",
-                    github_repo="aristocratos/btop"),
-        "bottom": Tool("bottom", "btm", InstallMethod.EGET, "btm",
-                      "btop-inspired process monitor", "Process Explorers",
-                      github_repo="ClementTsang/bottom"),
-        
-        # Network-Related Apps
-        "croc": Tool("croc", "croc", InstallMethod.MANUAL, "croc",
-                    "Secure file transfer", "Network-Related Apps"),
-        "network-manager": Tool("nmtui", "nmtui", InstallMethod.APT, "network-manager",
-                               "Terminal Network Manager", "Network-Related Apps"),
-        "hping3": Tool("hping3", "hping3", InstallMethod.APT, "hping3",
-                      "Advanced ping tool", "Network-Related Apps"),
-        "nmap": Tool("nmap", "nmap", InstallMethod.APT, "nmap",
-                    "Network scanner", "Network-Related Apps"),
-        "bmon": Tool("bmon", "bmon", InstallMethod.APT, "bmon",
-                    "TUI network bandwidth monitor", "Network-Related Apps"),
-        "mtr": Tool("mtr", "mtr", InstallMethod.APT, "mtr-tiny",
-                   "Traceroute and ping combined", "Network-Related Apps"),
-        "gping": Tool("gping", "gping", InstallMethod.EGET, "gping",
-                     "Ping with graph", "Network-Related Apps",
-                     github_repo="orf/gping"),
-        "doggo": Tool("doggo", "doggo", InstallMethod.EGET, "doggo",
-                   "Modern dig alternative (dog successor)", "Network-Related Apps",
-                   github_repo="mr-karan/doggo"),
-        # Published on npm, not as a GitHub release binary: the project is
-        # TypeScript and has never attached an asset to any of its releases.
-        "neoss": Tool("neoss", "neoss", InstallMethod.NPM, "neoss",
-                     "Modern ss alternative", "Network-Related Apps"),
-        
-        # Misc CLI Terminal Apps
-        "systemctl": Tool("systemctl", "systemctl", InstallMethod.BUILTIN, "systemd",
-                         "Built-in systemd service manager", "Misc CLI Terminal Apps",
-                         requires_root=False),
-        "ncdu": Tool("ncdu", "ncdu", InstallMethod.APT, "ncdu",
-                    "Terminal disk space viewer", "Misc CLI Terminal Apps"),
-        "dust": Tool("dust", "dust", InstallMethod.EGET, "dust",
-                    "Intuitive du with bar charts", "Misc CLI Terminal Apps",
-                    github_repo="bootandy/dust"),
-        "duf": Tool("duf", "duf", InstallMethod.EGET, "duf",
-                   "Disk utility with graphs", "Misc CLI Terminal Apps",
-                   github_repo="muesli/duf"),
-        "lynis": Tool("lynis", "lynis", InstallMethod.APT, "lynis",
-                     "Linux security auditing", "Misc CLI Terminal Apps"),
-        "apt-show-versions": Tool("apt-show-versions", "apt-show-versions",
-                                 InstallMethod.APT, "apt-show-versions",
-                                 "Show package versions", "Misc CLI Terminal Apps"),
-        "nala": Tool("nala", "nala", InstallMethod.APT, "nala",
-                    "User-friendly apt frontend", "Misc CLI Terminal Apps"),
-        "fd": Tool("fd", "fdfind", InstallMethod.APT, "fd-find",
-                  "Fast find alternative", "Misc CLI Terminal Apps"),
-        "fish": Tool("fish", "fish", InstallMethod.APT, "fish",
-                    "Friendly interactive shell", "Misc CLI Terminal Apps"),
-        "starship": Tool("starship", "starship", InstallMethod.EGET, "starship",
-                        "Customizable shell prompt", "Misc CLI Terminal Apps",
-                        github_repo="starship/starship"),
-        "zoxide": Tool("zoxide", "zoxide", InstallMethod.EGET, "zoxide",
-                      "Smarter cd command", "Misc CLI Terminal Apps",
-                      github_repo="ajeetdsouza/zoxide"),
-        "atuin": Tool("atuin", "atuin", InstallMethod.EGET, "atuin",
-                     "Magical shell history", "Misc CLI Terminal Apps",
-                     github_repo="atuinsh/atuin"),
-        "tig": Tool("tig", "tig", InstallMethod.APT, "tig",
-                   "TUI git client", "Misc CLI Terminal Apps"),
-        "lazygit": Tool("lazygit", "lazygit", InstallMethod.EGET, "lazygit",
-                       "Simple terminal UI for git", "Misc CLI Terminal Apps",
-                       github_repo="jesseduffield/lazygit"),
-        "delta": Tool("delta", "delta", InstallMethod.EGET, "delta",
-                     "Syntax-highlighting git pager", "Misc CLI Terminal Apps",
-                     github_repo="dandavison/delta"),
-        "miller": Tool("miller", "mlr", InstallMethod.APT, "miller",
-                     "JSON/CSV processor", "Misc CLI Terminal Apps"),
-        "most": Tool("most", "most", InstallMethod.APT, "most",
-                    "Better pager than less/more", "Misc CLI Terminal Apps"),
-        "tldr": Tool("tldr", "tldr", InstallMethod.PIP, "tldr",
-                    "Simplified man pages", "Misc CLI Terminal Apps"),
-        "lazydocker": Tool("lazydocker", "lazydocker", InstallMethod.EGET, "lazydocker",
-                         "TUI Docker manager", "Misc CLI Terminal Apps",
-                         github_repo="jesseduffield/lazydocker"),
-        "json-tui": Tool("json-tui", "json-tui", InstallMethod.EGET, "json-tui",
-                        "JSON file viewer", "Misc CLI Terminal Apps",
-                        github_repo="ArthurSonzogni/json-tui"),
-        "jc": Tool("jc", "jc", InstallMethod.APT, "jc",
-                  "Parse command output to JSON", "Misc CLI Terminal Apps"),
-        "visidata": Tool("visidata", "visidata", InstallMethod.PIP, "visidata",
-                        "CSV/data viewer", "Misc CLI Terminal Apps"),
-        # Distributed on PyPI; the GitHub project cuts no releases at all.
-        "eg": Tool("eg", "eg", InstallMethod.PIP, "eg",
-                  "TLDR-like command helper", "Misc CLI Terminal Apps"),
-        "procs": Tool("procs", "procs", InstallMethod.EGET, "procs",
-                     "Modern ps replacement", "Misc CLI Terminal Apps",
-                     github_repo="dalance/procs"),
-        "sd": Tool("sd", "sd", InstallMethod.EGET, "sd",
-                  "Modern sed replacement", "Misc CLI Terminal Apps",
-                  github_repo="chmln/sd"),
-        "ripgrep": Tool("ripgrep", "rg", InstallMethod.APT, "ripgrep",
-                       "Fast text search tool", "Misc CLI Terminal Apps"),
-        "ripgrep-all": Tool("ripgrep-all", "rga", InstallMethod.EGET, "rga",
-                           "ripgrep for all file types", "Misc CLI Terminal Apps",
-                           github_repo="phiresky/ripgrep-all"),
-        "fzf": Tool("fzf", "fzf", InstallMethod.APT, "fzf",
-                   "Command-line fuzzy finder", "Misc CLI Terminal Apps"),
-        "fastfetch": Tool("fastfetch", "fastfetch", InstallMethod.EGET, "fastfetch",
-                         "System info display", "Misc CLI Terminal Apps",
-                         github_repo="fastfetch-cli/fastfetch"),
-        "pandoc": Tool("pandoc", "pandoc", InstallMethod.APT, "pandoc",
-                      "Document converter", "Misc CLI Terminal Apps"),
-        "hyperfine": Tool("hyperfine", "hyperfine", InstallMethod.EGET, "hyperfine",
-                         "Command benchmarking tool", "Misc CLI Terminal Apps",
-                         github_repo="sharkdp/hyperfine"),
-        "just": Tool("just", "just", InstallMethod.EGET, "just",
-                    "Command runner (make alternative)", "Misc CLI Terminal Apps",
-                    github_repo="casey/just"),
-    }
-    
-    @staticmethod
-    def get_tools_by_category(server_mode: bool = False) -> Dict[str, List[Tool]]:
-        """Group tools by category, optionally filtering out GUI tools for server mode."""
-        categories: Dict[str, List[Tool]] = {}
-        for tool in ToolManager.TOOLS.values():
-            # Skip GUI tools in server mode
-            if server_mode and tool.requires_gui:
-                continue
-            if tool.category not in categories:
-                categories[tool.category] = []
-            categories[tool.category].append(tool)
-        return categories
-    
-    @staticmethod
-    def check_tool_installed(tool: Tool) -> bool:
-        """Check if tool is installed."""
-        return SystemChecker.has_command(tool.command)
-    
-    @staticmethod
-    def install_tool(tool: Tool, dry_run: bool = False) -> bool:
-        """Install a tool using its defined method."""
-        if tool.method == InstallMethod.BUILTIN:
-            print(f"✓ {tool.name} is built-in (no installation needed)")
-            return True
-        
-        if dry_run:
-            # In dry-run mode, just show what would be done
-            if tool.method == InstallMethod.APT:
-                print(f"[DRY RUN] Would install {tool.package} via apt")
-            elif tool.method == InstallMethod.PIP:
-                print(f"[DRY RUN] Would install {tool.package} via pip3")
-            elif tool.method == InstallMethod.SNAP:
-                classic_str = " (classic)" if tool.classic else ""
-                print(f"[DRY RUN] Would install {tool.package} via snap{classic_str}")
-            elif tool.method == InstallMethod.NPM:
-                print(f"[DRY RUN] Would install {tool.package} via npm")
-            elif tool.method == InstallMethod.EGET:
-                print(f"[DRY RUN] Would install {tool.command} via eget from {tool.github_repo}")
-            elif tool.method == InstallMethod.MANUAL:
-                print(f"[DRY RUN] Would install {tool.name} manually")
-            return True  # Pretend success in dry-run mode
-
-        ok = False
-        if tool.method == InstallMethod.APT:
-            if Installer.check_apt_available(tool.package):
-                ok = Installer.install_via_apt(tool.package)
-            else:
-                print(f"⚠ {tool.name} not available in apt repositories")
-                return False
-        
-        elif tool.method == InstallMethod.PIP:
-            ok = Installer.install_via_pip(tool.package)
-        
-        elif tool.method == InstallMethod.SNAP:
-            ok = Installer.install_via_snap(tool.package, classic=tool.classic)
-
-        elif tool.method == InstallMethod.NPM:
-            ok = Installer.install_via_npm(tool.package)
-        
-        elif tool.method == InstallMethod.EGET:
-            if tool.github_repo:
-                # install_via_eget already validates the binary post-install
-                return Installer.install_via_eget(tool.github_repo, tool.command)
-            print(f"⚠ {tool.name} missing GitHub repository information")
-            return False
-        
-        elif tool.method == InstallMethod.MANUAL:
-            if tool.name == "croc":
-                # install_croc already validates the binary post-install
-                return Installer.install_croc()
-            print(f"⚠ {tool.name} requires manual installation")
-            return False
-        
-        else:
-            return False
-
-        if not ok:
-            return False
-        # Package managers already verify packages; only soft-check PATH visibility.
-        # Hard version probes belong to binary installs (eget/croc) via install_binary_to_path.
-        if SystemChecker.has_command(tool.command):
-            print(f"  ✓ {tool.command} is available in PATH")
-        else:
-            print(f"  ⚠ {tool.command} not yet visible in PATH (may need a new shell session)")
-        return True
-
-
-def get_user_consent(server_mode: bool = False, dry_run: bool = False) -> bool:
-    """Get user consent once upfront - simple and clear for lazy users."""
-    print("\n" + "="*70)
-    print("🚀 Lazy Linux Tool Installer")
-    print("="*70)
-    
-    mode_info = []
-    if server_mode:
-        mode_info.append("🔧 SERVER MODE (CLI tools only, no GUI)")
-    if dry_run:
-        mode_info.append("👀 DRY RUN (preview only, no changes)")
-    
-    if mode_info:
-        print("\n" + " | ".join(mode_info))
-    
-    print("\nThis script will automatically install all Linux tools from README.md")
-    print("Perfect for lazy users - just say 'yes' and it handles everything!")
-    print("\nWhat it does:")
-    print("  ✓ Checks which tools you already have")
-    if dry_run:
-        print("  👀 Shows what would be installed (DRY RUN - no changes)")
-    else:
-        print("  ✓ Installs missing tools automatically (apt, pip, eget, snap, npm)")
-    print("  ✓ Skips tools that are already installed")
-    print("  ✓ Organizes everything by category")
-    if server_mode:
-        print("  🔧 Excludes GUI tools (server-friendly)")
-    if not dry_run:
-        print("\nYou'll be prompted for your sudo password when needed.")
-    print("="*70)
-    
-    # Limit retries to prevent infinite loops on invalid input
-    max_attempts = 5
-    attempts = 0
-    
-    while attempts < max_attempts:
-        try:
-            response = input("\nDo you want to proceed? [y/N]: ").strip().lower()
-            if response in ('y', 'yes'):
-                return True
-            elif response in ('n', 'no', ''):
-                return False
-            else:
-                attempts += 1
-                if attempts < max_attempts:
-                    print("Please enter 'y' for yes or 'n' for no")
-                else:
-                    print("Maximum attempts reached. Defaulting to 'no'.")
-                    return False
-        except (EOFError, KeyboardInterrupt):
-            # Handle Ctrl+C and EOF gracefully without crashing
-            print("\n\nInterrupted by user. Exiting.")
-            return False
-    
-    return False
-
-
-def update_package_lists(dry_run: bool = False) -> bool:
-    """Update apt package lists."""
-    if dry_run:
-        print("\n[DRY RUN] Would update package lists (apt-get update)")
-        return True
-    print("\nUpdating package lists...")
-    result = Installer.run_command(
-        ["sudo", "apt-get", "update"],
-        capture_output=True,
-        timeout=NETWORK_CMD_TIMEOUT,
-    )
-    return result.returncode == 0
-
-
-def parse_arguments() -> argparse.Namespace:
-    """Parse command-line arguments."""
-    parser = argparse.ArgumentParser(
-        description="Lazy Linux Tool Installer - Automatically install Linux tools from README.md",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  %(prog)s                    # Install all tools (default)
-  %(prog)s --server           # Install only CLI tools (no GUI)
-  %(prog)s --dry-run          # Preview what would be installed
-  %(prog)s --server --dry-run # Preview server installation
-        """
-    )
-    parser.add_argument(
-        "--server",
-        action="store_true",
-        help="Server/minimal mode: only install CLI tools (exclude GUI applications)"
-    )
-    parser.add_argument(
-        "--dry-run",
-        "-n",
-        action="store_true",
-        help="Dry run mode: show what would be installed without making changes"
-    )
-    return parser.parse_args()
-
-
-def main():
-    """Main execution function."""
-    # Parse command-line arguments
-    args = parse_arguments()
-    server_mode = args.server
-    dry_run = args.dry_run
-    
-    # System check
-    is_compatible, error_msg = SystemChecker.check_system()
-    if not is_compatible:
-        print(f"Error: {error_msg}", file=sys.stderr)
-        sys.exit(1)
-    
-    # Get user consent
-    if not get_user_consent(server_mode=server_mode, dry_run=dry_run):
-        print("\nInstallation cancelled by user.")
-        sys.exit(0)
-    
-    # Update package lists
-    update_package_lists(dry_run=dry_run)
-    
-    # Get tools by category for better organization
-    tools_by_category = ToolManager.get_tools_by_category(server_mode=server_mode)
-    
-    # Track installation results
-    installed_count = 0
-    skipped_count = 0
-    failed_count = 0
-    
-    print("\n" + "="*70)
-    if dry_run:
-        print("👀 DRY RUN: Previewing what would be installed...")
-    else:
-        print("🔍 Checking and installing tools...")
-    print("="*70 + "\n")
-    
-    # Process tools by category
-    for category, tools in tools_by_category.items():
-        print(f"\n📦 [{category}]")
-        print("-" * 70)
-        
-        # Sort alphabetically for consistent output
-        for tool in sorted(tools, key=lambda t: t.name):
-            if ToolManager.check_tool_installed(tool):
-                print(f"✓ {tool.name:30} - Already installed")
-                skipped_count += 1
-            else:
-                print(f"✗ {tool.name:30} - Not installed, {'would install' if dry_run else 'installing'}...")
-                if ToolManager.install_tool(tool, dry_run=dry_run):
-                    if dry_run:
-                        print(f"  ✓ {tool.name} would be installed successfully")
-                    else:
-                        print(f"  ✓ {tool.name} installed successfully")
-                    installed_count += 1
-                else:
-                    print(f"  ✗ {tool.name} installation failed")
-                    failed_count += 1
-    
-    # Summary - clear and friendly for lazy users
-    print("\n" + "="*70)
-    if dry_run:
-        print("👀 DRY RUN Complete!")
-    else:
-        print("✨ Installation Complete!")
-    print("="*70)
-    print(f"✓ Already installed: {skipped_count}")
-    if dry_run:
-        print(f"👀 Would install:      {installed_count}")
-    else:
-        print(f"✓ Newly installed:   {installed_count}")
-    if failed_count > 0:
-        print(f"⚠ Failed:            {failed_count}")
-    else:
-        print(f"✓ Failed:            {failed_count}")
-    print("="*70)
-    
-    if dry_run:
-        print("\n👀 This was a DRY RUN - no changes were made.")
-        print("   Run without --dry-run to actually install the tools.")
-    elif failed_count > 0:
-        print("\n⚠ Some tools failed to install. Check the output above for details.")
-        print("   Some tools may require manual installation or different methods.")
-    else:
-        print("\n🎉 All tools installed successfully! You're all set!")
-    
-    print("\n💡 Tip: You can run this script again anytime to check for updates.")
-    if not dry_run:
-        input("\nPress Enter to exit...")
-    sys.exit(0)
-
-
-if __name__ == "__main__":
-    main()
+#!/usr/bin/env python3
+"""
+Lazy Linux Tool Installer
+Automatically installs all Linux tools from README.md - perfect for lazy users!
+Just run it and it handles everything: checking, installing, and organizing tools.
+"""
+
+import os
+import re
+import sys
+import time
+import zlib
+import abc
+import contextlib
+import functools
+import io
+import signal
+import stat
+import struct
+import threading
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from enum import Enum
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows, where the test suite still imports this module
+    fcntl = None
+
+
+class _LazyModule:
+    """Module stand-in that imports the real module on first attribute access.
+
+    Keeps import and fast paths such as --check from paying for http.client,
+    ssl, subprocess and friends. Attribute writes go to the real module, so
+    patching through the stand-in works as usual.
+    """
+
+    def __init__(self, name: str, *submodules: str):
+        object.__setattr__(self, "_names", (name,) + submodules)
+
+    def _load(self):
+        for name in self._names:
+            __import__(name)
+        return sys.modules[self._names[0]]
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(self._load(), attr)
+
+
+argparse = _LazyModule("argparse")
+concurrent = _LazyModule("concurrent", "concurrent.futures")
+hashlib = _LazyModule("hashlib")
+http = _LazyModule("http", "http.client")
+importlib = _LazyModule("importlib", "importlib.util")
+json = _LazyModule("json")
+lzma = _LazyModule("lzma")
+pathlib = _LazyModule("pathlib")
+platform = _LazyModule("platform")
+random = _LazyModule("random")
+shlex = _LazyModule("shlex")
+shutil = _LazyModule("shutil")
+ssl = _LazyModule("ssl")
+subprocess = _LazyModule("subprocess")
+tarfile = _LazyModule("tarfile")
+tempfile = _LazyModule("tempfile")
+urllib = _LazyModule("urllib", "urllib.parse")
+zipfile = _LazyModule("zipfile")
+cProfile = _LazyModule("cProfile")
+pstats = _LazyModule("pstats")
+
+# Longest command line / stderr tail kept in a --trace span.
+TRACE_ARG_MAX = 300
+
+# --metrics-file: metric name prefix and histogram buckets (seconds) for
+# install, download and probe latency
+METRICS_PREFIX = "lazy_tools"
+METRICS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+# System-wide record of what this installer put on the host (or found there),
+# so a rerun on a converged host needs a stat per tool and nothing else.
+STATE_DIR = "/var/lib/lazy-linux-tools"
+STATE_FORMAT = 1
+
+# Network / command timeouts (seconds). Generous defaults for slow links.
+CONNECT_TIMEOUT = 30
+DOWNLOAD_MAX_TIME = 120  # Per attempt: a slow transfer that runs out resumes on the next one
+# Dropped connections, cut-off bodies and these statuses are retried up to
+# DOWNLOAD_RETRIES times, after a random wait of up to DOWNLOAD_BACKOFF * 2**n
+# seconds (capped at DOWNLOAD_BACKOFF_MAX). A cut-off body continues with a
+# Range request rather than starting over.
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_BACKOFF = 1.0
+DOWNLOAD_BACKOFF_MAX = 30.0
+DOWNLOAD_RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+# Transfers DownloadManager.fetch_many runs at once (per host it reuses keep-alive connections).
+DOWNLOAD_PARALLELISM = 4
+HTTP_MAX_REDIRECTS = 5
+HTTP_USER_AGENT = "Lazy-Linux-Tool-Installer"
+NETWORK_CMD_TIMEOUT = 180
+# Parallel installs refresh sudo's cached credentials this often (its default timeout is 15 min).
+SUDO_REFRESH_INTERVAL = 60
+DEFAULT_CMD_TIMEOUT = 60
+VALIDATE_CMD_TIMEOUT = 20
+# Post-install probes, in order of preference when nothing has been learned yet.
+PROBE_FLAGS = ("--version", "-V", "-v", "version", "--help", "-h")
+# Upper bound for one batched apt-get transaction (scales per package below this).
+APT_BATCH_MAX_TIMEOUT = 1800
+# apt-get update is skipped when the newest package index is younger than this.
+APT_LISTS_MAX_AGE = 6 * 60 * 60
+APT_LISTS_DIR = "/var/lib/apt/lists"
+DPKG_STATUS_PATH = "/var/lib/dpkg/status"
+INSTALL_BIN_DIR = "/usr/local/bin"
+# Parallel install jobs (--jobs). apt/dpkg and snap still run one command at a time.
+DEFAULT_JOBS = 4
+# Programs that take a system-wide lock -> the backend lock run_command holds for them.
+SERIAL_COMMANDS = {"apt-get": "apt", "apt": "apt", "dpkg": "apt", "snap": "snap"}
+# PathIndex trusts its directory listings for this long before re-checking mtimes.
+PATH_INDEX_RECHECK = 1.0
+# Directory mtimes come from a coarse clock: a listing this recent may predate a same-tick change
+PATH_INDEX_RACY_WINDOW = 2.0
+ELF_MAGIC = b"\x7fELF"
+# linux_goarch() name -> (ELF e_machine, ELF class: 1 = 32-bit, 2 = 64-bit).
+# Every supported arch is little-endian.
+ELF_MACHINES = {
+    "amd64": (62, 2),
+    "386": (3, 1),
+    "arm64": (183, 2),
+    "arm": (40, 1),
+}
+ELF_PT_INTERP = 3
+# GitHub API root: REST release lookups, and the single GraphQL query of --check-updates.
+GITHUB_API_URL = "https://api.github.com"
+# A version number inside a release tag or a tool's --version output ("v0.19.1" -> "0.19.1").
+VERSION_PATTERN = r"\d+(?:\.\d+)+"
+# Picking a release asset for an eget-method tool, in-process: how each
+# linux_goarch() arch is spelled in asset names, and other platforms' markers.
+RELEASE_ARCH_PATTERNS = {
+    "amd64": r"amd64|x86[_-]64|x64|64bit|linux64",
+    "arm64": r"arm64|aarch64|armv8",
+    "arm": r"armv[5-7]l?|armhf|armel|arm",
+    "386": r"i?[36]86|x86(?![_-]64)|32bit|ia32",
+}
+RELEASE_OTHER_OS = r"darwin|macos|apple|windows|win32|win64|freebsd|netbsd|openbsd|android|illumos|solaris"
+# Release archive types the installer unpacks, by suffix (anything else must be a
+# bare binary): the tarfile stream compression, "zst" (only with a ZSTD_MODULES
+# module) or "zip" (read through its central directory once downloaded).
+RELEASE_ARCHIVE_TYPES = {
+    ".tar.gz": "gz", ".tgz": "gz",
+    ".tar.bz2": "bz2", ".tbz2": "bz2", ".tbz": "bz2",
+    ".tar.xz": "xz", ".txz": "xz",
+    ".tar.zst": "zst", ".tzst": "zst",
+    ".zip": "zip",
+}
+# zstd decompressors, in order of preference: the stdlib one (Python 3.14+), then PyPI's
+ZSTD_MODULES = ("compression.zstd", "zstandard")
+# Per-user cache for GitHub metadata and downloads (survives across runs).
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "lazy-linux-tools",
+)
+# Release metadata younger than this is used without asking GitHub at all;
+# older entries are revalidated with If-None-Match, which is free when unchanged.
+RELEASE_CACHE_TTL = 60 * 60
+RELEASE_CACHE_MAX_ENTRIES = 128
+# Downloaded release archives and checksum files, stored by SHA-256.
+ARTIFACT_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+# Interrupted downloads kept for the next run to resume; abandoned after this long.
+ARTIFACT_PARTIAL_MAX_AGE = 7 * 24 * 60 * 60
+# PIP tools live in one installer-managed virtualenv (clear of PEP 668's
+# externally-managed system Python), their entry points linked into INSTALL_BIN_DIR.
+PIP_VENV_DIR = os.path.join(
+    os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share"),
+    "lazy-linux-tools", "venv",
+)
+# Wheels built or downloaded for PIP tools; warm runs install from here with no index access.
+PIP_WHEELHOUSE = os.path.join(CACHE_DIR, "wheels")
+# manifest.json layout version of --export-bundle archives.
+BUNDLE_FORMAT = 1
+# Fleet mode (--fleet): hosts provisioned at once, and how long one host may take.
+FLEET_PARALLELISM = 8
+FLEET_HOST_TIMEOUT = 2 * 60 * 60
+# Prefix of the line a --fleet-report run ends with; carries that host's counters back.
+FLEET_REPORT_PREFIX = "LAZY-FLEET-REPORT "
+
+
+class InstallMethod(Enum):
+    """Installation methods for tools."""
+    APT = "apt"
+    PIP = "pip"
+    EGET = "eget"
+    SNAP = "snap"
+    NPM = "npm"
+    BUILTIN = "builtin"  # Already available (e.g., systemctl)
+    MANUAL = "manual"  # Requires manual installation
+
+
+@dataclass
+class Tool:
+    """Tool definition with installation details."""
+    name: str
+    command: str  # Command to check if installed
+    method: InstallMethod
+    package: str  # Package name for installation
+    description: str
+    category: str
+    requires_root: bool = True
+    github_repo: Optional[str] = None  # For eget installations
+    classic: bool = False  # For snap installations
+    requires_gui: bool = False  # Whether tool requires GUI (excluded in server mode)
+    needs: Tuple[str, ...] = ()  # Extra prerequisites beyond ToolManager.METHOD_NEEDS
+
+
+@dataclass
+class Job:
+    """One node of the install DAG."""
+    name: str
+    action: Callable[[], bool]
+    needs: Tuple[str, ...] = ()  # Names of jobs that must succeed first
+    serial: Optional[str] = None  # Jobs sharing a serial key never run at the same time
+
+
+class SystemChecker:
+    """Check system compatibility and requirements."""
+    
+    @staticmethod
+    def is_debian_like() -> bool:
+        """Check if system is Debian-based."""
+        return shutil.which("apt-get") is not None
+    
+    @staticmethod
+    def is_root() -> bool:
+        """Check if running as root."""
+        return os.geteuid() == 0
+    
+    @staticmethod
+    def has_command(command: str) -> bool:
+        """Check if command exists in PATH."""
+        return shutil.which(command) is not None
+    
+    @staticmethod
+    def check_system() -> Tuple[bool, Optional[str]]:
+        """Comprehensive system check."""
+        if not SystemChecker.is_debian_like():
+            return False, "This script requires a Debian-based system (Ubuntu, Debian, Linux Mint)"
+        
+        if not SystemChecker.has_command("sudo"):
+            return False, "sudo is required but not found"
+
+        return True, None
+
+
+class Tracer:
+    """Timing spans for --trace (Chrome/Perfetto trace JSON) and per-thread cProfile for --profile.
+
+    Nothing is recorded until start(); until then the hooks cost a flag
+    check. Spans pick up the tags set with tagged() on their thread, so a
+    subprocess span names the tool and method it ran for.
+    """
+
+    enabled = False
+    profiling = False
+    _events: List[dict] = []
+    _threads: Dict[int, str] = {}
+    _profiles: list = []
+    _origin = 0.0
+    _lock = threading.Lock()
+    _local = threading.local()
+
+    @staticmethod
+    def start(trace: bool = True, profile: bool = False) -> None:
+        with Tracer._lock:
+            Tracer._events, Tracer._threads, Tracer._profiles = [], {}, []
+        Tracer._origin = time.monotonic()
+        Tracer.enabled = trace
+        Tracer.profiling = profile
+
+    @staticmethod
+    def stop() -> None:
+        Tracer.enabled = False
+        Tracer.profiling = False
+
+    @staticmethod
+    def describe(value) -> Optional[str]:
+        """Short printable form of a span argument (packages, paths, tools)."""
+        if isinstance(value, Tool):
+            return value.name
+        if isinstance(value, (list, tuple, set, frozenset)):
+            value = ", ".join(str(Tracer.describe(item)) for item in value)
+        if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+            return str(value)[:TRACE_ARG_MAX]
+        return None
+
+    @staticmethod
+    def record(name: str, category: str, started: float, **args) -> None:
+        """Add a complete event that began at `started` (time.monotonic()) and ends now."""
+        if not Tracer.enabled:
+            return
+        now = time.monotonic()
+        thread = threading.current_thread()
+        tid = thread.native_id or thread.ident
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "pid": os.getpid(),
+            "tid": tid,
+            "ts": round((started - Tracer._origin) * 1e6, 1),
+            "dur": round((now - started) * 1e6, 1),
+            "args": dict(getattr(Tracer._local, "tags", {}),
+                         **{key: value for key, value in args.items() if value is not None}),
+        }
+        with Tracer._lock:
+            Tracer._events.append(event)
+            Tracer._threads[tid] = thread.name
+
+    @staticmethod
+    @contextlib.contextmanager
+    def span(name: str, category: str = "phase", **args):
+        """Time the block; add to the yielded dict to attach results (exit codes, sizes)."""
+        started = time.monotonic()
+        try:
+            yield args
+        finally:
+            Tracer.record(name, category, started, **args)
+
+    @staticmethod
+    def traced(category: str) -> Callable:
+        """Decorator: a span per call, tagged with the first argument and the result."""
+        def decorate(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not Tracer.enabled:
+                    return func(*args, **kwargs)
+                started = time.monotonic()
+                result = None
+                try:
+                    result = func(*args, **kwargs)
+                    return result
+                finally:
+                    Tracer.record(func.__qualname__, category, started,
+                                  arg=Tracer.describe(args[0]) if args else None,
+                                  result=result if isinstance(result, bool) else Tracer.describe(result))
+            return wrapper
+        return decorate
+
+    @staticmethod
+    @contextlib.contextmanager
+    def tagged(**tags):
+        """Attach tags (tool, method) to every span this thread records inside the block."""
+        previous = getattr(Tracer._local, "tags", {})
+        Tracer._local.tags = dict(previous, **tags)
+        try:
+            yield
+        finally:
+            Tracer._local.tags = previous
+
+    @staticmethod
+    @contextlib.contextmanager
+    def profiled():
+        """cProfile this thread for the block when --profile is on (merged by write_profile)."""
+        if not Tracer.profiling:
+            yield
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+: one profiler per process, and the main one already sees every thread
+            yield
+            return
+        try:
+            yield
+        finally:
+            profile.disable()
+            with Tracer._lock:
+                Tracer._profiles.append(profile)
+
+    @staticmethod
+    def command_name(cmd: List[str]) -> str:
+        program = cmd[1] if cmd[0] == "sudo" and len(cmd) > 1 else cmd[0]
+        return os.path.basename(program)
+
+    @staticmethod
+    def write_trace(path: str) -> bool:
+        """Write the spans as Chrome trace JSON (chrome://tracing, ui.perfetto.dev)."""
+        with Tracer._lock:
+            events = list(Tracer._events)
+            threads = dict(Tracer._threads)
+        events += [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+                   for tid, name in threads.items()]
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, handle)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            print(f"Could not write trace {path}: {exc}")
+            return False
+        return True
+
+    @staticmethod
+    def write_profile(path: str, main_profile) -> bool:
+        """Dump the main thread's cProfile stats merged with every profiled() thread."""
+        try:
+            stats = pstats.Stats(main_profile)
+            with Tracer._lock:
+                for profile in Tracer._profiles:
+                    stats.add(profile)
+            stats.dump_stats(path)
+        except (OSError, TypeError) as exc:
+            print(f"Could not write profile {path}: {exc}")
+            return False
+        return True
+
+
+class Metrics:
+    """--metrics-file: the run as a node_exporter textfile-collector .prom file.
+
+    Durations, bytes and probe latency come from the Tracer spans; which
+    tools were installed, skipped or failed comes from outcome(), called
+    by the summary that prints them.
+    """
+
+    _outcomes: Dict[str, Tuple[str, str]] = {}
+
+    @staticmethod
+    def reset() -> None:
+        Metrics._outcomes = {}
+
+    @staticmethod
+    def outcome(tool: Tool, outcome: str) -> None:
+        """Record installed / skipped / failed for tool."""
+        Metrics._outcomes[tool.name] = (tool.method.value, outcome)
+
+    @staticmethod
+    def labels(**labels) -> str:
+        if not labels:
+            return ""
+        escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+                   for value in labels.values())
+        return "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + "}"
+
+    @staticmethod
+    def histogram(lines: List[str], name: str, help_text: str,
+                  observations: Dict[Tuple[Tuple[str, str], ...], List[float]]) -> None:
+        """Append a histogram family; observations maps a label tuple to its samples."""
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for labels, samples in sorted(observations.items()):
+            labels = dict(labels)
+            for bound in METRICS_BUCKETS:
+                count = sum(1 for sample in samples if sample <= bound)
+                lines.append(f"{name}_bucket{Metrics.labels(**labels, le=bound)} {count}")
+            lines.append(f"{name}_bucket{Metrics.labels(**labels, le='+Inf')} {len(samples)}")
+            lines.append(f"{name}_sum{Metrics.labels(**labels)} {round(sum(samples), 6)}")
+            lines.append(f"{name}_count{Metrics.labels(**labels)} {len(samples)}")
+
+    @staticmethod
+    def render(events: List[dict], finished: float) -> str:
+        """The .prom text for a run's trace events and recorded outcomes."""
+        prefix = METRICS_PREFIX
+        tool_seconds: Dict[str, float] = {}
+        tool_bytes: Dict[str, int] = {}
+        batch_seconds = {"apt": 0.0, "pip": 0.0}
+        batch_spans = {"Installer.install_apt_batch": "apt", "Installer.install_pip_batch": "pip"}
+        installs: Dict[tuple, List[float]] = {}
+        downloads: Dict[tuple, List[float]] = {}
+        host_bytes: Dict[str, int] = {}
+        host_retries: Dict[str, int] = {}
+        host_resumed: Dict[str, int] = {}
+        probes: Dict[tuple, List[float]] = {}
+        apt_update: List[Tuple[float, int]] = []
+        run_seconds = None
+        for event in events:
+            if event.get("ph") != "X":
+                continue
+            seconds, args = event["dur"] / 1e6, event["args"]
+            if event["cat"] == "tool":
+                tool_seconds[args["tool"]] = tool_seconds.get(args["tool"], 0.0) + seconds
+                installs.setdefault((("method", args["method"]),), []).append(seconds)
+            elif event["name"] in batch_spans:
+                batch_seconds[batch_spans[event["name"]]] += seconds
+            elif event["cat"] == "network":
+                host = urllib.parse.urlsplit(args.get("url", "")).hostname or "unknown"
+                downloads.setdefault((("host", host),), []).append(seconds)
+                host_bytes[host] = host_bytes.get(host, 0) + args.get("bytes", 0)
+                host_retries[host] = host_retries.get(host, 0) + args.get("attempts", 1) - 1
+                host_resumed[host] = host_resumed.get(host, 0) + args.get("resumed", 0)
+                if "tool" in args:
+                    tool_bytes[args["tool"]] = tool_bytes.get(args["tool"], 0) + args.get("bytes", 0)
+            elif event["name"] == "Installer.validate_installed_command":
+                probes.setdefault((("method", args.get("method", "")),), []).append(seconds)
+            elif event["cat"] == "subprocess" and args.get("cmd", "").endswith("apt-get update"):
+                apt_update.append((seconds, args.get("exit", 0)))
+            elif event["cat"] == "phase" and event["name"] == "main":
+                run_seconds = seconds
+        # Batched tools were installed together; each took as long as its batch
+        for name, (method, outcome) in Metrics._outcomes.items():
+            if outcome != "skipped" and name not in tool_seconds and batch_seconds.get(method):
+                tool_seconds[name] = batch_seconds[method]
+                installs.setdefault((("method", method),), []).append(batch_seconds[method])
+
+        lines = [f"# HELP {prefix}_last_run_timestamp_seconds When the last installer run finished.",
+                 f"# TYPE {prefix}_last_run_timestamp_seconds gauge",
+                 f"{prefix}_last_run_timestamp_seconds {round(finished, 3)}"]
+        if run_seconds is not None:
+            lines += [f"# HELP {prefix}_run_duration_seconds Wall time of the last installer run.",
+                      f"# TYPE {prefix}_run_duration_seconds gauge",
+                      f"{prefix}_run_duration_seconds {round(run_seconds, 6)}"]
+        totals = {outcome: 0 for outcome in ("installed", "skipped", "failed")}
+        for _, outcome in Metrics._outcomes.values():
+            totals[outcome] += 1
+        lines += [f"# HELP {prefix}_tools Tools by outcome in the last run.", f"# TYPE {prefix}_tools gauge"]
+        lines += [f"{prefix}_tools{Metrics.labels(outcome=outcome)} {count}" for outcome, count in totals.items()]
+        lines += [f"# HELP {prefix}_tool_outcome 1 for each tool's outcome in the last run.",
+                  f"# TYPE {prefix}_tool_outcome gauge"]
+        lines += [f"{prefix}_tool_outcome{Metrics.labels(tool=name, method=method, outcome=outcome)} 1"
+                  for name, (method, outcome) in sorted(Metrics._outcomes.items())]
+        methods = {name: method for name, (method, _) in Metrics._outcomes.items()}
+        lines += [f"# HELP {prefix}_tool_install_duration_seconds Time spent installing each tool.",
+                  f"# TYPE {prefix}_tool_install_duration_seconds gauge"]
+        lines += [f"{prefix}_tool_install_duration_seconds"
+                  f"{Metrics.labels(tool=name, method=methods.get(name, ''))} {round(seconds, 6)}"
+                  for name, seconds in sorted(tool_seconds.items())]
+        lines += [f"# HELP {prefix}_tool_download_bytes Bytes downloaded for each tool.",
+                  f"# TYPE {prefix}_tool_download_bytes gauge"]
+        lines += [f"{prefix}_tool_download_bytes{Metrics.labels(tool=name, method=methods.get(name, ''))} {size}"
+                  for name, size in sorted(tool_bytes.items())]
+        lines += [f"# HELP {prefix}_download_bytes Bytes downloaded from each host.",
+                  f"# TYPE {prefix}_download_bytes gauge"]
+        lines += [f"{prefix}_download_bytes{Metrics.labels(host=host)} {size}"
+                  for host, size in sorted(host_bytes.items())]
+        lines += [f"# HELP {prefix}_download_retries Download attempts repeated after a transient failure.",
+                  f"# TYPE {prefix}_download_retries gauge"]
+        lines += [f"{prefix}_download_retries{Metrics.labels(host=host)} {count}"
+                  for host, count in sorted(host_retries.items())]
+        lines += [f"# HELP {prefix}_download_resumed_bytes Bytes not downloaded again because a transfer resumed.",
+                  f"# TYPE {prefix}_download_resumed_bytes gauge"]
+        lines += [f"{prefix}_download_resumed_bytes{Metrics.labels(host=host)} {size}"
+                  for host, size in sorted(host_resumed.items())]
+        if apt_update:
+            lines += [f"# HELP {prefix}_apt_update_duration_seconds Time spent in apt-get update.",
+                      f"# TYPE {prefix}_apt_update_duration_seconds gauge",
+                      f"{prefix}_apt_update_duration_seconds {round(sum(s for s, _ in apt_update), 6)}",
+                      f"# HELP {prefix}_apt_update_success 1 if the last apt-get update succeeded.",
+                      f"# TYPE {prefix}_apt_update_success gauge",
+                      f"{prefix}_apt_update_success {int(apt_update[-1][1] == 0)}"]
+        Metrics.histogram(lines, f"{prefix}_install_duration_seconds", "Install time per tool.", installs)
+        Metrics.histogram(lines, f"{prefix}_download_duration_seconds", "Time per download.", downloads)
+        Metrics.histogram(lines, f"{prefix}_probe_duration_seconds",
+                          "Post-install validation probe time per tool.", probes)
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def write(path: str) -> bool:
+        """Write atomically: the collector only reads *.prom, so it never sees the .tmp file."""
+        with Tracer._lock:
+            events = list(Tracer._events)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                handle.write(Metrics.render(events, time.time()))
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            print(f"Could not write metrics {path}: {exc}")
+            return False
+        return True
+
+
+class PathIndex:
+    """Name -> path map of the files in every PATH directory, built from one listing each.
+
+    shutil.which stats every PATH entry on every lookup, so checking a whole
+    catalog costs tools x PATH-dirs syscalls. This lists each directory once
+    and re-lists it only when its mtime changes, which adding or removing a
+    file always does. INSTALL_BIN_DIR is searched last even when it is not on
+    PATH, because this process's PATH may predate it.
+    """
+
+    _listings: Dict[str, Tuple[float, frozenset, bool]] = {}  # dir -> (mtime, names, racy)
+    _dirs: List[str] = []
+    _path_key: Optional[str] = None
+    _checked_at: float = 0.0
+    _generation = 0  # Bumped by invalidate(); a refresh that overlaps one does not count
+    _indexed_generation = -1
+    _lock = threading.Lock()
+
+    @staticmethod
+    def directories() -> List[str]:
+        """PATH entries in search order, then INSTALL_BIN_DIR, without duplicates."""
+        dirs = os.environ.get("PATH", "").split(os.pathsep) + [INSTALL_BIN_DIR]
+        return list(dict.fromkeys(d for d in dirs if d))
+
+    @staticmethod
+    def invalidate() -> None:
+        """Force the next lookup to re-check directory mtimes (call after installing)."""
+        PathIndex._generation += 1
+        PathIndex._checked_at = 0.0
+
+    @staticmethod
+    def refresh() -> None:
+        """Re-list any PATH directory whose mtime changed since it was indexed."""
+        with PathIndex._lock:
+            path_key = os.environ.get("PATH", "")
+            now = time.monotonic()
+            generation = PathIndex._generation
+            if (path_key == PathIndex._path_key and generation == PathIndex._indexed_generation
+                    and now - PathIndex._checked_at < PATH_INDEX_RECHECK):
+                return
+            PathIndex._path_key = path_key
+            PathIndex._dirs = PathIndex.directories()
+            for directory in PathIndex._dirs:
+                try:
+                    mtime = os.stat(directory).st_mtime
+                except OSError:
+                    PathIndex._listings[directory] = (0.0, frozenset(), False)
+                    continue
+                listed = PathIndex._listings.get(directory)
+                if listed is not None and listed[0] == mtime:
+                    continue
+                try:
+                    names = frozenset(os.listdir(directory))
+                except OSError:
+                    names = frozenset()
+                # Like git's racy-clean check: a file added in the same mtime tick as the
+                # listing leaves the mtime unchanged, so misses there are confirmed by stat
+                racy = time.time() - mtime < PATH_INDEX_RACY_WINDOW
+                PathIndex._listings[directory] = (mtime, names, racy)
+            PathIndex._indexed_generation = generation
+            PathIndex._checked_at = time.monotonic()
+
+    @staticmethod
+    def find(command: str) -> Optional[str]:
+        """Return the path command would run as, or None (like shutil.which)."""
+        if os.sep in command:
+            return command if os.path.isfile(command) and os.access(command, os.X_OK) else None
+        PathIndex.refresh()
+        for directory in PathIndex._dirs:
+            _, names, racy = PathIndex._listings.get(directory, (0.0, frozenset(), False))
+            if command in names or racy:
+                candidate = os.path.join(directory, command)
+                # Only hits pay for a syscall; a listing alone cannot see the mode bits
+                if os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+                    return candidate
+        return None
+
+
+class DpkgStatus:
+    """Package -> (state, version) map read straight from dpkg's status database.
+
+    Asking dpkg about the package is right where asking PATH about the
+    command is not: network-manager installs nmtui, bat installs batcat, and a
+    package can be installed while its command is missing from this PATH.
+    The file is parsed once and re-read only when its mtime changes.
+    """
+
+    _packages: Optional[Dict[str, Tuple[str, str]]] = None
+    _mtime: Optional[float] = None
+
+    @staticmethod
+    def parse(content: str) -> Dict[str, Tuple[str, str]]:
+        """Parse status-file stanzas into {package: (state, version)}.
+
+        Multi-arch packages are also keyed as "name:arch".
+        """
+        packages: Dict[str, Tuple[str, str]] = {}
+        for stanza in content.split("\n\n"):
+            fields: Dict[str, str] = {}
+            for line in stanza.splitlines():
+                # Continuation lines (descriptions, conffiles) start with whitespace
+                if line[:1].isspace():
+                    continue
+                key, _, value = line.partition(":")
+                if key in ("Package", "Status", "Version", "Architecture"):
+                    fields[key] = value.strip()
+            name = fields.get("Package")
+            if not name:
+                continue
+            # Status is "want flag state", e.g. "install ok installed"
+            state = fields.get("Status", "").split()[-1:] or ["unknown"]
+            entry = (state[0], fields.get("Version", ""))
+            packages[name] = entry
+            if fields.get("Architecture"):
+                packages[f"{name}:{fields['Architecture']}"] = entry
+        return packages
+
+    @staticmethod
+    def load() -> Optional[Dict[str, Tuple[str, str]]]:
+        """Return the parsed database, or None when it cannot be read."""
+        try:
+            mtime = os.stat(DPKG_STATUS_PATH).st_mtime
+            if DpkgStatus._packages is not None and DpkgStatus._mtime == mtime:
+                return DpkgStatus._packages
+            with open(DPKG_STATUS_PATH, "r", encoding="utf-8", errors="replace") as handle:
+                DpkgStatus._packages = DpkgStatus.parse(handle.read())
+            DpkgStatus._mtime = mtime
+        except OSError:
+            return None
+        return DpkgStatus._packages
+
+    @staticmethod
+    def is_installed(package: str) -> Optional[bool]:
+        """True/False from dpkg, or None when there is no dpkg database to ask."""
+        packages = DpkgStatus.load()
+        if packages is None:
+            return None
+        entry = packages.get(package)
+        return entry is not None and entry[0] == "installed"
+
+
+class ReleaseCache:
+    """On-disk cache of compacted GitHub latest-release metadata, keyed by repo.
+
+    Each entry keeps only the tag and the asset names/URLs the installer uses,
+    plus the ETag and Last-Modified headers needed to revalidate it. A 304
+    reply does not count against GitHub's 60/hour anonymous rate limit.
+    """
+
+    # repo -> entry, so one run never reads the same file twice
+    _memo: Dict[str, dict] = {}
+
+    @staticmethod
+    def path_for(repo: str) -> str:
+        """Cache file for an owner/name repo."""
+        return os.path.join(CACHE_DIR, "releases", repo.replace("/", "__") + ".json")
+
+    @staticmethod
+    def compact(data: dict) -> dict:
+        """Drop everything from a release payload except what installs need."""
+        assets = []
+        for asset in data.get("assets") or []:
+            if not isinstance(asset, dict):
+                continue
+            assets.append({
+                "name": asset.get("name"),
+                "browser_download_url": asset.get("browser_download_url"),
+                "size": asset.get("size"),
+                "digest": asset.get("digest"),  # "sha256:<hex>" where GitHub has computed it
+            })
+        return {"tag_name": data.get("tag_name"), "assets": assets}
+
+    @staticmethod
+    def is_fresh(entry: dict) -> bool:
+        """True while an entry is young enough to use without revalidating."""
+        return time.time() - entry.get("fetched_at", 0) < RELEASE_CACHE_TTL
+
+    @staticmethod
+    def load(repo: str) -> Optional[dict]:
+        """Return the cached entry for repo, or None."""
+        if repo in ReleaseCache._memo:
+            return ReleaseCache._memo[repo]
+        try:
+            with open(ReleaseCache.path_for(repo), "r", encoding="utf-8") as handle:
+                entry = json.load(handle)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not isinstance(entry, dict) or not isinstance(entry.get("assets"), list):
+            return None
+        ReleaseCache._memo[repo] = entry
+        return entry
+
+    @staticmethod
+    def store(repo: str, entry: dict) -> None:
+        """Atomically write an entry, then trim the cache to its size bound."""
+        ReleaseCache._memo[repo] = entry
+        path = ReleaseCache.path_for(repo)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                json.dump(entry, handle)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            # A read-only home just means no cache, never a failed install
+            print(f"Could not cache release metadata for {repo}: {exc}")
+            return
+        ReleaseCache.evict()
+
+    @staticmethod
+    def evict(max_entries: int = RELEASE_CACHE_MAX_ENTRIES) -> None:
+        """Remove the least recently refreshed entries beyond max_entries."""
+        directory = os.path.join(CACHE_DIR, "releases")
+        try:
+            entries = [e for e in os.scandir(directory) if e.name.endswith(".json")]
+            entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+            for stale in entries[max_entries:]:
+                os.unlink(stale.path)
+        except OSError:
+            pass
+
+
+class ArtifactCache:
+    """Content-addressed store for downloaded release archives and checksum files.
+
+    Blobs live under artifacts/blobs/<sha256[:2]>/<sha256> and an index maps
+    each download URL to its digest. A blob's mtime is its last use, so
+    eviction under ARTIFACT_CACHE_MAX_BYTES drops the least recently used
+    first. Index updates and eviction hold an flock so several installer
+    processes can share one cache; blobs are written to a temp name and
+    renamed into place, so readers never see a partial file.
+    """
+
+    @staticmethod
+    def root() -> str:
+        return os.path.join(CACHE_DIR, "artifacts")
+
+    @staticmethod
+    def blob_path(digest: str) -> str:
+        return os.path.join(ArtifactCache.root(), "blobs", digest[:2], digest)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _locked():
+        """Hold an exclusive lock on the cache for an index read-modify-write."""
+        os.makedirs(ArtifactCache.root(), exist_ok=True)
+        with open(os.path.join(ArtifactCache.root(), "lock"), "a") as lock_handle:
+            if fcntl is not None:
+                fcntl.flock(lock_handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_handle, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _read_index() -> Dict[str, str]:
+        try:
+            with open(os.path.join(ArtifactCache.root(), "index.json"), "r", encoding="utf-8") as handle:
+                index = json.load(handle)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        return index if isinstance(index, dict) else {}
+
+    @staticmethod
+    def _write_index(index: Dict[str, str]) -> None:
+        path = os.path.join(ArtifactCache.root(), "index.json")
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(index, handle)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def lookup(url: Optional[str] = None, digest: Optional[str] = None,
+               verify: bool = True) -> Optional[str]:
+        """Return a blob path for a digest, or for whatever url last produced.
+
+        verify=False skips re-hashing for callers that hash the bytes as they
+        read them anyway and compare against the blob's name.
+        """
+        if digest is None and url is not None:
+            digest = ArtifactCache._read_index().get(url)
+        if not digest:
+            return None
+        digest = digest.strip().lower()
+        path = ArtifactCache.blob_path(digest)
+        if not os.path.isfile(path):
+            return None
+        if verify and Installer.sha256_file(path) != digest:
+            # Bit rot or a torn write from a crashed process: never serve it
+            ArtifactCache.discard(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    @staticmethod
+    def store(url: str, path: str, digest: Optional[str] = None) -> Optional[str]:
+        """Add a downloaded file to the cache under its digest; return the digest.
+
+        Pass digest when it is already known (e.g. hashed while downloading).
+        """
+        try:
+            digest = digest or Installer.sha256_file(path)
+            if not os.path.isfile(ArtifactCache.blob_path(digest)):
+                tmp_blob = ArtifactCache.reserve()
+                shutil.copyfile(path, tmp_blob)
+            else:
+                tmp_blob = None
+            return ArtifactCache.commit(url, tmp_blob, digest)
+        except OSError as exc:
+            print(f"Could not cache {url}: {exc}")
+            return None
+
+    @staticmethod
+    def reserve() -> str:
+        """Return a fresh temp path inside the cache for a blob being written."""
+        incoming = os.path.join(ArtifactCache.root(), "blobs")
+        os.makedirs(incoming, exist_ok=True)
+        handle = tempfile.NamedTemporaryFile(dir=incoming, prefix="incoming-", suffix=".tmp", delete=False)
+        handle.close()
+        return handle.name
+
+    @staticmethod
+    def commit(url: str, tmp_blob: Optional[str], digest: str) -> Optional[str]:
+        """Rename a fully written temp blob into place under digest and index url to it."""
+        try:
+            blob = ArtifactCache.blob_path(digest)
+            if tmp_blob:
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                os.replace(tmp_blob, blob)
+            with ArtifactCache._locked():
+                index = ArtifactCache._read_index()
+                index[url] = digest
+                ArtifactCache._write_index(index)
+                ArtifactCache._evict_locked(ARTIFACT_CACHE_MAX_BYTES)
+            return digest
+        except OSError as exc:
+            print(f"Could not cache {url}: {exc}")
+            if tmp_blob:
+                ArtifactCache.discard(tmp_blob)
+            return None
+
+    @staticmethod
+    @contextlib.contextmanager
+    def partial(url: str):
+        """Claim url's resumable download slot; yields its path inside the cache.
+
+        A download cut short stays there, with its validators, for the next
+        run to continue (DownloadManager.fetch with resume). The slot is
+        flock'ed, so two processes fetching one URL take turns instead of
+        writing into the same file. Raises OSError if the cache is unusable.
+        """
+        directory = os.path.join(ArtifactCache.root(), "partial")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, hashlib.sha256(url.encode()).hexdigest())
+        with open(f"{path}.lock", "a") as lock_handle:
+            os.utime(lock_handle.fileno())  # Last use, for _evict_locked's age limit
+            if fcntl is not None:
+                fcntl.flock(lock_handle, fcntl.LOCK_EX)
+            try:
+                yield path
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_handle, fcntl.LOCK_UN)
+
+    @staticmethod
+    def discard(path: str) -> None:
+        """Remove a blob or temp blob, ignoring one that is already gone."""
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def evict(max_bytes: int = ARTIFACT_CACHE_MAX_BYTES) -> None:
+        """Drop least recently used blobs until the cache fits in max_bytes."""
+        with ArtifactCache._locked():
+            ArtifactCache._evict_locked(max_bytes)
+
+    @staticmethod
+    def _evict_locked(max_bytes: int) -> None:
+        cutoff = time.time() - ARTIFACT_PARTIAL_MAX_AGE
+        partial_dir = os.path.join(ArtifactCache.root(), "partial")
+        for entry in (os.scandir(partial_dir) if os.path.isdir(partial_dir) else ()):
+            if entry.stat().st_mtime < cutoff:
+                ArtifactCache.discard(entry.path)
+        blobs = []
+        for dirpath, _, filenames in os.walk(os.path.join(ArtifactCache.root(), "blobs")):
+            for filename in filenames:
+                if filename.endswith(".tmp"):
+                    continue
+                stat = os.stat(os.path.join(dirpath, filename))
+                blobs.append((stat.st_mtime, stat.st_size, filename, os.path.join(dirpath, filename)))
+        total = sum(size for _, size, _, _ in blobs)
+        if total <= max_bytes:
+            return
+        removed = set()
+        for _, size, digest, path in sorted(blobs):
+            if total <= max_bytes:
+                break
+            os.unlink(path)
+            removed.add(digest)
+            total -= size
+        index = ArtifactCache._read_index()
+        ArtifactCache._write_index({u: d for u, d in index.items() if d not in removed})
+
+    @staticmethod
+    def materialize(blob: str, dest: str) -> None:
+        """Place a cached blob at dest, hard-linking when the filesystem allows it."""
+        try:
+            os.link(blob, dest)
+        except OSError:
+            shutil.copyfile(blob, dest)
+
+
+class ProbeFlagCache:
+    """Remembers which probe flag each command answered, across runs.
+
+    Trying the learned flag first turns post-install validation into one
+    process spawn per tool on warm runs.
+    """
+
+    _flags: Optional[Dict[str, str]] = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def path() -> str:
+        return os.path.join(CACHE_DIR, "probe-flags.json")
+
+    @staticmethod
+    def _load() -> Dict[str, str]:
+        if ProbeFlagCache._flags is None:
+            try:
+                with open(ProbeFlagCache.path(), "r", encoding="utf-8") as handle:
+                    flags = json.load(handle)
+            except (OSError, json.JSONDecodeError):
+                flags = {}
+            ProbeFlagCache._flags = flags if isinstance(flags, dict) else {}
+        return ProbeFlagCache._flags
+
+    @staticmethod
+    def get(command: str) -> Optional[str]:
+        flag = ProbeFlagCache._load().get(command)
+        return flag if flag in PROBE_FLAGS else None
+
+    @staticmethod
+    def remember(command: str, flag: str) -> None:
+        with ProbeFlagCache._lock:
+            ProbeFlagCache._remember_locked(command, flag)
+
+    @staticmethod
+    def _remember_locked(command: str, flag: str) -> None:
+        flags = ProbeFlagCache._load()
+        if flags.get(command) == flag:
+            return
+        flags[command] = flag
+        path = ProbeFlagCache.path()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                json.dump(flags, handle)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+
+class StateManifest:
+    """Install state per tool, kept in STATE_DIR across runs.
+
+    Each entry records the tool's catalog fingerprint, method, version or
+    release tag, binary digest and the path, size, mtime and inode of the
+    binary on PATH. A rerun trusts an entry when the catalog entry is
+    unchanged and a stat still matches. It re-checks only when the binary
+    has moved or changed, and it reinstalls when the catalog entry changed.
+    """
+
+    @staticmethod
+    def path() -> str:
+        return os.path.join(STATE_DIR, "manifest.json")
+
+    @staticmethod
+    def load() -> Dict[str, dict]:
+        """tool name -> entry; empty when there is no readable manifest."""
+        try:
+            with open(StateManifest.path(), "r", encoding="utf-8") as handle:
+                manifest = json.load(handle)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(manifest, dict) or manifest.get("format") != STATE_FORMAT:
+            return {}
+        tools = manifest.get("tools")
+        return {name: entry for name, entry in tools.items() if isinstance(entry, dict)} \
+            if isinstance(tools, dict) else {}
+
+    @staticmethod
+    def fingerprint(tool: Tool) -> str:
+        """Hash of the catalog fields that decide how a tool is installed."""
+        fields = (tool.method.value, tool.package, tool.command, tool.github_repo, tool.classic, tuple(tool.needs))
+        return format(zlib.crc32(repr(fields).encode("utf-8")), "08x")
+
+    @staticmethod
+    def stat_key(path: str) -> Optional[List[int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+    @staticmethod
+    def status(state: Dict[str, dict], tool: Tool) -> Optional[bool]:
+        """True: trust the entry. False: the catalog entry changed, reinstall. None: check the usual way."""
+        entry = state.get(tool.name)
+        if not entry:
+            return None
+        if entry.get("fingerprint") != StateManifest.fingerprint(tool):
+            return False
+        path = entry.get("path")
+        if path and StateManifest.stat_key(path) == [entry.get("size"), entry.get("mtime_ns"), entry.get("ino")]:
+            return True
+        return None
+
+    @staticmethod
+    def version(tool: Tool, installed_now: bool) -> Optional[str]:
+        """Installed package version or release tag, when it is known without asking anyone.
+
+        The cached release tag is the latest upstream release, so it only
+        describes the binary on disk when this run just installed it.
+        """
+        if tool.method == InstallMethod.APT:
+            entry = (DpkgStatus.load() or {}).get(tool.package)
+            return entry[1] if entry else None
+        if tool.method == InstallMethod.EGET and tool.github_repo and installed_now:
+            cached = ReleaseCache.load(tool.github_repo)
+            return cached.get("tag_name") if cached else None
+        return None
+
+    @staticmethod
+    def entry(tool: Tool, installed_now: bool) -> Optional[dict]:
+        """A fresh entry for tool's binary on PATH, or None if it cannot be found.
+
+        The binary is only hashed, and a release tag only recorded, for a
+        tool this run installed.
+        """
+        path = PathIndex.find(tool.command)
+        key = StateManifest.stat_key(path) if path else None
+        if key is None:
+            return None
+        try:
+            sha256 = Installer.sha256_file(path) if installed_now else None
+        except OSError:
+            sha256 = None
+        return {
+            "fingerprint": StateManifest.fingerprint(tool),
+            "method": tool.method.value,
+            "version": StateManifest.version(tool, installed_now),
+            "sha256": sha256,
+            "path": path,
+            "size": key[0],
+            "mtime_ns": key[1],
+            "ino": key[2],
+            "recorded_at": int(time.time()),
+        }
+
+    @staticmethod
+    def update(state: Dict[str, dict], tools: List[Tool], statuses: Dict[str, Optional[bool]],
+               installed: Dict[str, bool], newly: set) -> bool:
+        """Record tools installed this run and tools found installed without a trusted entry.
+
+        Failed tools keep their old entry, so a changed catalog entry is
+        retried next run. Writes only if something changed.
+        """
+        entries = {name: entry for name, entry in state.items() if name in ToolManager.TOOLS}
+        if newly:
+            PathIndex.invalidate()
+        for tool in tools:
+            if tool.name in newly or (installed[tool.name] and statuses.get(tool.name) is None):
+                entry = StateManifest.entry(tool, installed_now=tool.name in newly)
+                if entry:
+                    entries[tool.name] = entry
+        if entries == state:
+            return True
+        return StateManifest.save(entries)
+
+    @staticmethod
+    def save(entries: Dict[str, dict]) -> bool:
+        """Atomically replace the manifest, through sudo when STATE_DIR is root's."""
+        path = StateManifest.path()
+        content = json.dumps({"format": STATE_FORMAT, "tools": entries}, indent=1, sort_keys=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(STATE_DIR, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                handle.write(content)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+            return True
+        except PermissionError:
+            pass
+        except OSError as exc:
+            print(f"Could not record install state in {path}: {exc}")
+            return False
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=Installer.spool_dir,
+                                         suffix=".json") as staged:
+            staged.write(content)
+            staged.flush()
+            for cmd in (["sudo", "install", "-D", "-m", "0644", staged.name, tmp_path],
+                        ["sudo", "mv", "-f", tmp_path, path]):
+                if Installer.run_command(cmd, capture_output=True).returncode != 0:
+                    print(f"Could not record install state in {path}")
+                    return False
+        return True
+
+
+class _HashingReader:
+    """Read-through wrapper that hashes, and optionally copies, every byte it passes on."""
+
+    def __init__(self, source: BinaryIO, tee: Optional[BinaryIO] = None):
+        self.source = source
+        self.tee = tee
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.source.read(size)
+        if data:
+            self.digest.update(data)
+            self.size += len(data)
+            if self.tee is not None:
+                self.tee.write(data)
+        return data
+
+    def drain(self) -> None:
+        """Consume the rest of the source so the digest covers all of it."""
+        while self.read(1024 * 1024):
+            pass
+
+    def hexdigest(self) -> str:
+        return self.digest.hexdigest()
+
+
+class _ResumingResponse:
+    """Readable HTTP body that carries on from where it broke off.
+
+    A read that fails, or ends short of Content-Length, is retried as a
+    Range request for the rest of the body (If-Range on the first
+    response's ETag) after DownloadManager.backoff, so the caller sees one
+    unbroken stream. Gives up with the original error after
+    DOWNLOAD_RETRIES, or when the server cannot continue the same body.
+    """
+
+    def __init__(self, url: str, response: "http.client.HTTPResponse", release: Callable[[bool], None]):
+        self.url = url
+        self.response = response
+        self.release = release
+        self.status = response.status
+        self.etag, self.length = DownloadManager.validators(
+            {name.lower(): value for name, value in response.getheaders()})
+        self.position = 0
+        self.retries = 0
+        self.resumed = 0  # Bytes not fetched again thanks to Range requests
+        self.started = time.monotonic()
+
+    def read(self, size: int = -1) -> bytes:
+        while True:
+            try:
+                data = self.response.read(size) if size >= 0 else self.response.read()
+            except http.client.IncompleteRead as exc:
+                if exc.partial:
+                    self.position += len(exc.partial)
+                    return exc.partial  # The next read finds the end and resumes
+                error = exc
+            except (OSError, http.client.HTTPException) as exc:
+                error = exc
+            else:
+                if data or size == 0 or self.length is None or self.position >= self.length:
+                    self.position += len(data)
+                    return data
+                # http.client returns b"" when the peer hangs up early
+                error = http.client.IncompleteRead(b"", self.length - self.position)
+            self._resume(error)
+
+    def _resume(self, error: Exception) -> None:
+        self.release(False)
+        self.release = lambda reusable: None
+        while self.retries < DOWNLOAD_RETRIES and (self.etag or self.length is not None):
+            self.retries += 1
+            time.sleep(DownloadManager.backoff(self.retries))
+            headers = {"Range": f"bytes={self.position}-"}
+            if self.etag:
+                headers["If-Range"] = self.etag
+            try:
+                response, release = DownloadManager.open(self.url, headers)
+            except (OSError, http.client.HTTPException) as exc:
+                error = exc
+                continue
+            if response.status == 206 and DownloadManager.range_continues(
+                    response.getheader("Content-Range", ""), self.position, self.length):
+                self.response, self.release = response, release
+                self.resumed += self.position
+                return
+            release(False)  # A full 200 body (or anything else) cannot be spliced in
+            break
+        raise error
+
+
+@dataclass
+class DownloadResult:
+    """Outcome of one DownloadManager transfer."""
+    url: str
+    status: int = 0  # Final HTTP status after redirects; 0 if no response arrived
+    size: int = 0
+    duration: float = 0.0
+    digest: Optional[str] = None  # SHA-256 of the body, computed as it arrived
+    path: Optional[str] = None
+    content: Optional[bytes] = None  # Body, when no destination path was given
+    headers: Dict[str, str] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and 200 <= self.status < 300
+
+
+class DownloadManager:
+    """In-process HTTP(S) client: keep-alive connections per host, bounded parallelism.
+
+    Connections are pooled by (scheme, host, port) and only returned to the
+    pool once their response has been read to the end, so each one is used
+    by a single transfer at a time.
+    """
+
+    _idle: Dict[Tuple[str, str, int], List["http.client.HTTPConnection"]] = {}
+    _lock = threading.Lock()
+    _ssl_context: Optional["ssl.SSLContext"] = None
+
+    @staticmethod
+    def auth_headers(host: str) -> Dict[str, str]:
+        """GITHUB_TOKEN lifts the API rate limit; it is only ever sent to api.github.com."""
+        token = os.environ.get("GITHUB_TOKEN")
+        if token and host == "api.github.com":
+            return {"Authorization": f"Bearer {token}"}
+        return {}
+
+    @staticmethod
+    def _connect(scheme: str, host: str, port: int,
+                 fresh: bool = False) -> Tuple["http.client.HTTPConnection", bool]:
+        """Return (connection, reused) for host, preferring an idle pooled one."""
+        with DownloadManager._lock:
+            idle = DownloadManager._idle.get((scheme, host, port))
+            if idle and not fresh:
+                return idle.pop(), True
+        if scheme == "https":
+            if DownloadManager._ssl_context is None:
+                DownloadManager._ssl_context = ssl.create_default_context()
+            conn = http.client.HTTPSConnection(host, port, timeout=CONNECT_TIMEOUT,
+                                               context=DownloadManager._ssl_context)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=CONNECT_TIMEOUT)
+        return conn, False
+
+    @staticmethod
+    def _release(key: Tuple[str, str, int], conn: "http.client.HTTPConnection",
+                 response: "http.client.HTTPResponse", reusable: bool) -> None:
+        if reusable and response.isclosed() and not response.will_close:
+            with DownloadManager._lock:
+                DownloadManager._idle.setdefault(key, []).append(conn)
+        else:
+            conn.close()
+
+    @staticmethod
+    def close_all() -> None:
+        """Drop every pooled connection."""
+        with DownloadManager._lock:
+            pools, DownloadManager._idle = DownloadManager._idle, {}
+        for conns in pools.values():
+            for conn in conns:
+                conn.close()
+
+    @staticmethod
+    def open(url: str, headers: Optional[Dict[str, str]] = None, body: Optional[bytes] = None
+             ) -> Tuple["http.client.HTTPResponse", Callable[[bool], None]]:
+        """GET url (POST body, when given), following redirects; return (response, release).
+
+        release(reusable) must be called once the caller is done with the
+        response. Raises OSError / http.client.HTTPException / ValueError.
+        """
+        target = url
+        for _ in range(HTTP_MAX_REDIRECTS + 1):
+            parts = urllib.parse.urlsplit(target)
+            if parts.scheme not in ("http", "https") or not parts.hostname:
+                raise ValueError(f"unsupported URL: {target}")
+            key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+            path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+            request_headers = {"User-Agent": HTTP_USER_AGENT,
+                               **DownloadManager.auth_headers(parts.hostname), **(headers or {})}
+            conn, reused = DownloadManager._connect(*key)
+            while True:
+                try:
+                    conn.request("GET" if body is None else "POST", path, body=body, headers=request_headers)
+                    response = conn.getresponse()
+                    break
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    if not reused:
+                        raise
+                    # The server dropped an idle keep-alive connection; retry on a new one
+                    conn, reused = DownloadManager._connect(*key, fresh=True)
+            location = response.getheader("Location")
+            if response.status in (301, 302, 303, 307, 308) and location:
+                response.read()
+                DownloadManager._release(key, conn, response, True)
+                target = urllib.parse.urljoin(target, location)
+                if response.status in (301, 302, 303):
+                    body = None  # Followed as a GET, like browsers do
+                continue
+            return response, lambda reusable, key=key, conn=conn, response=response: \
+                DownloadManager._release(key, conn, response, reusable)
+        raise http.client.HTTPException(f"too many redirects fetching {url}")
+
+    @staticmethod
+    def backoff(attempt: int) -> float:
+        """Seconds to wait before retry number attempt: full jitter over a capped exponential."""
+        return random.uniform(0, min(DOWNLOAD_BACKOFF_MAX, DOWNLOAD_BACKOFF * 2 ** (attempt - 1)))
+
+    @staticmethod
+    def validators(headers: Dict[str, str]) -> Tuple[Optional[str], Optional[int]]:
+        """(strong ETag, full body length) of a response, for resuming it; None where unknown."""
+        etag = headers.get("etag")
+        if etag and etag.startswith("W/"):
+            etag = None  # Weak validators may not be used with If-Range
+        match = re.fullmatch(r"bytes \d+-\d+/(\d+)", headers.get("content-range", "").strip())
+        length = match.group(1) if match else headers.get("content-length", "")
+        return etag, int(length) if length.isdigit() else None
+
+    @staticmethod
+    def range_continues(content_range: str, offset: int, length: Optional[int]) -> bool:
+        """Whether a 206 Content-Range carries on a body of `length` bytes from offset."""
+        match = re.fullmatch(r"bytes (\d+)-\d+/(\d+|\*)", content_range.strip())
+        return bool(match) and int(match.group(1)) == offset and (length is None or match.group(2) == str(length))
+
+    @staticmethod
+    def fetch(url: str, dest: Optional[str] = None, headers: Optional[Dict[str, str]] = None,
+              max_time: float = DOWNLOAD_MAX_TIME, body: Optional[bytes] = None,
+              resume: bool = False) -> DownloadResult:
+        """GET url (POST body, when given) into dest (or into result.content); never raises.
+
+        Only 2xx bodies are kept. Non-2xx statuses are reported, not treated
+        as errors, so callers can act on 304 Not Modified. Transient failures
+        are retried (DOWNLOAD_RETRIES, with backoff), max_time is per attempt,
+        and a dest cut short continues with a Range request when the server
+        identified the body by ETag or length. With resume, such a partial
+        dest also survives this call, next to a <dest>.part.json holding its
+        validators, and the next fetch of url into dest picks it up.
+        """
+        started = time.monotonic()
+        result = DownloadResult(url=url, path=dest)
+        digest = hashlib.sha256()
+        offset, etag, length = DownloadManager._load_partial(url, dest, digest) if resume and dest else (0, None, None)
+        attempts = received = resumed = 0
+        while True:
+            attempts += 1
+            attempt_started = time.monotonic()
+            request_headers = dict(headers or {})
+            ranged = bool(dest and offset and (etag or length is not None))
+            if ranged:
+                request_headers["Range"] = f"bytes={offset}-"
+                if etag:
+                    request_headers["If-Range"] = etag
+            result.status, result.headers, result.error, retry = 0, {}, None, False
+            try:
+                response, release = DownloadManager.open(url, request_headers, body)
+            except (OSError, http.client.HTTPException, ValueError) as exc:
+                result.error = str(exc) or type(exc).__name__
+                retry = not isinstance(exc, ValueError)
+            else:
+                result.status = response.status
+                result.headers = {name.lower(): value for name, value in response.getheaders()}
+                complete = False
+                try:
+                    if ranged and result.status == 206 and DownloadManager.range_continues(
+                            result.headers.get("content-range", ""), offset, length):
+                        mode = "ab"
+                        resumed += offset
+                    elif ranged and result.status in (206, 416):
+                        # Not the body we hold a piece of: drop it and start over
+                        response.read()
+                        offset, etag, length = 0, None, None
+                        raise http.client.HTTPException(f"HTTP {result.status} cannot resume the download")
+                    elif result.ok:
+                        mode = "wb"
+                        offset, digest = 0, hashlib.sha256()
+                        etag, length = DownloadManager.validators(result.headers)
+                    if not result.ok:
+                        response.read()
+                        retry = result.status in DOWNLOAD_RETRY_STATUSES
+                    else:
+                        with (open(dest, mode) if dest else io.BytesIO()) as sink:
+                            for chunk in iter(lambda: response.read(1024 * 1024), b""):
+                                sink.write(chunk)
+                                digest.update(chunk)
+                                offset += len(chunk)
+                                received += len(chunk)
+                                if time.monotonic() - attempt_started > max_time:
+                                    raise TimeoutError(f"download exceeded {max_time}s")
+                            if not dest:
+                                result.content = sink.getvalue()
+                        if length is not None and offset != length:
+                            raise http.client.IncompleteRead(b"", length - offset)
+                    complete = True
+                except (OSError, http.client.HTTPException) as exc:
+                    result.error = str(exc) or type(exc).__name__
+                    retry = True
+                finally:
+                    release(complete)
+            if not retry or attempts > DOWNLOAD_RETRIES:
+                break
+            time.sleep(DownloadManager.backoff(attempts))
+        done = result.ok
+        result.size = offset if done else 0
+        result.digest = digest.hexdigest() if done else None
+        if resume and dest:
+            DownloadManager._save_partial(url, dest, None if done or not offset else (etag, length))
+        result.duration = time.monotonic() - started
+        Tracer.record("download", "network", started, url=url, status=result.status, bytes=received,
+                      attempts=attempts, resumed=resumed, error=result.error)
+        return result
+
+    @staticmethod
+    def _load_partial(url: str, dest: str, digest) -> Tuple[int, Optional[str], Optional[int]]:
+        """(size, ETag, length) of a partial dest an earlier fetch of url left; its bytes go into digest."""
+        try:
+            with open(f"{dest}.part.json", "r", encoding="utf-8") as handle:
+                saved = json.load(handle)
+            if not isinstance(saved, dict) or saved.get("url") != url:
+                return 0, None, None
+            offset = 0
+            with open(dest, "rb") as handle:
+                for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+                    digest.update(chunk)
+                    offset += len(chunk)
+        except (OSError, ValueError):
+            return 0, None, None
+        length = saved.get("length")
+        if length is not None and offset > length:
+            return 0, None, None
+        return offset, saved.get("etag"), length
+
+    @staticmethod
+    def _save_partial(url: str, dest: str, validators: Optional[Tuple[Optional[str], Optional[int]]]) -> None:
+        """Record dest's validators for the next fetch to resume from, or forget them (None)."""
+        path = f"{dest}.part.json"
+        try:
+            if validators and any(value is not None for value in validators):
+                with open(path, "w", encoding="utf-8") as handle:
+                    json.dump({"url": url, "etag": validators[0], "length": validators[1]}, handle)
+            else:
+                os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            print(f"Could not record partial download of {url}: {exc}")
+
+    @staticmethod
+    def fetch_many(jobs: List[Tuple[str, Optional[str], Optional[Dict[str, str]]]],
+                   parallelism: int = DOWNLOAD_PARALLELISM) -> List[DownloadResult]:
+        """Run (url, dest, headers) jobs at most `parallelism` at a time; results keep job order."""
+        if len(jobs) <= 1 or parallelism <= 1:
+            return [DownloadManager.fetch(url, dest, headers) for url, dest, headers in jobs]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(parallelism, len(jobs))) as pool:
+            return list(pool.map(lambda job: DownloadManager.fetch(*job), jobs))
+
+    @staticmethod
+    def stream(url: str) -> Tuple[Optional[BinaryIO], Callable[[], bool]]:
+        """Open url for reading; return (readable, finish) where finish() reports success."""
+        try:
+            response, release = DownloadManager.open(url)
+        except (OSError, http.client.HTTPException, ValueError) as exc:
+            print(f"Could not start download of {url}: {exc}")
+            return None, lambda: False
+        if not 200 <= response.status < 300:
+            response.read()
+            release(True)
+            print(f"Download of {url} failed: HTTP {response.status}")
+            return None, lambda: False
+        reader = _ResumingResponse(url, response, release)
+
+        def finish() -> bool:
+            try:
+                # Success means the body was read to its end, not cut short
+                complete = reader.read(1) == b""
+            except (OSError, http.client.HTTPException):
+                complete = False
+            reader.release(complete)
+            Tracer.record("download", "network", reader.started, url=url, status=reader.status,
+                          bytes=reader.position, attempts=reader.retries + 1, resumed=reader.resumed)
+            return complete
+
+        return reader, finish
+
+
+class Installer:
+    """Handle tool installation with different methods."""
+
+    # package -> apt candidate version (None: not installable), filled by resolve_apt_packages
+    _apt_candidates: Dict[str, Optional[str]] = {}
+    # Where archives are unpacked before the privileged move (--spool-dir; None: system temp)
+    spool_dir: Optional[str] = None
+    # Held while checking for / installing a prerequisite, so parallel installs bootstrap it once
+    _bootstrap_locks = {"npm": threading.Lock(), "venv": threading.Lock()}
+    # Prerequisites whose bootstrap already failed this run (not retried for every tool)
+    _bootstrap_failed: set = set()
+    # Installing from a bundle (--from-bundle): never fall back to package indexes
+    offline: bool = False
+    # First importable ZSTD_MODULES entry, False when there is none (None: not looked up yet)
+    _zstd = None
+
+    @staticmethod
+    def run_command(cmd: List[str], check: bool = False, capture_output: bool = False, timeout: int = DEFAULT_CMD_TIMEOUT,
+                    cwd: Optional[str] = None) -> "subprocess.CompletedProcess":
+        """Run command with proper error handling and timeout.
+
+        apt/dpkg and snap commands wait for their backend lock, so parallel
+        installs never trip over the dpkg or snapd lock.
+        """
+        lock = InstallEngine.command_lock(cmd)
+        queued = time.monotonic()
+        with lock or contextlib.nullcontext(), \
+                Tracer.span(Tracer.command_name(cmd), "subprocess", cmd=" ".join(cmd)[:TRACE_ARG_MAX]) as span:
+            if lock:
+                span["lock_wait_ms"] = round((time.monotonic() - queued) * 1000, 1)
+            try:
+                result = subprocess.run(
+                    cmd,
+                    check=check,
+                    capture_output=capture_output,
+                    text=True,
+                    timeout=timeout,
+                    **({"cwd": cwd} if cwd else {})
+                )
+            except subprocess.TimeoutExpired:
+                # Return CompletedProcess with timeout exit code (124) to avoid crashes
+                print(f"Command timed out after {timeout}s: {' '.join(cmd)}")
+                result = subprocess.CompletedProcess(cmd, 124)
+            except subprocess.CalledProcessError as e:
+                # Return CompletedProcess with actual error code for consistency
+                print(f"Error running command: {' '.join(cmd)}")
+                print(f"Error: {e}")
+                result = subprocess.CompletedProcess(cmd, e.returncode)
+            except FileNotFoundError:
+                # Command missing from PATH - use standard exit code 127
+                print(f"Command not found: {cmd[0]}")
+                result = subprocess.CompletedProcess(cmd, 127)
+            span["exit"] = result.returncode
+            if result.returncode and isinstance(result.stderr, str) and result.stderr.strip():
+                # Callers mostly drop captured output; keep the tail where it explains a failure
+                span["stderr"] = result.stderr.strip()[-TRACE_ARG_MAX:]
+        return result
+
+    @staticmethod
+    def acquire_sudo() -> bool:
+        """Make sure sudo will not prompt mid-run: ask for the password once, up front.
+
+        Parallel workers' output is buffered, so a prompt from one of them
+        would be invisible, and several could fight over the terminal.
+        """
+        if os.geteuid() == 0 or Installer.run_command(["sudo", "-n", "true"], capture_output=True).returncode == 0:
+            return True
+        print("\n🔑 Installing in parallel needs sudo: enter your password once now.")
+        return Installer.run_command(["sudo", "-v"], timeout=NETWORK_CMD_TIMEOUT).returncode == 0
+
+    @staticmethod
+    @contextlib.contextmanager
+    def sudo_keepalive():
+        """Keep sudo's cached credentials fresh in the background until the block exits."""
+        stop = threading.Event()
+
+        def refresh() -> None:
+            while not stop.wait(SUDO_REFRESH_INTERVAL):
+                Installer.run_command(["sudo", "-n", "-v"], capture_output=True)
+
+        if os.geteuid() != 0:
+            threading.Thread(target=refresh, name="sudo-keepalive", daemon=True).start()
+        try:
+            yield
+        finally:
+            stop.set()
+
+    @staticmethod
+    def linux_goarch() -> Optional[str]:
+        """Map platform.machine() to the Go arch names used in release asset names."""
+        machine = platform.machine().lower()
+        arch_map = {
+            "x86_64": "amd64",
+            "amd64": "amd64",
+            "aarch64": "arm64",
+            "arm64": "arm64",
+            "armv7l": "arm",
+            "armv6l": "arm",
+            "i386": "386",
+            "i686": "386",
+        }
+        return arch_map.get(machine)
+
+    @staticmethod
+    @Tracer.traced("checksum")
+    def sha256_file(path: str) -> str:
+        """Compute SHA-256 hex digest of a file."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def download_file(url: str, dest: str, timeout: int = DOWNLOAD_MAX_TIME,
+                      sha256: Optional[str] = None) -> bool:
+        """Download URL to dest through DownloadManager (no pipe-to-shell).
+
+        Served from ArtifactCache when the bytes are already there and still
+        hash correctly, by expected sha256 if the caller knows it, else by URL.
+        Otherwise downloaded into the cache's resumable slot for url, so a
+        transfer this run cannot finish is continued by the next one.
+        """
+        cached = ArtifactCache.lookup(url=url, digest=sha256)
+        if cached:
+            try:
+                ArtifactCache.materialize(cached, dest)
+                print(f"  Using cached {os.path.basename(dest)}")
+                return True
+            except OSError:
+                pass
+        with contextlib.ExitStack() as stack:
+            try:
+                partial = stack.enter_context(ArtifactCache.partial(url))
+            except OSError:
+                partial = None  # No usable cache: straight to dest, resumable within this run only
+            result = DownloadManager.fetch(url, partial or dest, max_time=timeout, resume=partial is not None)
+            if not (result.ok and result.size > 0):
+                if result.error:
+                    print(f"Download of {url} failed: {result.error}")
+                return False
+            if not partial:
+                ArtifactCache.store(url, dest, digest=result.digest)
+                return True
+            ArtifactCache.commit(url, partial, result.digest)
+            try:
+                ArtifactCache.materialize(ArtifactCache.blob_path(result.digest), dest)
+            except OSError as exc:
+                print(f"Could not place {os.path.basename(dest)}: {exc}")
+                return False
+        return True
+
+    @staticmethod
+    def release_request(repo: str, cached: Optional[dict]) -> Tuple[str, Dict[str, str]]:
+        """(API URL, headers) for a latest-release lookup, conditional on what is cached."""
+        headers = {"Accept": "application/vnd.github+json"}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        return f"{GITHUB_API_URL}/repos/{repo}/releases/latest", headers
+
+    @staticmethod
+    def apply_release_response(repo: str, cached: Optional[dict],
+                               result: DownloadResult) -> Tuple[Optional[str], List[dict]]:
+        """Fold a latest-release API response into ReleaseCache; return (tag_name, assets)."""
+        if result.status == 304 and cached:
+            cached["fetched_at"] = time.time()
+            ReleaseCache.store(repo, cached)
+            return cached.get("tag_name"), cached["assets"]
+        if result.status != 200 or not result.ok:
+            if cached:
+                print(f"Using cached release metadata for {repo} (refresh failed, HTTP {result.status})")
+                return cached.get("tag_name"), cached["assets"]
+            print(f"Failed to fetch release metadata for {repo}")
+            return None, []
+        try:
+            entry = ReleaseCache.compact(json.loads(result.content or b""))
+        except (ValueError, TypeError, AttributeError) as exc:
+            print(f"Failed to parse release metadata for {repo}: {exc}")
+            return None, []
+        entry["etag"] = result.headers.get("etag")
+        entry["last_modified"] = result.headers.get("last-modified")
+        entry["fetched_at"] = time.time()
+        ReleaseCache.store(repo, entry)
+        return entry["tag_name"], entry["assets"]
+
+    @staticmethod
+    def fetch_latest_release_assets(repo: str) -> Tuple[Optional[str], List[dict]]:
+        """Return (tag_name, assets) from GitHub latest release API.
+
+        Served from ReleaseCache while fresh; afterwards revalidated with
+        If-None-Match / If-Modified-Since so an unchanged release costs a 304.
+        """
+        cached = ReleaseCache.load(repo)
+        if cached and ReleaseCache.is_fresh(cached):
+            return cached.get("tag_name"), cached["assets"]
+        url, headers = Installer.release_request(repo, cached)
+        return Installer.apply_release_response(repo, cached, DownloadManager.fetch(url, headers=headers))
+
+    @staticmethod
+    def prefetch_release_metadata(repos: List[str]) -> None:
+        """Refresh release metadata for several repos in parallel, ahead of the installs.
+
+        Later fetch_latest_release_assets calls for these repos are cache hits.
+        """
+        stale = []
+        for repo in dict.fromkeys(repos):
+            cached = ReleaseCache.load(repo)
+            if not (cached and ReleaseCache.is_fresh(cached)):
+                stale.append((repo, cached))
+        if not stale:
+            return
+        jobs = []
+        for repo, cached in stale:
+            url, headers = Installer.release_request(repo, cached)
+            jobs.append((url, None, headers))
+        for (repo, cached), result in zip(stale, DownloadManager.fetch_many(jobs)):
+            Installer.apply_release_response(repo, cached, result)
+
+    @staticmethod
+    def is_plausible_binary(path: str) -> bool:
+        """Reject non-files and non-ELF / non-script downloads before privilege move."""
+        if not os.path.isfile(path) or os.path.getsize(path) == 0:
+            return False
+        try:
+            with open(path, "rb") as handle:
+                magic = handle.read(4)
+        except OSError:
+            return False
+        # Linux ELF binaries (typical eget/croc artifacts) or scripts with shebang
+        if magic == ELF_MAGIC:
+            problem = Installer.elf_incompatibility(path)
+            if problem:
+                print(f"{os.path.basename(path)} cannot run here: {problem}")
+                return False
+            return True
+        return magic.startswith(b"#!")
+
+    @staticmethod
+    def read_elf_header(path: str) -> Optional[Dict[str, object]]:
+        """Read class, byte order, machine and PT_INTERP from an ELF file, or None."""
+        try:
+            with open(path, "rb") as handle:
+                ident = handle.read(16)
+                if len(ident) < 16 or ident[:4] != ELF_MAGIC:
+                    return None
+                elf_class, elf_data = ident[4], ident[5]
+                if elf_class not in (1, 2) or elf_data not in (1, 2):
+                    return None
+                endian = "<" if elf_data == 1 else ">"
+                if elf_class == 2:
+                    layout, ph_layout = "HHIQQQIHHHHHH", "IIQQQQ"
+                else:
+                    layout, ph_layout = "HHIIIIIHHHHHH", "IIIIII"
+                header_size = struct.calcsize(endian + layout)
+                fields = struct.unpack(endian + layout, handle.read(header_size))
+                machine, phoff, phentsize, phnum = fields[1], fields[4], fields[8], fields[9]
+
+                interp = None
+                ph_size = struct.calcsize(endian + ph_layout)
+                if phentsize >= ph_size:
+                    for index in range(min(phnum, 256)):
+                        handle.seek(phoff + index * phentsize)
+                        entry = struct.unpack(endian + ph_layout, handle.read(ph_size))
+                        if entry[0] != ELF_PT_INTERP:
+                            continue
+                        # 64-bit: type, flags, offset, vaddr, paddr, filesz
+                        # 32-bit: type, offset, vaddr, paddr, filesz, memsz
+                        offset, size = (entry[2], entry[5]) if elf_class == 2 else (entry[1], entry[4])
+                        handle.seek(offset)
+                        interp = handle.read(min(size, 4096)).split(b"\0", 1)[0].decode("utf-8", "replace")
+                        break
+        except (OSError, struct.error):
+            return None
+        return {"class": elf_class, "endian": endian, "machine": machine, "interp": interp}
+
+    @staticmethod
+    def elf_incompatibility(path: str) -> Optional[str]:
+        """Explain why an ELF file cannot run on this machine, or None if it can.
+
+        Pure header reads, so a wrong-arch or missing-loader artifact is
+        rejected in microseconds, before sudo mv and before the probes.
+        """
+        header = Installer.read_elf_header(path)
+        if header is None:
+            return "truncated or malformed ELF header"
+        arch = Installer.linux_goarch()
+        expected = ELF_MACHINES.get(arch) if arch else None
+        if expected:
+            machine, elf_class = expected
+            if header["machine"] != machine:
+                return f"built for ELF machine {header['machine']}, this host ({arch}) needs {machine}"
+            if header["class"] != elf_class:
+                return f"{32 if header['class'] == 1 else 64}-bit binary on a {32 if elf_class == 1 else 64}-bit host"
+            if header["endian"] != "<":
+                return "big-endian binary on a little-endian host"
+        interp = header["interp"]
+        if interp and not os.path.exists(interp):
+            return f"needs program interpreter {interp}, which is not installed"
+        return None
+
+    @staticmethod
+    @Tracer.traced("install")
+    def install_binary_to_path(src_path: str, binary_name: str) -> bool:
+        """Validate binary, then install into /usr/local/bin."""
+        if not Installer.is_plausible_binary(src_path):
+            print(f"Refusing to install {binary_name}: failed binary sanity check")
+            return False
+        try:
+            os.chmod(src_path, 0o755)
+        except OSError as exc:
+            print(f"Could not chmod {src_path}: {exc}")
+            return False
+        dest = os.path.join(INSTALL_BIN_DIR, binary_name)
+        move_result = Installer.run_command(
+            ["sudo", "mv", src_path, dest],
+            capture_output=True,
+        )
+        if move_result.returncode != 0:
+            return False
+        return Installer.validate_installed_command(binary_name)
+
+    @staticmethod
+    @Tracer.traced("validate")
+    def validate_installed_command(command: str) -> bool:
+        """Confirm command is on PATH and responds to a version/help probe."""
+        # Something was just installed; PathIndex also covers INSTALL_BIN_DIR,
+        # which this process's PATH may not include yet
+        PathIndex.invalidate()
+        invoke = PathIndex.find(command)
+        if invoke is None:
+            print(f"Post-install check failed: {command} not found in PATH")
+            return False
+
+        # The learned flag, or --version on a cold run, is tried alone; the
+        # other flags are raced only when it fails or times out
+        learned = ProbeFlagCache.get(command)
+        first = learned or PROBE_FLAGS[0]
+        result = Installer.run_command(
+            [invoke, first],
+            capture_output=True,
+            timeout=VALIDATE_CMD_TIMEOUT,
+        )
+        if Installer.probe_accepted(result):
+            if first != learned:
+                ProbeFlagCache.remember(command, first)
+            print(f"  ✓ Verified {command} responds to '{first}'")
+            return True
+
+        flag = Installer.race_probes(invoke, [f for f in PROBE_FLAGS if f != first])
+        if flag:
+            ProbeFlagCache.remember(command, flag)
+            print(f"  ✓ Verified {command} responds to '{flag}'")
+            return True
+
+        print(f"Post-install check failed: {command} did not respond to version/help probes")
+        return False
+
+    @staticmethod
+    def probe_accepted(result: "subprocess.CompletedProcess") -> bool:
+        """Accept success, or help/version text even when the exit code is non-zero."""
+        if result.returncode == 124:
+            return False
+        output = ((result.stdout or "") + (result.stderr or "")).strip()
+        return result.returncode == 0 or bool(output and result.returncode in (1, 2))
+
+    @staticmethod
+    @Tracer.traced("validate")
+    def race_probes(invoke: str, flags: List[str]) -> Optional[str]:
+        """Run every probe at once; return the first accepted flag and kill the rest.
+
+        Run one after another, a TUI that ignores the early flags costs a full
+        VALIDATE_CMD_TIMEOUT per flag. Each probe gets its own session so a
+        kill also takes down anything it spawned.
+        """
+        if not flags:
+            return None
+        procs: Dict[str, subprocess.Popen] = {}
+        settled = threading.Event()
+        # Pool threads do not inherit this thread's span tags (tool, method)
+        tags = getattr(Tracer._local, "tags", {})
+
+        def probe(flag: str) -> Tuple[str, bool]:
+            with Tracer.tagged(**tags), \
+                    Tracer.span(Tracer.command_name([invoke]), "subprocess", cmd=f"{invoke} {flag}"[:TRACE_ARG_MAX],
+                                flag=flag) as span:
+                try:
+                    proc = subprocess.Popen(
+                        [invoke, flag],
+                        stdin=subprocess.DEVNULL,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE,
+                        text=True,
+                        start_new_session=True,
+                    )
+                except OSError:
+                    span["exit"] = 127
+                    return flag, False
+                procs[flag] = proc
+                if settled.is_set():
+                    # Another flag already won while this one was starting
+                    Installer._kill_probe(proc)
+                try:
+                    stdout, stderr = proc.communicate(timeout=VALIDATE_CMD_TIMEOUT)
+                except subprocess.TimeoutExpired:
+                    Installer._kill_probe(proc)
+                    proc.communicate()
+                    span.update(exit=124, killed=True)
+                    return flag, False
+                # Killed because another flag won: SIGKILL shows as a negative return code
+                span.update(exit=proc.returncode, killed=proc.returncode < 0)
+                return flag, Installer.probe_accepted(
+                    subprocess.CompletedProcess([invoke, flag], proc.returncode, stdout, stderr)
+                )
+
+        winner: Optional[str] = None
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(flags)) as pool:
+            for future in concurrent.futures.as_completed([pool.submit(probe, flag) for flag in flags]):
+                flag, accepted = future.result()
+                if accepted and winner is None:
+                    winner = flag
+                    settled.set()
+                    for other, proc in list(procs.items()):
+                        if other != flag and proc.poll() is None:
+                            Installer._kill_probe(proc)
+        return winner
+
+    @staticmethod
+    def _kill_probe(proc: "subprocess.Popen") -> None:
+        """Kill a probe and its process group."""
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except (AttributeError, OSError):
+            try:
+                proc.kill()
+            except OSError:
+                pass
+
+    @staticmethod
+    def verify_checksum(path: str, expected_hex: str) -> bool:
+        """Compare file SHA-256 to expected hex digest."""
+        return Installer.digests_match(path, expected_hex, Installer.sha256_file(path))
+
+    @staticmethod
+    def digests_match(label: str, expected_hex: str, actual_hex: str) -> bool:
+        """Compare two hex digests, reporting a mismatch for label."""
+        expected = expected_hex.strip().lower()
+        actual = actual_hex.strip().lower()
+        if actual != expected:
+            print(f"Checksum mismatch for {label}")
+            print(f"  expected: {expected}")
+            print(f"  actual:   {actual}")
+            return False
+        return True
+
+    @staticmethod
+    def parse_checksums_file(content: str) -> Dict[str, str]:
+        """Parse 'hash  filename' lines into {basename: hash}."""
+        mapping: Dict[str, str] = {}
+        for line in content.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split()
+            if len(parts) < 2:
+                continue
+            digest, name = parts[0], parts[-1]
+            # Allow "hash *filename" (binary mode marker)
+            name = name.lstrip("*")
+            mapping[os.path.basename(name)] = digest
+        return mapping
+    
+    @staticmethod
+    def install_via_apt(package: str) -> bool:
+        """Install package via apt-get (never from a bundle, which must not touch the network)."""
+        if Installer.offline:
+            print(f"{package} is missing and was not installed from the bundle")
+            return False
+        print(f"Installing {package} via apt...")
+        result = Installer.run_command(
+            ["sudo", "apt-get", "install", "-y", package],
+            capture_output=True,
+            timeout=NETWORK_CMD_TIMEOUT,
+        )
+        return result.returncode == 0
+    
+    @staticmethod
+    @Tracer.traced("install")
+    def install_apt_batch(packages: List[str]) -> List[str]:
+        """Install packages in one apt-get transaction; return the ones that failed.
+
+        A single transaction reads the dpkg database, solves dependencies and
+        runs triggers (man-db, desktop-database) once instead of once per
+        package. apt refuses the whole batch if any one package is broken, so
+        on failure the batch is bisected until the culprits are isolated.
+        """
+        if not packages:
+            return []
+        print(f"Installing {len(packages)} package(s) via apt in one transaction...")
+        return Installer._bisect_apt_install(list(packages))
+
+    @staticmethod
+    def _bisect_apt_install(packages: List[str]) -> List[str]:
+        """Try packages as one transaction, halving on failure."""
+        result = Installer.run_command(
+            ["sudo", "apt-get", "install", "-y"] + packages,
+            capture_output=True,
+            timeout=min(NETWORK_CMD_TIMEOUT * len(packages), APT_BATCH_MAX_TIMEOUT),
+        )
+        if result.returncode == 0:
+            return []
+        if len(packages) == 1:
+            print(f"apt could not install {packages[0]}")
+            return packages
+        print(f"apt batch of {len(packages)} failed, splitting to isolate the failure...")
+        mid = len(packages) // 2
+        return Installer._bisect_apt_install(packages[:mid]) + Installer._bisect_apt_install(packages[mid:])
+
+    @staticmethod
+    def install_via_pip(package: str, command: Optional[str] = None) -> bool:
+        """Install package into the managed venv and link its `command` (default: package)."""
+        if Installer.install_pip_batch([package]):
+            return False
+        return Installer.link_venv_command(command or package)
+
+    @staticmethod
+    def venv_python() -> str:
+        return os.path.join(PIP_VENV_DIR, "bin", "python")
+
+    @staticmethod
+    def venv_needs_apt() -> bool:
+        """True when the venv is still to be created and this Python lacks ensurepip.
+
+        Debian splits ensurepip out into the python3-venv package.
+        """
+        return not os.path.isfile(Installer.venv_python()) and importlib.util.find_spec("ensurepip") is None
+
+    @staticmethod
+    def create_venv() -> bool:
+        """Create PIP_VENV_DIR, pulling in python3-venv first when venv cannot work without it."""
+        if Installer.venv_needs_apt() and not Installer.install_via_apt("python3-venv"):
+            return False
+        result = Installer.run_command(
+            [sys.executable, "-m", "venv", PIP_VENV_DIR],
+            capture_output=True,
+            timeout=NETWORK_CMD_TIMEOUT,
+        )
+        return result.returncode == 0 and os.path.isfile(Installer.venv_python())
+
+    @staticmethod
+    def ensure_venv() -> bool:
+        return Installer.ensure_prerequisite(
+            "venv", lambda: Installer.create_venv(),
+            present=lambda: os.path.isfile(Installer.venv_python()),
+        )
+
+    @staticmethod
+    def pip_command(*args: str) -> List[str]:
+        return [Installer.venv_python(), "-m", "pip", "--disable-pip-version-check", *args]
+
+    @staticmethod
+    @Tracer.traced("install")
+    def install_pip_batch(packages: List[str]) -> List[str]:
+        """Install packages into the managed venv in one pip resolve; return the ones that failed.
+
+        Everything is installed with --no-index from PIP_WHEELHOUSE. Only when
+        that cannot be satisfied does pip wheel fetch or build the missing
+        wheels into it, so warm runs and hosts sharing the wheelhouse never
+        touch PyPI. A failed batch is bisected like the apt one.
+        """
+        if not packages:
+            return []
+        if not Installer.ensure_venv():
+            return list(packages)
+        try:
+            os.makedirs(PIP_WHEELHOUSE, exist_ok=True)
+        except OSError as exc:
+            print(f"Could not create wheel cache {PIP_WHEELHOUSE}: {exc}")
+            return list(packages)
+        print(f"Installing {len(packages)} package(s) via pip into {PIP_VENV_DIR}...")
+        return Installer._bisect_pip_install(list(packages))
+
+    @staticmethod
+    def _bisect_pip_install(packages: List[str]) -> List[str]:
+        """Try packages as one pip install, halving on failure."""
+        if Installer._pip_install(packages):
+            return []
+        if len(packages) == 1:
+            print(f"pip could not install {packages[0]}")
+            return packages
+        print(f"pip batch of {len(packages)} failed, splitting to isolate the failure...")
+        mid = len(packages) // 2
+        return Installer._bisect_pip_install(packages[:mid]) + Installer._bisect_pip_install(packages[mid:])
+
+    @staticmethod
+    def _pip_install(packages: List[str]) -> bool:
+        offline = Installer.pip_command("install", "--no-index", "--find-links", PIP_WHEELHOUSE, *packages)
+        timeout = min(NETWORK_CMD_TIMEOUT * len(packages), APT_BATCH_MAX_TIMEOUT)
+        if Installer.run_command(offline, capture_output=True, timeout=timeout).returncode == 0:
+            return True
+        if Installer.offline:
+            return False
+        wheel = Installer.run_command(
+            Installer.pip_command("wheel", "--wheel-dir", PIP_WHEELHOUSE, "--find-links", PIP_WHEELHOUSE,
+                                  *packages),
+            capture_output=True,
+            timeout=timeout,
+        )
+        if wheel.returncode != 0:
+            return False
+        return Installer.run_command(offline, capture_output=True, timeout=timeout).returncode == 0
+
+    @staticmethod
+    def link_venv_command(command: str) -> bool:
+        """Symlink the venv's `command` entry point into INSTALL_BIN_DIR."""
+        source = os.path.join(PIP_VENV_DIR, "bin", command)
+        if not os.path.isfile(source):
+            print(f"pip installed no '{command}' command")
+            return False
+        result = Installer.run_command(
+            ["sudo", "ln", "-sfn", source, os.path.join(INSTALL_BIN_DIR, command)],
+            capture_output=True,
+        )
+        return result.returncode == 0
+
+    @staticmethod
+    @Tracer.traced("bootstrap")
+    def ensure_prerequisite(name: str, install: Callable[[], bool],
+                            present: Optional[Callable[[], bool]] = None) -> bool:
+        """Make sure prerequisite `name` exists, installing it at most once per run.
+
+        present() says whether it is already there (default: command `name` is on PATH).
+        """
+        with Installer._bootstrap_locks[name]:
+            if present() if present else SystemChecker.has_command(name):
+                return True
+            if name in Installer._bootstrap_failed:
+                print(f"{name} could not be installed earlier, skipping")
+                return False
+            print(f"{name} not found, installing {name} first...")
+            if install():
+                return True
+            print(f"Could not install {name}")
+            Installer._bootstrap_failed.add(name)
+            return False
+
+    @staticmethod
+    def ensure_npm() -> bool:
+        return Installer.ensure_prerequisite("npm", lambda: Installer.install_via_apt("npm"))
+
+    @staticmethod
+    def install_via_npm(package: str) -> bool:
+        """Install a global npm package, pulling in npm itself if it is absent.
+
+        Node is not part of a base Debian install, so the one tool that ships
+        this way would otherwise fail on a clean machine with a bare
+        "npm: not found".
+        """
+        if not Installer.ensure_npm():
+            return False
+        print(f"Installing {package} via npm...")
+        result = Installer.run_command(
+            ["sudo", "npm", "install", "-g", package],
+            capture_output=True,
+            timeout=NETWORK_CMD_TIMEOUT,
+        )
+        return result.returncode == 0
+
+    @staticmethod
+    def install_via_snap(package: str, classic: bool = False) -> bool:
+        """Install package via snap."""
+        print(f"Installing {package} via snap...")
+        cmd = ["sudo", "snap", "install"]
+        if classic:
+            cmd.append("--classic")
+        cmd.append(package)
+        result = Installer.run_command(cmd, capture_output=True, timeout=NETWORK_CMD_TIMEOUT)
+        return result.returncode == 0
+    
+    @staticmethod
+    @Tracer.traced("install")
+    def install_via_eget(repo: str, binary_name: str) -> bool:
+        """Install binary_name from the latest GitHub release of repo, choosing the asset like eget.
+
+        Resolved in-process from ReleaseCache metadata and fetched through the
+        same verified download/extract path as croc: no eget binary, no extra
+        API call, nothing written to the working directory.
+        """
+        print(f"Installing {binary_name} from {repo} releases...")
+        with tempfile.TemporaryDirectory(prefix="release-", dir=Installer.spool_dir) as tmpdir:
+            extracted = Installer.fetch_release_binary(repo, binary_name, tmpdir)
+            if not extracted:
+                return False
+            return Installer.install_binary_to_path(extracted, binary_name)
+
+    @staticmethod
+    def score_release_asset(name: str, binary_name: str, arch: Optional[str]) -> Optional[int]:
+        """How well a release asset fits this host (higher is better), or None if it cannot be used.
+
+        Usable means Linux, this arch (arch None: no arch in the name at all),
+        and an archive the installer unpacks or a bare binary. Among those,
+        assets named for the binary win. musl builds are preferred next,
+        because they are static and have no glibc version floor. Debug and
+        symbol builds lose.
+        """
+        lowered = name.lower()
+        bounded = r"(?<![a-z0-9])(?:{})(?![a-z0-9])"
+        if "linux" not in lowered or re.search(bounded.format(RELEASE_OTHER_OS), lowered):
+            return None
+        if arch is None:
+            if any(re.search(bounded.format(pattern), lowered) for pattern in RELEASE_ARCH_PATTERNS.values()):
+                return None
+        elif not re.search(bounded.format(RELEASE_ARCH_PATTERNS[arch]), lowered):
+            return None
+        # No short alphabetic extension after the last dot: a bare binary ("fd-v9-linux-amd64")
+        extension = re.search(r"\.[a-z][a-z0-9]{0,9}$", lowered)
+        if extension and not Installer.archive_suffix(lowered):
+            return None
+        score = 0
+        if binary_name.lower() in lowered:
+            score += 4
+        if "musl" in lowered:
+            score += 1
+        if re.search(bounded.format(r"debug|dbg|symbols"), lowered):
+            score -= 3
+        return score
+
+    @staticmethod
+    def select_release_asset(assets: List[dict], binary_name: str, arch: str) -> Optional[dict]:
+        """The best-scoring usable asset.
+
+        Ties go to the shortest name apart from its archive suffix (fewest
+        qualifiers), then to the first by name, which puts a bare binary or
+        .tar.gz ahead of the same build as .tar.xz, .tar.zst or .zip. When
+        nothing names this arch, the Linux builds that name no arch at all
+        ("xplr-linux.tar.gz") are chosen from the same way, as eget does.
+        """
+        def usable(for_arch: Optional[str]) -> list:
+            scored = []
+            for asset in assets:
+                name = asset.get("name") or ""
+                score = Installer.score_release_asset(name, binary_name, for_arch) \
+                    if asset.get("browser_download_url") else None
+                if score is not None:
+                    scored.append((-score, len(name) - len(Installer.archive_suffix(name)), name, asset))
+            return scored
+
+        scored = usable(arch) or usable(None)
+        return min(scored, key=lambda entry: entry[:3])[3] if scored else None
+
+    @staticmethod
+    def archive_suffix(name: str) -> str:
+        """The RELEASE_ARCHIVE_TYPES suffix name ends with, if this host can unpack it; else ""."""
+        lowered = name.lower()
+        for suffix, kind in RELEASE_ARCHIVE_TYPES.items():
+            if lowered.endswith(suffix):
+                return "" if kind == "zst" and not Installer.zstd_module() else suffix
+        return ""
+
+    @staticmethod
+    def zstd_module():
+        """The first importable ZSTD_MODULES entry, or None (looked up once per run)."""
+        if Installer._zstd is None:
+            Installer._zstd = False
+            for name in ZSTD_MODULES:
+                try:
+                    Installer._zstd = importlib.import_module(name)
+                    break
+                except ImportError:
+                    continue
+        return Installer._zstd or None
+
+    @staticmethod
+    def release_checksum(assets: List[dict], asset: dict, dest_dir: str) -> Tuple[bool, Optional[str]]:
+        """(usable, expected SHA-256) for asset: GitHub's digest, else a published checksum file.
+
+        usable is False when a checksum file exists but cannot be read, so a
+        download that could have been verified is never installed unverified.
+        """
+        digest = asset.get("digest") or ""
+        if digest.startswith("sha256:"):
+            return True, digest[len("sha256:"):]
+        name = asset["name"]
+        candidates = [a for a in assets if a.get("name") in (f"{name}.sha256", f"{name}.sha256sum")]
+        candidates += [a for a in assets if re.search(r"checksums?|sha256sums?", (a.get("name") or "").lower())
+                       and not a["name"].lower().endswith((".sig", ".asc", ".pem", ".sbom", ".json"))]
+        for checksum_asset in candidates:
+            path = os.path.join(dest_dir, checksum_asset["name"])
+            if not checksum_asset.get("browser_download_url") or \
+                    not Installer.download_file(checksum_asset["browser_download_url"], path):
+                print(f"Could not download {checksum_asset['name']}; refusing unverified {name}")
+                return False, None
+            try:
+                with open(path, "r", encoding="utf-8", errors="replace") as handle:
+                    content = handle.read()
+                os.unlink(path)
+            except OSError as exc:
+                print(f"Could not read {checksum_asset['name']}: {exc}")
+                return False, None
+            if checksum_asset["name"].startswith(name):
+                return True, (content.split() or [None])[0]
+            expected = Installer.parse_checksums_file(content).get(name)
+            if expected:
+                return True, expected
+        return True, None
+
+    @staticmethod
+    def fetch_release_binary(repo: str, binary_name: str, dest_dir: str) -> Optional[str]:
+        """Resolve, download and verify binary_name from repo's latest release into dest_dir."""
+        arch = Installer.linux_goarch()
+        if not arch:
+            print(f"Unsupported architecture for GitHub release binaries: {platform.machine()}")
+            return None
+        tag, assets = Installer.fetch_latest_release_assets(repo)
+        if not tag or not assets:
+            print(f"No release assets found for {repo}")
+            return None
+        asset = Installer.select_release_asset(assets, binary_name, arch)
+        if not asset:
+            print(f"No Linux {arch} asset for {binary_name} in {repo} {tag}")
+            return None
+        usable, expected = Installer.release_checksum(assets, asset, dest_dir)
+        if not usable:
+            return None
+        name, url = asset["name"], asset["browser_download_url"]
+        print(f"  {repo} {tag}: {name}" + ("" if expected else " (no published checksum)"))
+        if Installer.archive_suffix(name):
+            return Installer.fetch_archive_member(url, name, binary_name, dest_dir, sha256=expected)
+        target = os.path.join(dest_dir, binary_name)
+        if not Installer.download_file(url, target, sha256=expected):
+            print(f"Failed to download {name}")
+            return None
+        if expected and not Installer.digests_match(name, expected, Installer.sha256_file(target)):
+            os.unlink(target)
+            return None
+        return target
+    
+    @staticmethod
+    def open_url_stream(url: str) -> Tuple[Optional[BinaryIO], Callable[[], bool]]:
+        """Start streaming url; return (readable, finish) where finish() reports success."""
+        return DownloadManager.stream(url)
+
+    @staticmethod
+    def fetch_archive_member(url: str, archive_name: str, member_name: str, dest_dir: str,
+                             sha256: Optional[str] = None) -> Optional[str]:
+        """Stream a release tarball, extracting one member as the bytes arrive.
+
+        The archive is hashed while it is decompressed, and the only copy
+        that reaches disk is the one kept in ArtifactCache, written as it
+        streams. The wanted member lands in dest_dir. Nothing is returned
+        until the whole archive has been hashed and matches sha256 (when
+        given), so a tampered archive never yields a file to install.
+        A .zip cannot be unpacked as it streams and goes to fetch_zip_member.
+        Returns the extracted path, or None.
+        """
+        kind = RELEASE_ARCHIVE_TYPES.get(Installer.archive_suffix(archive_name))
+        if kind is None:
+            print(f"Cannot unpack {archive_name}: unsupported archive type")
+            return None
+        if kind == "zip":
+            return Installer.fetch_zip_member(url, archive_name, member_name, dest_dir, sha256=sha256)
+        cached = ArtifactCache.lookup(url=url, digest=sha256, verify=False)
+        if cached:
+            with open(cached, "rb") as handle:
+                extracted, digest = Installer._extract_from_stream(handle, None, member_name, dest_dir, kind)
+            # The blob's name is its digest, so the streamed hash doubles as a cache check
+            if digest == os.path.basename(cached) and (not sha256 or digest == sha256.strip().lower()):
+                if extracted:
+                    print(f"  Using cached {archive_name}")
+                    return extracted
+                print(f"{member_name} binary not found inside {archive_name}")
+                return None
+            ArtifactCache.discard(cached)
+
+        stream, finish = Installer.open_url_stream(url)
+        if stream is None:
+            print(f"Failed to download {archive_name}")
+            return None
+        try:
+            tee_path = ArtifactCache.reserve()
+        except OSError:
+            tee_path = None  # No usable cache: stream straight through
+        try:
+            if tee_path:
+                with open(tee_path, "wb") as tee:
+                    extracted, digest = Installer._extract_from_stream(stream, tee, member_name, dest_dir, kind)
+            else:
+                extracted, digest = Installer._extract_from_stream(stream, None, member_name, dest_dir, kind)
+        finally:
+            ok = finish()
+        verified = ok and digest is not None
+        if not verified:
+            print(f"Failed to download {archive_name}")
+        elif sha256 and not Installer.digests_match(archive_name, sha256, digest):
+            verified = False
+        elif not extracted:
+            print(f"{member_name} binary not found inside {archive_name}")
+
+        if tee_path:
+            if verified:
+                ArtifactCache.commit(url, tee_path, digest)
+            else:
+                ArtifactCache.discard(tee_path)
+        if extracted and not verified:
+            # Never leave bytes from an unverified archive where a caller could pick them up
+            os.unlink(extracted)
+            return None
+        return extracted
+
+    @staticmethod
+    @Tracer.traced("extract")
+    def _extract_from_stream(source: BinaryIO, tee: Optional[BinaryIO], member_name: str, dest_dir: str,
+                             kind: str = "gz") -> Tuple[Optional[str], Optional[str]]:
+        """Single forward pass over a compressed tar: (extracted path or None, sha256 or None).
+
+        kind is a RELEASE_ARCHIVE_TYPES tar compression. Reading stops
+        decompressing at the first matching member; the rest is only hashed.
+        """
+        reader = _HashingReader(source, tee)
+        extracted = None
+        errors = (tarfile.TarError, OSError, EOFError, zlib.error, http.client.HTTPException)
+        if kind == "xz":
+            errors += (lzma.LZMAError,)
+        elif kind == "zst":
+            errors += (Installer.zstd_module().ZstdError,)
+        try:
+            stream, mode = (Installer.zstd_reader(reader), "r|") if kind == "zst" else (reader, f"r|{kind}")
+            with tarfile.open(fileobj=stream, mode=mode) as tar:
+                for member in tar:
+                    if pathlib.Path(member.name).name != member_name or not member.isfile():
+                        continue
+                    # Written under a fixed name, so member paths cannot escape dest_dir
+                    target = os.path.join(dest_dir, member_name)
+                    member_file = tar.extractfile(member)
+                    with open(target, "wb") as out:
+                        shutil.copyfileobj(member_file, out, 1024 * 1024)
+                    extracted = target
+                    break
+                # Hash the rest of the archive without decompressing it
+                reader.drain()
+        except errors as exc:
+            print(f"Failed to extract {member_name} from archive: {exc}")
+            try:
+                reader.drain()
+            except (OSError, http.client.HTTPException):
+                return None, None
+            return None, reader.hexdigest()
+        return extracted, reader.hexdigest()
+
+    @staticmethod
+    def zstd_reader(source: BinaryIO) -> BinaryIO:
+        """Readable decompressing view of a zstd stream, from whichever ZSTD_MODULES entry is present."""
+        module = Installer.zstd_module()
+        if module.__name__ == "zstandard":
+            return module.ZstdDecompressor().stream_reader(source, read_across_frames=True)
+        return module.ZstdFile(source)
+
+    @staticmethod
+    def fetch_zip_member(url: str, archive_name: str, member_name: str, dest_dir: str,
+                         sha256: Optional[str] = None) -> Optional[str]:
+        """Download a .zip release archive, verify it, then extract one member into dest_dir.
+
+        A zip's index is at its end, so it is downloaded (through
+        ArtifactCache, like any other artifact) before anything is unpacked;
+        the central directory then leads straight to the wanted member, and
+        no other member is decompressed. Returns the extracted path, or None.
+        """
+        archive = os.path.join(dest_dir, f".{archive_name}")
+        try:
+            if not Installer.download_file(url, archive, sha256=sha256):
+                print(f"Failed to download {archive_name}")
+                return None
+            if sha256 and not Installer.digests_match(archive_name, sha256, Installer.sha256_file(archive)):
+                return None
+            extracted = Installer._extract_from_zip(archive, member_name, dest_dir)
+            if not extracted:
+                print(f"{member_name} binary not found inside {archive_name}")
+            return extracted
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(archive)
+
+    @staticmethod
+    @Tracer.traced("extract")
+    def _extract_from_zip(path: str, member_name: str, dest_dir: str) -> Optional[str]:
+        """Extract the first regular file called member_name from the zip at path; return its path."""
+        try:
+            with zipfile.ZipFile(path) as archive:
+                for info in archive.infolist():
+                    if pathlib.PurePosixPath(info.filename).name != member_name or info.is_dir() \
+                            or stat.S_ISLNK(info.external_attr >> 16):
+                        continue
+                    # Written under a fixed name, so member paths cannot escape dest_dir
+                    target = os.path.join(dest_dir, member_name)
+                    with archive.open(info) as member_file, open(target, "wb") as out:
+                        shutil.copyfileobj(member_file, out, 1024 * 1024)
+                    return target
+        except (zipfile.BadZipFile, zipfile.LargeZipFile, NotImplementedError, RuntimeError,
+                OSError, EOFError, zlib.error) as exc:
+            print(f"Failed to extract {member_name} from {os.path.basename(path)}: {exc}")
+        return None
+
+    @staticmethod
+    @Tracer.traced("install")
+    def install_croc() -> bool:
+        """Install croc from GitHub releases with checksum verification (no curl|bash)."""
+        print("Installing croc from GitHub releases with checksum verification...")
+        with tempfile.TemporaryDirectory(prefix="croc-install-", dir=Installer.spool_dir) as tmpdir:
+            extracted = Installer.fetch_croc(tmpdir)
+            if not extracted:
+                return False
+            return Installer.install_binary_to_path(extracted, "croc")
+
+    @staticmethod
+    def fetch_croc(dest_dir: str) -> Optional[str]:
+        """Download croc into dest_dir, verified against its published checksums; return its path."""
+        arch = Installer.linux_goarch()
+        if not arch:
+            print(f"Unsupported architecture for croc: {platform.machine()}")
+            return None
+
+        # croc asset naming uses 64bit/ARM64 style labels
+        arch_to_croc = {
+            "amd64": "64bit",
+            "386": "32bit",
+            "arm64": "ARM64",
+            "arm": "ARM",
+        }
+        croc_arch = arch_to_croc.get(arch)
+        if not croc_arch:
+            print(f"No croc asset mapping for arch {arch}")
+            return None
+
+        tag, assets = Installer.fetch_latest_release_assets("schollz/croc")
+        if not tag or not assets:
+            return None
+
+        asset_name = f"croc_{tag}_Linux-{croc_arch}.tar.gz"
+        checksum_name = f"croc_{tag}_checksums.txt"
+        asset = next((a for a in assets if a.get("name") == asset_name), None)
+        checksum_asset = next((a for a in assets if a.get("name") == checksum_name), None)
+        if not asset or not asset.get("browser_download_url"):
+            print(f"No croc release asset named {asset_name}")
+            return None
+        if not checksum_asset or not checksum_asset.get("browser_download_url"):
+            print(f"No croc checksum file {checksum_name}; refusing unsigned install")
+            return None
+
+        checksum_path = os.path.join(dest_dir, checksum_name)
+        # Checksums first: the archive is verified while it streams in
+        if not Installer.download_file(checksum_asset["browser_download_url"], checksum_path):
+            print("Failed to download croc checksums")
+            return None
+
+        try:
+            with open(checksum_path, "r", encoding="utf-8") as handle:
+                checksums = Installer.parse_checksums_file(handle.read())
+            os.unlink(checksum_path)
+        except OSError as exc:
+            print(f"Failed to read croc checksums: {exc}")
+            return None
+
+        expected = checksums.get(asset_name)
+        if not expected:
+            print(f"Checksum entry missing for {asset_name}")
+            return None
+        return Installer.fetch_archive_member(
+            asset["browser_download_url"], asset_name, "croc", dest_dir, sha256=expected,
+        )
+
+    @staticmethod
+    def parse_apt_policy(content: str) -> Dict[str, Optional[str]]:
+        """Parse `apt-cache policy` output into {package: candidate or None}."""
+        candidates: Dict[str, Optional[str]] = {}
+        current: Optional[str] = None
+        for line in content.splitlines():
+            if line and not line[0].isspace() and line.rstrip().endswith(":"):
+                # Stanza header: "vim:" or, for foreign architectures, "libc6:i386:"
+                current = line.split(":", 1)[0].strip()
+                candidates[current] = None
+                continue
+            key, _, value = line.strip().partition(":")
+            if current and key == "Candidate":
+                value = value.strip()
+                candidates[current] = None if value in ("", "(none)") else value
+        return candidates
+
+    @staticmethod
+    @Tracer.traced("apt")
+    def resolve_apt_packages(packages: List[str]) -> Dict[str, Optional[str]]:
+        """Resolve availability and candidate version for many packages in one apt-cache call.
+
+        Results are remembered so check_apt_available can answer from memory
+        instead of regex-scanning the whole package cache once per tool.
+        Packages apt has never heard of resolve to None.
+        """
+        if not packages:
+            return {}
+        result = Installer.run_command(
+            ["apt-cache", "policy"] + list(packages),
+            capture_output=True,
+        )
+        if result.returncode != 0:
+            # Leave the cache empty so check_apt_available falls back to a search
+            return {}
+        parsed = Installer.parse_apt_policy(result.stdout or "")
+        resolved = {package: parsed.get(package) for package in packages}
+        Installer._apt_candidates.update(resolved)
+        return resolved
+
+    @staticmethod
+    @Tracer.traced("apt")
+    def check_apt_available(package: str) -> bool:
+        """Check if package is available in apt repositories."""
+        if package in Installer._apt_candidates:
+            return Installer._apt_candidates[package] is not None
+        # Regex anchors (^$) ensure exact match, not substring
+        result = Installer.run_command(
+            ["apt-cache", "search", "--names-only", "^" + package + "$"],
+            capture_output=True
+        )
+        return result.returncode == 0 and package in result.stdout
+
+
+class ToolManager:
+    """Manage tool definitions and installation."""
+    
+    # Define all tools from README.md
+    TOOLS: Dict[str, Tool] = {
+        # Desktop GUI Apps
+        "geany": Tool("geany", "geany", InstallMethod.APT, "geany",
+                     "GUI editor like notepad++", "Desktop GUI Apps", requires_gui=True),
+        "wireshark": Tool("wireshark", "wireshark", InstallMethod.APT, "wireshark",
+                         "Network packet reviewer", "Desktop GUI Apps", requires_gui=True),
+        "code": Tool("code", "code", InstallMethod.SNAP, "code",
+                    "Visual Studio Code", "Desktop GUI Apps", classic=True, requires_gui=True),
+        "guake": Tool("guake", "guake", InstallMethod.APT, "guake",
+                     "GUI terminal client", "Desktop GUI Apps", requires_gui=True),
+        "tabby": Tool("tabby", "tabby", InstallMethod.EGET, "tabby",
+                     "Modern terminal emulator", "Desktop GUI Apps",
+                     github_repo="Eugeny/tabby", requires_gui=True),
+        
+        # Terminal File Explorers
+        "xplr": Tool("xplr", "xplr", InstallMethod.EGET, "xplr",
+                    "Very graphical file explorer", "Terminal File Explorers",
+                    github_repo="sayanarijit/xplr"),
+        "nnn": Tool("nnn", "nnn", InstallMethod.APT, "nnn",
+                   "Efficient file explorer", "Terminal File Explorers"),
+        "lf": Tool("lf", "lf", InstallMethod.EGET, "lf",
+                  "Cross-platform file explorer", "Terminal File Explorers",
+                  github_repo="gokcehan/lf"),
+        
+        # LS-like Directory Viewers
+        "eza": Tool("eza", "eza", InstallMethod.EGET, "eza",
+                   "Modern ls replacement (exa successor)", "LS-like Directory Viewers",
+                   github_repo="eza-community/eza"),
+        "lsd": Tool("lsd", "lsd", InstallMethod.EGET, "lsd",
+                   "ls clone with icons", "LS-like Directory Viewers",
+                   github_repo="lsd-rs/lsd"),
+        
+        # Text Editors and Viewers
+        "micro": Tool("micro", "micro", InstallMethod.EGET, "micro",
+                     "User-friendly terminal editor", "Text Editors and Viewers",
+                     github_repo="micro-editor/micro"),
+        "ne": Tool("ne", "ne", InstallMethod.APT, "ne",
+                  "Terminal editor like nano", "Text Editors and Viewers"),
+        "vim": Tool("vim", "vim", InstallMethod.APT, "vim",
+                   "VI editor with extras", "Text Editors and Viewers"),
+        "nvim": Tool("nvim", "nvim", InstallMethod.APT, "neovim",
+                    "Modern vim alternative", "Text Editors and Viewers"),
+        "bat": Tool("bat", "batcat", InstallMethod.APT, "bat",
+                   "cat clone with syntax highlighting", "Text Editors and Viewers"),
+        
+        # Process Explorers
+        "glances": Tool("glances", "glances", InstallMethod.PIP, "glances",
+                       "System info in one glance", "Process Explorers"),
+        "htop": Tool("htop", "htop", InstallMethod.APT, "htop",
+                    "Supercharged top clone", "Process Explorers"),
+        "btop": Tool("btop", "btop", InstallMethod.EGET, "btop",
+                    "TUI CLI graphics process monitor", "Process Explorers",
+                    github_repo="aristocratos/btop"),
+        "bottom": Tool("bottom", "btm", InstallMethod.EGET, "btm",
+                      "btop-inspired process monitor", "Process Explorers",
+                      github_repo="ClementTsang/bottom"),
+        
+        # Network-Related Apps
+        "croc": Tool("croc", "croc", InstallMethod.MANUAL, "croc",
+                    "Secure file transfer", "Network-Related Apps"),
+        "network-manager": Tool("nmtui", "nmtui", InstallMethod.APT, "network-manager",
+                               "Terminal Network Manager", "Network-Related Apps"),
+        "hping3": Tool("hping3", "hping3", InstallMethod.APT, "hping3",
+                      "Advanced ping tool", "Network-Related Apps"),
+        "nmap": Tool("nmap", "nmap", InstallMethod.APT, "nmap",
+                    "Network scanner", "Network-Related Apps"),
+        "bmon": Tool("bmon", "bmon", InstallMethod.APT, "bmon",
+                    "TUI network bandwidth monitor", "Network-Related Apps"),
+        "mtr": Tool("mtr", "mtr", InstallMethod.APT, "mtr-tiny",
+                   "Traceroute and ping combined", "Network-Related Apps"),
+        "gping": Tool("gping", "gping", InstallMethod.EGET, "gping",
+                     "Ping with graph", "Network-Related Apps",
+                     github_repo="orf/gping"),
+        "doggo": Tool("doggo", "doggo", InstallMethod.EGET, "doggo",
+                   "Modern dig alternative (dog successor)", "Network-Related Apps",
+                   github_repo="mr-karan/doggo"),
+        # Published on npm, not as a GitHub release binary: the project is
+        # TypeScript and has never attached an asset to any of its releases.
+        "neoss": Tool("neoss", "neoss", InstallMethod.NPM, "neoss",
+                     "Modern ss alternative", "Network-Related Apps"),
+        
+        # Misc CLI Terminal Apps
+        "systemctl": Tool("systemctl", "systemctl", InstallMethod.BUILTIN, "systemd",
+                         "Built-in systemd service manager", "Misc CLI Terminal Apps",
+                         requires_root=False),
+        "ncdu": Tool("ncdu", "ncdu", InstallMethod.APT, "ncdu",
+                    "Terminal disk space viewer", "Misc CLI Terminal Apps"),
+        "dust": Tool("dust", "dust", InstallMethod.EGET, "dust",
+                    "Intuitive du with bar charts", "Misc CLI Terminal Apps",
+                    github_repo="bootandy/dust"),
+        "duf": Tool("duf", "duf", InstallMethod.EGET, "duf",
+                   "Disk utility with graphs", "Misc CLI Terminal Apps",
+                   github_repo="muesli/duf"),
+        "lynis": Tool("lynis", "lynis", InstallMethod.APT, "lynis",
+                     "Linux security auditing", "Misc CLI Terminal Apps"),
+        "apt-show-versions": Tool("apt-show-versions", "apt-show-versions",
+                                 InstallMethod.APT, "apt-show-versions",
+                                 "Show package versions", "Misc CLI Terminal Apps"),
+        "nala": Tool("nala", "nala", InstallMethod.APT, "nala",
+                    "User-friendly apt frontend", "Misc CLI Terminal Apps"),
+        "fd": Tool("fd", "fdfind", InstallMethod.APT, "fd-find",
+                  "Fast find alternative", "Misc CLI Terminal Apps"),
+        "fish": Tool("fish", "fish", InstallMethod.APT, "fish",
+                    "Friendly interactive shell", "Misc CLI Terminal Apps"),
+        "starship": Tool("starship", "starship", InstallMethod.EGET, "starship",
+                        "Customizable shell prompt", "Misc CLI Terminal Apps",
+                        github_repo="starship/starship"),
+        "zoxide": Tool("zoxide", "zoxide", InstallMethod.EGET, "zoxide",
+                      "Smarter cd command", "Misc CLI Terminal Apps",
+                      github_repo="ajeetdsouza/zoxide"),
+        "atuin": Tool("atuin", "atuin", InstallMethod.EGET, "atuin",
+                     "Magical shell history", "Misc CLI Terminal Apps",
+                     github_repo="atuinsh/atuin"),
+        "tig": Tool("tig", "tig", InstallMethod.APT, "tig",
+                   "TUI git client", "Misc CLI Terminal Apps"),
+        "lazygit": Tool("lazygit", "lazygit", InstallMethod.EGET, "lazygit",
+                       "Simple terminal UI for git", "Misc CLI Terminal Apps",
+                       github_repo="jesseduffield/lazygit"),
+        "delta": Tool("delta", "delta", InstallMethod.EGET, "delta",
+                     "Syntax-highlighting git pager", "Misc CLI Terminal Apps",
+                     github_repo="dandavison/delta"),
+        "miller": Tool("miller", "mlr", InstallMethod.APT, "miller",
+                     "JSON/CSV processor", "Misc CLI Terminal Apps"),
+        "most": Tool("most", "most", InstallMethod.APT, "most",
+                    "Better pager than less/more", "Misc CLI Terminal Apps"),
+        "tldr": Tool("tldr", "tldr", InstallMethod.PIP, "tldr",
+                    "Simplified man pages", "Misc CLI Terminal Apps"),
+        "lazydocker": Tool("lazydocker", "lazydocker", InstallMethod.EGET, "lazydocker",
+                         "TUI Docker manager", "Misc CLI Terminal Apps",
+                         github_repo="jesseduffield/lazydocker"),
+        "json-tui": Tool("json-tui", "json-tui", InstallMethod.EGET, "json-tui",
+                        "JSON file viewer", "Misc CLI Terminal Apps",
+                        github_repo="ArthurSonzogni/json-tui"),
+        "jc": Tool("jc", "jc", InstallMethod.APT, "jc",
+                  "Parse command output to JSON", "Misc CLI Terminal Apps"),
+        "visidata": Tool("visidata", "visidata", InstallMethod.PIP, "visidata",
+                        "CSV/data viewer", "Misc CLI Terminal Apps"),
+        # Distributed on PyPI; the GitHub project cuts no releases at all.
+        "eg": Tool("eg", "eg", InstallMethod.PIP, "eg",
+                  "TLDR-like command helper", "Misc CLI Terminal Apps"),
+        "procs": Tool("procs", "procs", InstallMethod.EGET, "procs",
+                     "Modern ps replacement", "Misc CLI Terminal Apps",
+                     github_repo="dalance/procs"),
+        "sd": Tool("sd", "sd", InstallMethod.EGET, "sd",
+                  "Modern sed replacement", "Misc CLI Terminal Apps",
+                  github_repo="chmln/sd"),
+        "ripgrep": Tool("ripgrep", "rg", InstallMethod.APT, "ripgrep",
+                       "Fast text search tool", "Misc CLI Terminal Apps"),
+        "ripgrep-all": Tool("ripgrep-all", "rga", InstallMethod.EGET, "rga",
+                           "ripgrep for all file types", "Misc CLI Terminal Apps",
+                           github_repo="phiresky/ripgrep-all"),
+        "fzf": Tool("fzf", "fzf", InstallMethod.APT, "fzf",
+                   "Command-line fuzzy finder", "Misc CLI Terminal Apps"),
+        "fastfetch": Tool("fastfetch", "fastfetch", InstallMethod.EGET, "fastfetch",
+                         "System info display", "Misc CLI Terminal Apps",
+                         github_repo="fastfetch-cli/fastfetch"),
+        "pandoc": Tool("pandoc", "pandoc", InstallMethod.APT, "pandoc",
+                      "Document converter", "Misc CLI Terminal Apps"),
+        "hyperfine": Tool("hyperfine", "hyperfine", InstallMethod.EGET, "hyperfine",
+                         "Command benchmarking tool", "Misc CLI Terminal Apps",
+                         github_repo="sharkdp/hyperfine"),
+        "just": Tool("just", "just", InstallMethod.EGET, "just",
+                    "Command runner (make alternative)", "Misc CLI Terminal Apps",
+                    github_repo="casey/just"),
+    }
+    
+    # Prerequisites of every tool installed by a method; Tool.needs adds per-tool edges.
+    METHOD_NEEDS: Dict[InstallMethod, Tuple[str, ...]] = {
+        InstallMethod.APT: ("apt-lists",),
+        InstallMethod.NPM: ("npm",),
+        InstallMethod.PIP: ("venv",),
+    }
+    # Bootstrap jobs and what they in turn need (npm comes from apt; so does
+    # python3-venv, which plan_jobs adds as an edge only when it is missing).
+    BOOTSTRAP_NEEDS: Dict[str, Tuple[str, ...]] = {
+        "apt-lists": (),
+        "npm": ("apt-lists",),
+        "venv": (),
+    }
+
+    @staticmethod
+    def get_tools_by_category(server_mode: bool = False) -> Dict[str, List[Tool]]:
+        """Group tools by category, optionally filtering out GUI tools for server mode."""
+        categories: Dict[str, List[Tool]] = {}
+        for tool in ToolManager.TOOLS.values():
+            # Skip GUI tools in server mode
+            if server_mode and tool.requires_gui:
+                continue
+            if tool.category not in categories:
+                categories[tool.category] = []
+            categories[tool.category].append(tool)
+        return categories
+    
+    @staticmethod
+    def check_tool_installed(tool: Tool) -> bool:
+        """Check if tool is installed.
+
+        APT tools are answered from the dpkg database first; PATH is the
+        fallback for everything else and for commands installed another way.
+        """
+        if tool.method == InstallMethod.APT and DpkgStatus.is_installed(tool.package):
+            return True
+        return PathIndex.find(tool.command) is not None
+    
+    @staticmethod
+    def install_tool(tool: Tool, dry_run: bool = False) -> bool:
+        """Install a tool using its defined method."""
+        if not Tracer.enabled:
+            return ToolManager._install_tool(tool, dry_run)
+        with Tracer.tagged(tool=tool.name, method=tool.method.value), \
+                Tracer.span(tool.name, "tool") as span:
+            span["ok"] = ToolManager._install_tool(tool, dry_run)
+        return span["ok"]
+
+    @staticmethod
+    def _install_tool(tool: Tool, dry_run: bool) -> bool:
+        if tool.method == InstallMethod.BUILTIN:
+            print(f"✓ {tool.name} is built-in (no installation needed)")
+            return True
+        
+        if dry_run:
+            # In dry-run mode, just show what would be done
+            if tool.method == InstallMethod.APT:
+                print(f"[DRY RUN] Would install {tool.package} via apt")
+            elif tool.method == InstallMethod.PIP:
+                print(f"[DRY RUN] Would install {tool.package} via pip into {PIP_VENV_DIR}")
+            elif tool.method == InstallMethod.SNAP:
+                classic_str = " (classic)" if tool.classic else ""
+                print(f"[DRY RUN] Would install {tool.package} via snap{classic_str}")
+            elif tool.method == InstallMethod.NPM:
+                print(f"[DRY RUN] Would install {tool.package} via npm")
+            elif tool.method == InstallMethod.EGET:
+                print(f"[DRY RUN] Would install {tool.command} from {tool.github_repo} GitHub releases")
+            elif tool.method == InstallMethod.MANUAL:
+                print(f"[DRY RUN] Would install {tool.name} manually")
+            return True  # Pretend success in dry-run mode
+
+        ok = False
+        if tool.method == InstallMethod.APT:
+            if Installer.check_apt_available(tool.package):
+                ok = Installer.install_via_apt(tool.package)
+            else:
+                print(f"⚠ {tool.name} not available in apt repositories")
+                return False
+        
+        elif tool.method == InstallMethod.PIP:
+            ok = Installer.install_via_pip(tool.package, tool.command)
+        
+        elif tool.method == InstallMethod.SNAP:
+            ok = Installer.install_via_snap(tool.package, classic=tool.classic)
+
+        elif tool.method == InstallMethod.NPM:
+            ok = Installer.install_via_npm(tool.package)
+        
+        elif tool.method == InstallMethod.EGET:
+            if tool.github_repo:
+                # install_via_eget already validates the binary post-install
+                return Installer.install_via_eget(tool.github_repo, tool.command)
+            print(f"⚠ {tool.name} missing GitHub repository information")
+            return False
+        
+        elif tool.method == InstallMethod.MANUAL:
+            if tool.name == "croc":
+                # install_croc already validates the binary post-install
+                return Installer.install_croc()
+            print(f"⚠ {tool.name} requires manual installation")
+            return False
+        
+        else:
+            return False
+
+        if not ok:
+            return False
+        ToolManager.report_path_visibility(tool)
+        return True
+
+    @staticmethod
+    def report_path_visibility(tool: Tool) -> None:
+        """Soft-check that a package-manager install put the command on PATH.
+
+        Package managers already verify packages; hard version probes belong to
+        binary installs (eget/croc) via install_binary_to_path.
+        """
+        PathIndex.invalidate()
+        if PathIndex.find(tool.command) is not None:
+            print(f"  ✓ {tool.command} is available in PATH")
+        else:
+            print(f"  ⚠ {tool.command} not yet visible in PATH (may need a new shell session)")
+
+    @staticmethod
+    def install_apt_tools(tools: List[Tool], dry_run: bool = False) -> Dict[str, bool]:
+        """Install every APT tool in one apt transaction; return {tool.name: ok}."""
+        if dry_run:
+            packages = ", ".join(tool.package for tool in tools)
+            print(f"[DRY RUN] Would install {len(tools)} package(s) via apt in one transaction: {packages}")
+            return {tool.name: True for tool in tools}
+
+        results: Dict[str, bool] = {}
+        batch: List[Tool] = []
+        for tool in tools:
+            if Installer.check_apt_available(tool.package):
+                batch.append(tool)
+            else:
+                print(f"⚠ {tool.name} not available in apt repositories")
+                results[tool.name] = False
+
+        # Several tools may share a package; apt only needs to hear it once
+        packages = list(dict.fromkeys(tool.package for tool in batch))
+        failed = set(Installer.install_apt_batch(packages))
+        for tool in batch:
+            results[tool.name] = tool.package not in failed
+            if results[tool.name]:
+                ToolManager.report_path_visibility(tool)
+        return results
+
+
+    @staticmethod
+    def install_pip_tools(tools: List[Tool], dry_run: bool = False) -> Dict[str, bool]:
+        """Install every PIP tool in one pip resolve into the managed venv; return {tool.name: ok}."""
+        if dry_run:
+            packages = ", ".join(tool.package for tool in tools)
+            print(f"[DRY RUN] Would install {len(tools)} package(s) via pip into {PIP_VENV_DIR}: {packages}")
+            return {tool.name: True for tool in tools}
+
+        failed = set(Installer.install_pip_batch(list(dict.fromkeys(tool.package for tool in tools))))
+        results: Dict[str, bool] = {}
+        for tool in tools:
+            results[tool.name] = tool.package not in failed and Installer.link_venv_command(tool.command)
+            if results[tool.name]:
+                ToolManager.report_path_visibility(tool)
+        return results
+
+    @staticmethod
+    def prerequisites(tool: Tool) -> Tuple[str, ...]:
+        """Everything tool needs before it can be installed, in declaration order."""
+        return tuple(dict.fromkeys(ToolManager.METHOD_NEEDS.get(tool.method, ()) + tool.needs))
+
+    @staticmethod
+    def plan_jobs(tools: List[Tool], apt_batch: List[Tool], prepare_apt: Callable[[], bool],
+                  pip_batch: List[Tool] = ()) -> Tuple[List[Job], Dict[str, bool]]:
+        """Build the install DAG: bootstraps, the apt and pip batch jobs, one job per other tool.
+
+        A need may name a bootstrap or another tool in this run; needs on tools
+        that are already installed are dropped. Returns (jobs, batch_results),
+        where batch_results is filled in by the batch jobs as they run.
+        """
+        batches = {"apt-batch": (apt_batch, ToolManager.install_apt_tools, "apt"),
+                   "pip-batch": (pip_batch, ToolManager.install_pip_tools, None)}
+        batched = {tool.name: name for name, (members, _, _) in batches.items() for tool in members}
+        pending = {tool.name for tool in tools} | set(batched)
+        batch_results: Dict[str, bool] = {}
+        bootstrap_actions: Dict[str, Callable[[], bool]] = {
+            "apt-lists": prepare_apt,
+            "npm": Installer.ensure_npm,
+            "venv": Installer.ensure_venv,
+        }
+
+        def edges(needs: Tuple[str, ...]) -> Tuple[str, ...]:
+            kept = []
+            for need in needs:
+                if need in batched:
+                    kept.append(batched[need])
+                elif need in pending or need in ToolManager.BOOTSTRAP_NEEDS:
+                    kept.append(need)
+            return tuple(dict.fromkeys(kept))
+
+        jobs: List[Job] = []
+        for name, (members, install, serial) in batches.items():
+            if not members:
+                continue
+
+            def install_batch(members=members, install=install) -> bool:
+                batch_results.update(install(members, dry_run=False))
+                return True
+            jobs.append(Job(name, install_batch,
+                            edges(sum((ToolManager.prerequisites(t) for t in members), ())), serial=serial))
+        for tool in tools:
+            jobs.append(Job(tool.name, lambda tool=tool: ToolManager.install_tool(tool, dry_run=False),
+                            edges(ToolManager.prerequisites(tool)),
+                            serial=InstallEngine.SERIAL_BACKENDS.get(tool.method)))
+
+        # Only the bootstraps something actually waits on, plus what they need
+        wanted = [need for job in jobs for need in job.needs if need in ToolManager.BOOTSTRAP_NEEDS]
+        bootstraps: List[Job] = []
+        while wanted:
+            name = wanted.pop(0)
+            if any(job.name == name for job in bootstraps):
+                continue
+            needs = ToolManager.BOOTSTRAP_NEEDS[name]
+            if name == "venv" and Installer.venv_needs_apt():
+                needs += ("apt-lists",)
+            bootstraps.append(Job(name, bootstrap_actions[name], needs,
+                                  serial="apt" if name in ("apt-lists", "npm") else None))
+            wanted.extend(needs)
+        return bootstraps + jobs, batch_results
+
+
+class _ThreadOutput:
+    """sys.stdout stand-in that diverts each capturing thread's writes to its own buffer."""
+
+    def __init__(self, target):
+        self.target = target
+        self._local = threading.local()
+
+    def capture(self) -> io.StringIO:
+        self._local.buffer = io.StringIO()
+        return self._local.buffer
+
+    def release(self) -> None:
+        self._local.buffer = None
+
+    def write(self, text: str) -> int:
+        return (getattr(self._local, "buffer", None) or self.target).write(text)
+
+    def flush(self) -> None:
+        if getattr(self._local, "buffer", None) is None:
+            self.target.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.target, name)
+
+
+class InstallEngine:
+    """Run install jobs as a dependency DAG on a thread pool.
+
+    A job starts once everything it needs has succeeded. If a prerequisite
+    fails, the job is skipped instead of run. Ready jobs are started longest
+    remaining chain first, so bootstraps such as apt-lists go out before the tools
+    waiting on them. Jobs with the same serial key (apt, snap) run one at a
+    time. Each job's output is buffered and handed back, so the caller can
+    print the report in catalog order.
+    """
+
+    _backend_locks = {"apt": threading.Lock(), "snap": threading.Lock()}
+    SERIAL_BACKENDS = {InstallMethod.APT: "apt", InstallMethod.SNAP: "snap"}
+
+    @staticmethod
+    def command_lock(cmd: List[str]) -> Optional[threading.Lock]:
+        """The backend lock cmd must hold (looking past a leading sudo), or None."""
+        args = cmd[1:] if cmd and cmd[0] == "sudo" else cmd
+        if not args:
+            return None
+        backend = SERIAL_COMMANDS.get(os.path.basename(args[0]))
+        return InstallEngine._backend_locks.get(backend) if backend else None
+
+    @staticmethod
+    def chain_lengths(jobs: List[Job]) -> Dict[str, int]:
+        """Job name -> length of the longest chain of jobs waiting on it (itself included).
+
+        Raises ValueError on duplicate names, unknown prerequisites or cycles.
+        """
+        by_name: Dict[str, Job] = {}
+        for job in jobs:
+            if job.name in by_name:
+                raise ValueError(f"duplicate job {job.name}")
+            by_name[job.name] = job
+        dependents: Dict[str, List[str]] = {name: [] for name in by_name}
+        for job in jobs:
+            for need in job.needs:
+                if need not in by_name:
+                    raise ValueError(f"{job.name} needs unknown job {need}")
+                dependents[need].append(job.name)
+
+        lengths: Dict[str, int] = {}
+        visiting = set()
+
+        def length(name: str) -> int:
+            if name in lengths:
+                return lengths[name]
+            if name in visiting:
+                raise ValueError(f"prerequisite cycle through {name}")
+            visiting.add(name)
+            lengths[name] = 1 + max((length(d) for d in dependents[name]), default=0)
+            visiting.discard(name)
+            return lengths[name]
+
+        for name in by_name:
+            length(name)
+        return lengths
+
+    @staticmethod
+    def run(jobs: List[Job], workers: int) -> Dict[str, Tuple[bool, str]]:
+        """Run jobs on up to `workers` threads; return {job.name: (ok, buffered output)}."""
+        lengths = InstallEngine.chain_lengths(jobs)
+        order = {job.name: index for index, job in enumerate(jobs)}
+        waiting = {job.name: len(set(job.needs)) for job in jobs}
+        dependents: Dict[str, List[Job]] = {job.name: [] for job in jobs}
+        for job in jobs:
+            for need in set(job.needs):
+                dependents[need].append(job)
+        ready = [job for job in jobs if not job.needs]
+        results: Dict[str, Tuple[bool, str]] = {}
+        busy = set()
+        output = _ThreadOutput(sys.stdout)
+
+        def execute(job: Job) -> Tuple[bool, str]:
+            buffer = output.capture()
+            try:
+                with Tracer.profiled(), Tracer.span(job.name, "job", serial=job.serial):
+                    ok = bool(job.action())
+            except Exception as exc:  # One broken install must not sink the others
+                print(f"⚠ {job.name} failed unexpectedly: {exc}")
+                ok = False
+            finally:
+                output.release()
+            return ok, buffer.getvalue()
+
+        def settle(job: Job, result: Tuple[bool, str]) -> None:
+            results[job.name] = result
+            for dependent in dependents[job.name]:
+                waiting[dependent.name] -= 1
+                if not waiting[dependent.name]:
+                    ready.append(dependent)
+
+        sys.stdout = output
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                running: Dict[object, Job] = {}
+                while ready or running:
+                    # Serial chains (apt, snap) and long chains first, then catalog order
+                    ready.sort(key=lambda j: (-lengths[j.name], j.serial is None, order[j.name]))
+                    for job in list(ready):
+                        if len(running) >= max(1, workers):
+                            break
+                        if job.serial and job.serial in busy:
+                            continue
+                        ready.remove(job)
+                        failed = [need for need in job.needs if not results[need][0]]
+                        if failed:
+                            settle(job, (False, f"  ⚠ Not attempted: {', '.join(failed)} failed\n"))
+                            continue
+                        if job.serial:
+                            busy.add(job.serial)
+                        running[pool.submit(execute, job)] = job
+                    if not running:
+                        continue
+                    done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        job = running.pop(future)
+                        busy.discard(job.serial)
+                        settle(job, future.result())
+        finally:
+            sys.stdout = output.target
+        return results
+
+
+class Bundle:
+    """Offline install bundle: one tar with every artifact the catalog needs.
+
+    Layout: manifest.json (format, arch, included tools, SHA-256 of every
+    other file), debs/ (the .deb dependency closure), wheels/, npm-cache/
+    (a complete npm cache for the NPM tools), snaps/ (.snap + .assert) and
+    bin/ (release binaries for eget tools and croc).
+    """
+
+    @staticmethod
+    def parse_depends(content: str) -> List[str]:
+        """Real package names from `apt-cache depends --recurse` output (virtual <names> skipped)."""
+        names = []
+        for line in content.splitlines():
+            if line and not line[0].isspace() and not line.startswith("<"):
+                names.append(line.strip())
+        return list(dict.fromkeys(names))
+
+    @staticmethod
+    def export_debs(packages: List[str], dest: str) -> List[str]:
+        """apt-get download packages and everything they depend on; return the packages missed."""
+        result = Installer.run_command(
+            ["apt-cache", "depends", "--recurse", "--no-recommends", "--no-suggests", "--no-conflicts",
+             "--no-breaks", "--no-replaces", "--no-enhances"] + packages,
+            capture_output=True,
+            timeout=NETWORK_CMD_TIMEOUT,
+        )
+        closure = Bundle.parse_depends(result.stdout or "") if result.returncode == 0 else []
+        if not closure:
+            print("Could not resolve apt dependencies")
+            return list(packages)
+        os.makedirs(dest, exist_ok=True)
+        print(f"Downloading {len(closure)} .deb file(s) (the packages and their dependencies)...")
+        result = Installer.run_command(["apt-get", "download"] + closure, capture_output=True,
+                                       timeout=APT_BATCH_MAX_TIMEOUT, cwd=dest)
+        if result.returncode == 0:
+            return []
+        # One unavailable name (e.g. another architecture's) fails the lot; go one by one
+        missed = [
+            package for package in closure
+            if Installer.run_command(["apt-get", "download", package], capture_output=True,
+                                     timeout=NETWORK_CMD_TIMEOUT, cwd=dest).returncode != 0
+        ]
+        return [package for package in missed if package in packages]
+
+    @staticmethod
+    def export(path: str, tools: List[Tool]) -> bool:
+        """Resolve every tool's artifacts once and write them to the bundle at path.
+
+        Tools whose artifacts cannot be fetched are left out of the manifest
+        (and reported); returns True only when every tool made it in.
+        """
+        by_method: Dict[InstallMethod, List[Tool]] = {}
+        for tool in tools:
+            if tool.method == InstallMethod.MANUAL and tool.name != "croc":
+                continue
+            if tool.method != InstallMethod.BUILTIN:
+                by_method.setdefault(tool.method, []).append(tool)
+        apt_tools = by_method.get(InstallMethod.APT, [])
+        pip_tools = by_method.get(InstallMethod.PIP, [])
+        npm_tools = by_method.get(InstallMethod.NPM, [])
+        failed: List[str] = []
+
+        with tempfile.TemporaryDirectory(prefix="bundle-", dir=Installer.spool_dir) as staging:
+            # npm and python3-venv come along so a bare host can install the npm and pip tools
+            packages = list(dict.fromkeys(
+                [tool.package for tool in apt_tools]
+                + (["npm"] if npm_tools else []) + (["python3-venv"] if pip_tools else [])
+            ))
+            if packages:
+                missed = set(Bundle.export_debs(packages, os.path.join(staging, "debs")))
+                failed += [tool.name for tool in apt_tools if tool.package in missed]
+                if "npm" in missed:
+                    failed += [tool.name for tool in npm_tools]
+                if "python3-venv" in missed:
+                    # Without it a host lacking ensurepip cannot create the venv offline
+                    failed += [tool.name for tool in pip_tools]
+
+            # Built with the managed venv's pip: the system one is often absent (PEP 668)
+            wheel_tools = [tool for tool in pip_tools if tool.name not in failed]
+            if wheel_tools and not Installer.ensure_venv():
+                failed += [tool.name for tool in wheel_tools]
+            elif wheel_tools:
+                print(f"Building wheels for {len(wheel_tools)} pip package(s)...")
+                result = Installer.run_command(
+                    Installer.pip_command("wheel", "--wheel-dir", os.path.join(staging, "wheels"),
+                                          *[tool.package for tool in wheel_tools]),
+                    capture_output=True,
+                    timeout=APT_BATCH_MAX_TIMEOUT,
+                )
+                if result.returncode != 0:
+                    failed += [tool.name for tool in wheel_tools]
+
+            for tool in npm_tools:
+                # A throwaway global install fills the cache with the whole dependency tree
+                with tempfile.TemporaryDirectory(prefix="npm-prefix-", dir=Installer.spool_dir) as prefix:
+                    result = Installer.run_command(
+                        ["npm", "install", "-g", "--prefix", prefix,
+                         "--cache", os.path.join(staging, "npm-cache"), tool.package],
+                        capture_output=True,
+                        timeout=NETWORK_CMD_TIMEOUT,
+                    )
+                if result.returncode != 0 and tool.name not in failed:
+                    failed.append(tool.name)
+
+            for tool in by_method.get(InstallMethod.SNAP, []):
+                snaps = os.path.join(staging, "snaps")
+                os.makedirs(snaps, exist_ok=True)
+                result = Installer.run_command(["snap", "download", tool.package], capture_output=True,
+                                               timeout=NETWORK_CMD_TIMEOUT, cwd=snaps)
+                if result.returncode != 0:
+                    failed.append(tool.name)
+
+            bin_dir = os.path.join(staging, "bin")
+            os.makedirs(bin_dir, exist_ok=True)
+            for tool in by_method.get(InstallMethod.EGET, []):
+                if not Installer.fetch_release_binary(tool.github_repo, tool.command, bin_dir):
+                    failed.append(tool.name)
+            if any(tool.name == "croc" for tool in by_method.get(InstallMethod.MANUAL, [])):
+                if not Installer.fetch_croc(bin_dir):
+                    failed.append("croc")
+
+            files = {}
+            for directory, _, names in os.walk(staging):
+                for name in names:
+                    full = os.path.join(directory, name)
+                    files[os.path.relpath(full, staging)] = Installer.sha256_file(full)
+            included = [tool for tools_ in by_method.values() for tool in tools_ if tool.name not in failed]
+            manifest = {
+                "format": BUNDLE_FORMAT,
+                "arch": Installer.linux_goarch(),
+                "python": f"{sys.version_info.major}.{sys.version_info.minor}",
+                "created": int(time.time()),
+                "tools": {tool.name: tool.method.value for tool in included},
+                "files": dict(sorted(files.items())),
+            }
+            with open(os.path.join(staging, "manifest.json"), "w", encoding="utf-8") as handle:
+                json.dump(manifest, handle, indent=1)
+
+            tmp_path = f"{path}.tmp"
+            try:
+                with tarfile.open(tmp_path, "w") as tar:
+                    tar.add(os.path.join(staging, "manifest.json"), arcname="manifest.json")
+                    for rel in manifest["files"]:
+                        tar.add(os.path.join(staging, rel), arcname=rel)
+                os.replace(tmp_path, path)
+            except (OSError, tarfile.TarError) as exc:
+                print(f"Could not write bundle {path}: {exc}")
+                return False
+
+        print(f"Wrote {path}: {len(included)} tool(s), {len(files)} file(s)")
+        if failed:
+            print(f"⚠ Left out (could not fetch): {', '.join(sorted(set(failed)))}")
+        return not failed
+
+    @staticmethod
+    @Tracer.traced("bundle")
+    def unpack(path: str, dest: str) -> Optional[dict]:
+        """Extract the bundle into dest and verify every file against the manifest; return it."""
+        try:
+            with tarfile.open(path, "r:*") as tar:
+                members = tar.getmembers()
+                for member in members:
+                    parts = pathlib.Path(member.name).parts
+                    if not (member.isfile() or member.isdir()) or member.name.startswith("/") or ".." in parts:
+                        print(f"Refusing bundle: unsafe entry {member.name}")
+                        return None
+                if hasattr(tarfile, "data_filter"):
+                    tar.extractall(dest, members=members, filter="data")
+                else:
+                    tar.extractall(dest, members=members)
+            with open(os.path.join(dest, "manifest.json"), "r", encoding="utf-8") as handle:
+                manifest = json.load(handle)
+        except (OSError, tarfile.TarError, ValueError) as exc:
+            print(f"Could not read bundle {path}: {exc}")
+            return None
+
+        if not isinstance(manifest, dict) or manifest.get("format") != BUNDLE_FORMAT:
+            print(f"Unsupported bundle format in {path}")
+            return None
+        if manifest.get("arch") != Installer.linux_goarch():
+            print(f"Bundle was built for {manifest.get('arch')}, this machine is {Installer.linux_goarch()}")
+            return None
+        files = manifest.get("files", {})
+        for directory, _, names in os.walk(dest):
+            for name in names:
+                rel = os.path.relpath(os.path.join(directory, name), dest)
+                if rel != "manifest.json" and rel not in files:
+                    print(f"Refusing bundle: {rel} is not in its manifest")
+                    return None
+        for rel, digest in files.items():
+            full = os.path.join(dest, rel)
+            if not os.path.isfile(full) or not Installer.verify_checksum(full, digest):
+                print(f"Refusing bundle: {rel} is missing or corrupt")
+                return None
+        python = f"{sys.version_info.major}.{sys.version_info.minor}"
+        if manifest.get("python") != python and "wheels" in {pathlib.Path(rel).parts[0] for rel in files}:
+            print(f"⚠ Bundle wheels were built for Python {manifest.get('python')}, this is {python}")
+        return manifest
+
+    @staticmethod
+    @Tracer.traced("bundle")
+    def install(root: str, manifest: dict, tools: List[Tool], dry_run: bool = False) -> Dict[str, bool]:
+        """Install tools from an unpacked, verified bundle with no network access."""
+        results: Dict[str, bool] = {}
+        wanted: List[Tool] = []
+        for tool in tools:
+            if tool.name in manifest.get("tools", {}):
+                wanted.append(tool)
+            else:
+                print(f"⚠ {tool.name} is not in the bundle")
+                results[tool.name] = False
+        if dry_run:
+            for tool in wanted:
+                print(f"[DRY RUN] Would install {tool.name} from the bundle")
+                results[tool.name] = True
+            return results
+
+        by_method: Dict[InstallMethod, List[Tool]] = {}
+        for tool in wanted:
+            by_method.setdefault(tool.method, []).append(tool)
+
+        # Every .deb whose package is not installed yet, in one local-files-only transaction
+        debs_dir = os.path.join(root, "debs")
+        debs = sorted(
+            os.path.join(debs_dir, name) for name in (os.listdir(debs_dir) if os.path.isdir(debs_dir) else [])
+            if name.endswith(".deb") and DpkgStatus.is_installed(name.split("_")[0]) is not True
+        )
+        debs_ok = True
+        if debs:
+            print(f"Installing {len(debs)} .deb file(s) from the bundle...")
+            debs_ok = Installer.run_command(
+                ["sudo", "apt-get", "install", "-y", "--no-download"] + debs,
+                capture_output=True,
+                timeout=APT_BATCH_MAX_TIMEOUT,
+            ).returncode == 0
+        for tool in by_method.get(InstallMethod.APT, []):
+            results[tool.name] = debs_ok
+            if debs_ok:
+                ToolManager.report_path_visibility(tool)
+
+        pip_tools = by_method.get(InstallMethod.PIP, [])
+        if pip_tools:
+            try:
+                os.makedirs(PIP_WHEELHOUSE, exist_ok=True)
+                for name in os.listdir(os.path.join(root, "wheels")):
+                    shutil.copyfile(os.path.join(root, "wheels", name), os.path.join(PIP_WHEELHOUSE, name))
+                results.update(ToolManager.install_pip_tools(pip_tools))
+            except OSError as exc:
+                print(f"Could not stage bundled wheels: {exc}")
+                results.update({tool.name: False for tool in pip_tools})
+
+        for tool in by_method.get(InstallMethod.NPM, []):
+            results[tool.name] = Installer.ensure_npm() and Installer.run_command(
+                ["sudo", "npm", "install", "-g", "--offline", "--cache", os.path.join(root, "npm-cache"),
+                 tool.package],
+                capture_output=True,
+                timeout=NETWORK_CMD_TIMEOUT,
+            ).returncode == 0
+            if results[tool.name]:
+                ToolManager.report_path_visibility(tool)
+
+        snaps_dir = os.path.join(root, "snaps")
+        for tool in by_method.get(InstallMethod.SNAP, []):
+            snap = next((os.path.join(snaps_dir, name) for name in sorted(os.listdir(snaps_dir))
+                         if name.startswith(f"{tool.package}_") and name.endswith(".snap")), None) \
+                if os.path.isdir(snaps_dir) else None
+            assertion = snap[:-len(".snap")] + ".assert" if snap else None
+            ok = bool(snap) and os.path.isfile(assertion) and Installer.run_command(
+                ["sudo", "snap", "ack", assertion], capture_output=True,
+            ).returncode == 0
+            if ok:
+                cmd = ["sudo", "snap", "install"] + (["--classic"] if tool.classic else []) + [snap]
+                ok = Installer.run_command(cmd, capture_output=True, timeout=NETWORK_CMD_TIMEOUT).returncode == 0
+            results[tool.name] = ok
+            if ok:
+                ToolManager.report_path_visibility(tool)
+
+        for tool in by_method.get(InstallMethod.EGET, []) + by_method.get(InstallMethod.MANUAL, []):
+            source = os.path.join(root, "bin", tool.command)
+            if not os.path.isfile(source):
+                print(f"⚠ {tool.command} binary missing from the bundle")
+                results[tool.name] = False
+                continue
+            # install_binary_to_path moves its source; keep the bundle copy intact
+            with tempfile.TemporaryDirectory(prefix="bundle-bin-", dir=Installer.spool_dir) as tmpdir:
+                staged = os.path.join(tmpdir, tool.command)
+                shutil.copyfile(source, staged)
+                results[tool.name] = Installer.install_binary_to_path(staged, tool.command)
+        return results
+
+
+@dataclass
+class HostResult:
+    """Outcome of one fleet host: main()'s counters as that host reported them."""
+    host: str
+    returncode: int = 0
+    installed: int = 0
+    skipped: int = 0
+    failed: int = 0
+    duration: float = 0.0
+    output: str = ""
+    error: Optional[str] = None  # Set when the host never got to report
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.returncode == 0 and self.failed == 0
+
+
+class Transport(abc.ABC):
+    """How fleet mode reaches a host: run this script there with argv, return its output."""
+
+    name = ""
+
+    @abc.abstractmethod
+    def command(self, host: str, argv: List[str]) -> List[str]:
+        """The argv that runs the script (read from stdin) on host with argv."""
+
+    def env(self, host: str) -> Optional[Dict[str, str]]:
+        return None
+
+    def run(self, host: str, argv: List[str], script: bytes,
+            timeout: int = FLEET_HOST_TIMEOUT) -> "subprocess.CompletedProcess":
+        """Feed the script on stdin (nothing is copied to the host); never raises."""
+        cmd = self.command(host, argv)
+        with Tracer.span(Tracer.command_name(cmd), "subprocess", cmd=" ".join(cmd)[:TRACE_ARG_MAX],
+                         host=host) as span:
+            try:
+                result = subprocess.run(cmd, input=script, capture_output=True, timeout=timeout, env=self.env(host))
+            except subprocess.TimeoutExpired:
+                result = subprocess.CompletedProcess(cmd, 124, b"", f"timed out after {timeout}s".encode())
+            except OSError as exc:
+                result = subprocess.CompletedProcess(cmd, 127, b"", str(exc).encode())
+            span["exit"] = result.returncode
+        return result
+
+
+class SshTransport(Transport):
+    """Run on the host over ssh; needs python3 and passwordless sudo there."""
+
+    name = "ssh"
+
+    def __init__(self, options: Tuple[str, ...] = ()):
+        self.options = tuple(options)
+
+    def command(self, host: str, argv: List[str]) -> List[str]:
+        # BatchMode: a host wanting a password fails instead of hanging the fleet
+        remote = " ".join(shlex.quote(arg) for arg in ["python3", "-"] + argv)
+        return ["ssh", "-o", "BatchMode=yes", *self.options, host, remote]
+
+
+class LocalTransport(Transport):
+    """Run as a local subprocess per "host" (LAZY_FLEET_HOST names it); for tests and one-box runs."""
+
+    name = "local"
+
+    def command(self, host: str, argv: List[str]) -> List[str]:
+        return [sys.executable, "-"] + argv
+
+    def env(self, host: str) -> Optional[Dict[str, str]]:
+        return dict(os.environ, LAZY_FLEET_HOST=host)
+
+
+TRANSPORTS = {transport.name: transport for transport in (SshTransport, LocalTransport)}
+
+
+class Fleet:
+    """Run the install plan on many hosts at once through a Transport."""
+
+    @staticmethod
+    def read_inventory(path: str) -> List[str]:
+        """Hosts from an inventory file: one ssh destination per line, # comments."""
+        hosts = []
+        with open(path, "r", encoding="utf-8") as handle:
+            for line in handle:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    hosts.append(line.split()[0])
+        return list(dict.fromkeys(hosts))
+
+    @staticmethod
+    def worker_args(args: "argparse.Namespace") -> List[str]:
+        """The per-host command line: this run's plan options, non-interactive, reporting back."""
+        argv = ["--yes", "--fleet-report", "--jobs", str(args.jobs), "--apt-max-age", str(args.apt_max_age)]
+        for flag, on in (("--server", args.server), ("--dry-run", args.dry_run),
+                         ("--no-apt-batch", args.no_apt_batch), ("--lazy-update", args.lazy_update)):
+            if on:
+                argv.append(flag)
+        if args.metrics_file:
+            argv += ["--metrics-file", args.metrics_file]
+        return argv
+
+    @staticmethod
+    def parse_report(output: str) -> Optional[Dict[str, int]]:
+        """The counters from a host's FLEET_REPORT_PREFIX line, if it got that far."""
+        for line in reversed(output.splitlines()):
+            if line.startswith(FLEET_REPORT_PREFIX):
+                try:
+                    report = json.loads(line[len(FLEET_REPORT_PREFIX):])
+                    return {key: int(report[key]) for key in ("installed", "skipped", "failed")}
+                except (ValueError, KeyError, TypeError):
+                    return None
+        return None
+
+    @staticmethod
+    def run_host(transport: Transport, host: str, argv: List[str], script: bytes,
+                 timeout: int = FLEET_HOST_TIMEOUT) -> HostResult:
+        start = time.monotonic()
+        result = transport.run(host, argv, script, timeout=timeout)
+        output = (result.stdout or b"").decode("utf-8", "replace") + (result.stderr or b"").decode("utf-8", "replace")
+        host_result = HostResult(host, returncode=result.returncode, duration=time.monotonic() - start,
+                                 output=output)
+        report = Fleet.parse_report(output)
+        if report is None:
+            host_result.error = f"exited {result.returncode} without a report"
+        else:
+            host_result.installed = report["installed"]
+            host_result.skipped = report["skipped"]
+            host_result.failed = report["failed"]
+        return host_result
+
+    @staticmethod
+    def run(hosts: List[str], transport: Transport, argv: List[str], script: bytes,
+            parallelism: int = FLEET_PARALLELISM, timeout: int = FLEET_HOST_TIMEOUT,
+            log_dir: Optional[str] = None) -> List[HostResult]:
+        """Provision hosts, at most parallelism at a time; results keep inventory order."""
+        results: Dict[str, HostResult] = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, parallelism)) as pool:
+            futures = {pool.submit(Fleet.run_host, transport, host, argv, script, timeout): host for host in hosts}
+            for future in concurrent.futures.as_completed(futures):
+                result = future.result()
+                results[result.host] = result
+                if log_dir:
+                    os.makedirs(log_dir, exist_ok=True)
+                    with open(os.path.join(log_dir, f"{result.host}.log"), "w", encoding="utf-8") as handle:
+                        handle.write(result.output)
+                mark = "✓" if result.ok else "✗"
+                detail = result.error or (f"installed {result.installed}, already {result.skipped}, "
+                                          f"failed {result.failed}")
+                print(f"{mark} {result.host:30} - {detail} ({result.duration:.0f}s)")
+                if result.error:
+                    for line in result.output.strip().splitlines()[-5:]:
+                        print(f"    {line}")
+        return [results[host] for host in hosts]
+
+    @staticmethod
+    def print_summary(results: List[HostResult], dry_run: bool = False) -> None:
+        print("\n" + "="*70)
+        print("🌐 Fleet Complete!")
+        print("="*70)
+        print(f"✓ Hosts succeeded:   {sum(1 for result in results if result.ok)}/{len(results)}")
+        print(f"✓ Already installed: {sum(result.skipped for result in results)}")
+        if dry_run:
+            print(f"👀 Would install:      {sum(result.installed for result in results)}")
+        else:
+            print(f"✓ Newly installed:   {sum(result.installed for result in results)}")
+        print(f"{'⚠' if any(result.failed for result in results) else '✓'} Failed:            "
+              f"{sum(result.failed for result in results)}")
+        unreachable = [result.host for result in results if result.error]
+        if unreachable:
+            print(f"⚠ No report from:    {', '.join(unreachable)}")
+        print("="*70)
+
+
+class UpdateChecker:
+    """--check-updates: compare installed GitHub-hosted tools with their latest releases.
+
+    With GITHUB_TOKEN set, every repo is asked about in one aliased GraphQL
+    query for its latest tag. That answer is not written to ReleaseCache: it
+    lacks the per-asset digests and the ETag the install path relies on.
+    Without a token (GraphQL needs one), or if the query fails, it falls back
+    to one REST lookup per repo, run in parallel and revalidated through
+    ReleaseCache.
+    """
+
+    @staticmethod
+    def graphql_request(repos: List[str]) -> Tuple[bytes, Dict[str, str]]:
+        """(POST body, alias -> repo) for one query covering every repo."""
+        aliases = {f"r{index}": repo for index, repo in enumerate(repos)}
+        params, fields, variables = [], [], {}
+        for alias, repo in aliases.items():
+            owner, _, name = repo.partition("/")
+            params.append(f"${alias}o: String!, ${alias}n: String!")
+            fields.append(f"{alias}: repository(owner: ${alias}o, name: ${alias}n) {{ latestRelease {{ tagName }} }}")
+            variables[f"{alias}o"], variables[f"{alias}n"] = owner, name
+        query = f"query({', '.join(params)}) {{ {' '.join(fields)} }}"
+        return json.dumps({"query": query, "variables": variables}).encode("utf-8"), aliases
+
+    @staticmethod
+    def latest_tags_graphql(repos: List[str], token: str) -> Optional[Dict[str, Optional[str]]]:
+        """repo -> latest release tag (None: no release), or None if the query itself failed."""
+        body, aliases = UpdateChecker.graphql_request(repos)
+        result = DownloadManager.fetch(f"{GITHUB_API_URL}/graphql", body=body, headers={
+            "Authorization": f"Bearer {token}", "Content-Type": "application/json"})
+        try:
+            data = json.loads(result.content or b"").get("data") if result.status == 200 else None
+        except (ValueError, AttributeError):
+            data = None
+        if not isinstance(data, dict):
+            print(f"GraphQL release query failed (HTTP {result.status or result.error}), falling back to REST")
+            return None
+        return {repo: ((data.get(alias) or {}).get("latestRelease") or {}).get("tagName")
+                for alias, repo in aliases.items()}
+
+    @staticmethod
+    def latest_tags(repos: List[str]) -> Dict[str, Optional[str]]:
+        """repo -> latest release tag: one GraphQL round trip with a token, per-repo REST otherwise."""
+        token = os.environ.get("GITHUB_TOKEN")
+        tags = UpdateChecker.latest_tags_graphql(repos, token) if token and repos else None
+        if tags is None and repos:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=DOWNLOAD_PARALLELISM) as pool:
+                tags = dict(zip(repos, pool.map(lambda repo: Installer.fetch_latest_release_assets(repo)[0], repos)))
+        return tags or {}
+
+    @staticmethod
+    def versions(text: str) -> List[str]:
+        return re.findall(VERSION_PATTERN, text or "")
+
+    @staticmethod
+    def installed_version(tool: Tool, state: Dict[str, dict]) -> Optional[str]:
+        """The version the binary reports; the state manifest's record only when it reports none."""
+        invoke = PathIndex.find(tool.command)
+        if invoke is not None:
+            flag = ProbeFlagCache.get(tool.command) or "--version"
+            result = Installer.run_command([invoke, flag], capture_output=True, timeout=VALIDATE_CMD_TIMEOUT)
+            found = UpdateChecker.versions(f"{result.stdout or ''}\n{result.stderr or ''}")
+            if found:
+                return found[0]
+        recorded = UpdateChecker.versions((state.get(tool.name) or {}).get("version") or "")
+        return recorded[0] if recorded else None
+
+    @staticmethod
+    def run(server_mode: bool = False) -> int:
+        """Print what is out of date; exit status 1 if any installed tool has a newer release."""
+        tools = [tool for tools in ToolManager.get_tools_by_category(server_mode=server_mode).values()
+                 for tool in tools if tool.github_repo]
+        state = StateManifest.load()
+        installed = [tool for tool in tools
+                     if StateManifest.status(state, tool) or ToolManager.check_tool_installed(tool)]
+        repos = list(dict.fromkeys(tool.github_repo for tool in installed))
+        print(f"🔄 Checking {len(repos)} GitHub repo(s) for newer releases...")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=DEFAULT_JOBS) as pool:
+            # Version probes run while the release query is in flight
+            probes = {tool.name: pool.submit(UpdateChecker.installed_version, tool, state) for tool in installed}
+            tags = UpdateChecker.latest_tags(repos)
+            versions = {name: probe.result() for name, probe in probes.items()}
+
+        outdated, unknown = [], []
+        for tool in sorted(installed, key=lambda t: t.name):
+            tag = tags.get(tool.github_repo)
+            if not tag:
+                print(f"  ? {tool.name:20} no release found for {tool.github_repo}")
+                unknown.append(tool.name)
+                continue
+            latest = (UpdateChecker.versions(tag) or [tag.lstrip("v")])[0]
+            version = versions[tool.name]
+            if version == latest:
+                continue
+            if version:
+                print(f"  ⬆ {tool.name:20} {version} → {tag}")
+                outdated.append(tool.name)
+            else:
+                print(f"  ? {tool.name:20} installed version unknown, latest is {tag}")
+                unknown.append(tool.name)
+        current = len(installed) - len(outdated) - len(unknown)
+        print(f"{current} up to date, {len(outdated)} with updates, {len(unknown)} unknown")
+        return 1 if outdated else 0
+
+
+def get_user_consent(server_mode: bool = False, dry_run: bool = False) -> bool:
+    """Get user consent once upfront - simple and clear for lazy users."""
+    print("\n" + "="*70)
+    print("🚀 Lazy Linux Tool Installer")
+    print("="*70)
+    
+    mode_info = []
+    if server_mode:
+        mode_info.append("🔧 SERVER MODE (CLI tools only, no GUI)")
+    if dry_run:
+        mode_info.append("👀 DRY RUN (preview only, no changes)")
+    
+    if mode_info:
+        print("\n" + " | ".join(mode_info))
+    
+    print("\nThis script will automatically install all Linux tools from README.md")
+    print("Perfect for lazy users - just say 'yes' and it handles everything!")
+    print("\nWhat it does:")
+    print("  ✓ Checks which tools you already have")
+    if dry_run:
+        print("  👀 Shows what would be installed (DRY RUN - no changes)")
+    else:
+        print("  ✓ Installs missing tools automatically (apt, pip, snap, npm, GitHub releases)")
+    print("  ✓ Skips tools that are already installed")
+    print("  ✓ Organizes everything by category")
+    if server_mode:
+        print("  🔧 Excludes GUI tools (server-friendly)")
+    if not dry_run:
+        print("\nYou'll be prompted for your sudo password when needed.")
+    print("="*70)
+    
+    # Limit retries to prevent infinite loops on invalid input
+    max_attempts = 5
+    attempts = 0
+    
+    while attempts < max_attempts:
+        try:
+            response = input("\nDo you want to proceed? [y/N]: ").strip().lower()
+            if response in ('y', 'yes'):
+                return True
+            elif response in ('n', 'no', ''):
+                return False
+            else:
+                attempts += 1
+                if attempts < max_attempts:
+                    print("Please enter 'y' for yes or 'n' for no")
+                else:
+                    print("Maximum attempts reached. Defaulting to 'no'.")
+                    return False
+        except (EOFError, KeyboardInterrupt):
+            # Handle Ctrl+C and EOF gracefully without crashing
+            print("\n\nInterrupted by user. Exiting.")
+            return False
+    
+    return False
+
+
+def apt_lists_age() -> Optional[float]:
+    """Seconds since the newest apt package index was written, or None if there is none."""
+    newest = 0.0
+    try:
+        with os.scandir(APT_LISTS_DIR) as entries:
+            for entry in entries:
+                if "_Packages" in entry.name and entry.is_file():
+                    newest = max(newest, entry.stat().st_mtime)
+    except OSError:
+        return None
+    if not newest:
+        return None
+    return max(0.0, time.time() - newest)
+
+
+def apt_lists_fresh(max_age: int) -> bool:
+    """True when package lists exist and are younger than max_age seconds (0 disables)."""
+    age = apt_lists_age()
+    return max_age > 0 and age is not None and age < max_age
+
+
+@Tracer.traced("apt")
+def update_package_lists(dry_run: bool = False, max_age: int = APT_LISTS_MAX_AGE, force: bool = False) -> bool:
+    """Update apt package lists unless they were refreshed within max_age seconds."""
+    if not force and apt_lists_fresh(max_age):
+        print(f"\nPackage lists refreshed {int(apt_lists_age() // 60)} min ago, skipping apt-get update")
+        return True
+    if dry_run:
+        print("\n[DRY RUN] Would update package lists (apt-get update)")
+        return True
+    print("\nUpdating package lists...")
+    result = Installer.run_command(
+        ["sudo", "apt-get", "update"],
+        capture_output=True,
+        timeout=NETWORK_CMD_TIMEOUT,
+    )
+    # Candidates resolved against the old lists may now be wrong
+    Installer._apt_candidates.clear()
+    return result.returncode == 0
+
+
+@Tracer.traced("apt")
+def prepare_apt_packages(packages: set, dry_run: bool = False, max_age: int = APT_LISTS_MAX_AGE,
+                         lazy: bool = False) -> bool:
+    """Refresh the package lists if needed, then resolve every package in one apt-cache call.
+
+    Always returns True: a failed refresh still leaves usable lists.
+    """
+    # Only pay for an index refresh when something APT-backed is missing
+    refresh_on_miss = False
+    if not packages:
+        print("\nNothing missing comes from apt, skipping package list update")
+    elif lazy:
+        print("\nDeferring package list update until a package fails to resolve")
+        refresh_on_miss = True
+    else:
+        refresh_on_miss = apt_lists_fresh(max_age)
+        update_package_lists(dry_run=dry_run, max_age=max_age)
+
+    if packages and not dry_run:
+        resolved = Installer.resolve_apt_packages(sorted(packages))
+        unresolved = sorted(pkg for pkg, candidate in resolved.items() if candidate is None)
+        if unresolved and refresh_on_miss:
+            # Lists we chose not to refresh may simply predate the package
+            print(f"\nNot in the current package lists: {', '.join(unresolved)}")
+            if update_package_lists(force=True):
+                Installer.resolve_apt_packages(sorted(packages))
+    return True
+
+
+def check_installed(server_mode: bool = False) -> int:
+    """--check: report missing tools without prompting or changing anything.
+
+    Answers from the dpkg database and PATH only, so it stays fast enough
+    for a monitoring probe. Returns the exit status: 0 if all installed.
+    """
+    tools = [tool for tools in ToolManager.get_tools_by_category(server_mode=server_mode).values()
+             for tool in tools]
+    missing = sorted(tool.name for tool in tools if not ToolManager.check_tool_installed(tool))
+    if missing:
+        print(f"{len(missing)} of {len(tools)} tools missing: {', '.join(missing)}")
+        return 1
+    print(f"All {len(tools)} tools installed")
+    return 0
+
+
+def parse_arguments() -> "argparse.Namespace":
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Lazy Linux Tool Installer - Automatically install Linux tools from README.md",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s                    # Install all tools (default)
+  %(prog)s --server           # Install only CLI tools (no GUI)
+  %(prog)s --dry-run          # Preview what would be installed
+  %(prog)s --server --dry-run # Preview server installation
+        """
+    )
+    parser.add_argument(
+        "--server",
+        action="store_true",
+        help="Server/minimal mode: only install CLI tools (exclude GUI applications)"
+    )
+    parser.add_argument(
+        "--dry-run",
+        "-n",
+        action="store_true",
+        help="Dry run mode: show what would be installed without making changes"
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only report which tools are missing (exit 1 if any); no prompts, no changes"
+    )
+    parser.add_argument(
+        "--check-updates",
+        action="store_true",
+        help="Report installed GitHub-hosted tools with a newer release (exit 1 if any); "
+             "one GraphQL request when GITHUB_TOKEN is set"
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Write a Chrome/Perfetto trace of every phase, download and subprocess to FILE"
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="Write cProfile statistics for the run (all worker threads merged) to FILE"
+    )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="FILE",
+        help="Write run metrics to FILE in Prometheus textfile-collector format (e.g. "
+             "/var/lib/node_exporter/textfile_collector/lazy_tools.prom)"
+    )
+    parser.add_argument(
+        "--no-apt-batch",
+        action="store_true",
+        help="Install APT tools one apt-get call at a time instead of in a single transaction"
+    )
+    parser.add_argument(
+        "--apt-max-age",
+        type=int,
+        default=APT_LISTS_MAX_AGE,
+        metavar="SECONDS",
+        help=f"Skip apt-get update when package lists are newer than this (default: {APT_LISTS_MAX_AGE}; 0 always updates)"
+    )
+    parser.add_argument(
+        "--lazy-update",
+        action="store_true",
+        help="Only run apt-get update once a missing package cannot be found in the current lists"
+    )
+    parser.add_argument(
+        "--spool-dir",
+        metavar="DIR",
+        help="Unpack release archives here instead of the system temp dir (useful when /tmp is tmpfs)"
+    )
+    parser.add_argument(
+        "--export-bundle",
+        metavar="PATH",
+        help="Download everything the selected tools need into one offline bundle at PATH, then exit"
+    )
+    parser.add_argument(
+        "--from-bundle",
+        metavar="PATH",
+        help="Install from a bundle made with --export-bundle, without network access"
+    )
+    parser.add_argument(
+        "--yes", "-y",
+        action="store_true",
+        help="Do not prompt: assume consent and exit without waiting for Enter"
+    )
+    parser.add_argument(
+        "--fleet",
+        metavar="INVENTORY",
+        help="Run on every host in INVENTORY (one ssh destination per line) instead of this machine"
+    )
+    parser.add_argument(
+        "--fleet-parallel",
+        type=int,
+        default=FLEET_PARALLELISM,
+        metavar="N",
+        help=f"Provision up to N fleet hosts at once (default: {FLEET_PARALLELISM})"
+    )
+    parser.add_argument(
+        "--transport",
+        choices=sorted(TRANSPORTS),
+        default="ssh",
+        help="How --fleet reaches hosts (default: ssh; local runs each host as a local process)"
+    )
+    parser.add_argument(
+        "--fleet-logs",
+        metavar="DIR",
+        help="Write each fleet host's full output to DIR/<host>.log"
+    )
+    parser.add_argument(
+        "--fleet-report",
+        action="store_true",
+        help=argparse.SUPPRESS
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=DEFAULT_JOBS,
+        metavar="N",
+        help=f"Install up to N tools at once; apt and snap still go one at a time (default: {DEFAULT_JOBS})"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function."""
+    # Parse command-line arguments
+    args = parse_arguments()
+    # A fleet controller installs nothing itself; its workers write their own metrics
+    metrics = args.metrics_file and not args.fleet and not args.check
+    if not (args.trace or args.profile or metrics):
+        pause = run_installer(args)
+    else:
+        pause = run_traced(args, metrics)
+    # Only after the trace and metrics are on disk, so a run left at this prompt still has them
+    if pause:
+        input("\nPress Enter to exit...")
+    sys.exit(0)
+
+
+def run_traced(args: "argparse.Namespace", metrics: bool) -> bool:
+    """run_installer under --trace/--profile/--metrics-file, writing their files however it ends."""
+    # sys.exit() inside the run still leaves through the finally, so a failed run is traced too
+    profile = cProfile.Profile() if args.profile else None
+    Metrics.reset()
+    Tracer.start(trace=bool(args.trace or metrics), profile=bool(args.profile))
+    if profile:
+        profile.enable()
+    try:
+        with Tracer.span("main", argv=" ".join(sys.argv[1:])):
+            return run_installer(args)
+    finally:
+        if profile:
+            profile.disable()
+        Tracer.stop()
+        if metrics:
+            Metrics.write(args.metrics_file)
+        if args.trace and Tracer.write_trace(args.trace):
+            print(f"📈 Trace written to {args.trace} (open in ui.perfetto.dev or chrome://tracing)")
+        if profile and Tracer.write_profile(args.profile, profile):
+            print(f"📈 Profile written to {args.profile} (python3 -m pstats {args.profile})")
+
+
+def run_installer(args: "argparse.Namespace") -> bool:
+    """Run the installer for parsed command-line arguments; True when it should pause before exiting."""
+    server_mode = args.server
+    dry_run = args.dry_run
+    apt_batch = not args.no_apt_batch
+    Installer.spool_dir = args.spool_dir
+    if args.spool_dir and not (os.path.isdir(args.spool_dir) and os.access(args.spool_dir, os.W_OK | os.X_OK)):
+        print(f"Error: --spool-dir {args.spool_dir} is not a writable directory", file=sys.stderr)
+        sys.exit(1)
+
+    if args.check:
+        sys.exit(check_installed(server_mode=server_mode))
+    if args.check_updates:
+        sys.exit(UpdateChecker.run(server_mode=server_mode))
+
+    if args.fleet:
+        try:
+            hosts = Fleet.read_inventory(args.fleet)
+        except OSError as exc:
+            print(f"Error: cannot read inventory {args.fleet}: {exc}", file=sys.stderr)
+            sys.exit(1)
+        if not hosts:
+            print(f"Error: no hosts in {args.fleet}", file=sys.stderr)
+            sys.exit(1)
+        if not args.yes and not get_user_consent(server_mode=server_mode, dry_run=dry_run):
+            print("\nInstallation cancelled by user.")
+            sys.exit(0)
+        print(f"\n🌐 Provisioning {len(hosts)} host(s), {args.fleet_parallel} at a time...")
+        results = Fleet.run(hosts, TRANSPORTS[args.transport](), Fleet.worker_args(args),
+                            pathlib.Path(__file__).read_bytes(), parallelism=args.fleet_parallel,
+                            log_dir=args.fleet_logs)
+        Fleet.print_summary(results, dry_run=dry_run)
+        sys.exit(0 if all(result.ok for result in results) else 1)
+
+    # System check
+    is_compatible, error_msg = SystemChecker.check_system()
+    if not is_compatible:
+        print(f"Error: {error_msg}", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.export_bundle:
+        catalog = [tool for tools in ToolManager.get_tools_by_category(server_mode=server_mode).values()
+                   for tool in tools]
+        sys.exit(0 if Bundle.export(args.export_bundle, catalog) else 1)
+
+    # Get tools by category for better organization
+    tools_by_category = ToolManager.get_tools_by_category(server_mode=server_mode)
+    all_tools = [tool for tools in tools_by_category.values() for tool in tools]
+
+    # Nothing to consent to when the state manifest vouches for every tool
+    state = StateManifest.load()
+    statuses = {tool.name: StateManifest.status(state, tool) for tool in all_tools}
+    converged = bool(statuses) and all(statuses.values()) and not args.from_bundle
+
+    # Get user consent
+    if not args.yes and not converged and not get_user_consent(server_mode=server_mode, dry_run=dry_run):
+        print("\nInstallation cancelled by user.")
+        sys.exit(0)
+    
+    # Track installation results
+    installed_count = 0
+    skipped_count = 0
+    failed_count = 0
+    
+    print("\n" + "="*70)
+    if dry_run:
+        print("👀 DRY RUN: Previewing what would be installed...")
+    else:
+        print("🔍 Checking and installing tools...")
+    print("="*70 + "\n")
+    
+    # Check everything first so APT tools can be installed as one transaction
+    with Tracer.span("check installed"):
+        installed = {
+            tool.name: ToolManager.check_tool_installed(tool) if statuses[tool.name] is None
+            else statuses[tool.name]
+            for tool in all_tools
+        }
+
+    pending_apt = [
+        tool
+        for tools in tools_by_category.values()
+        for tool in sorted(tools, key=lambda t: t.name)
+        if not installed[tool.name] and tool.method == InstallMethod.APT
+    ]
+    apt_packages = {tool.package for tool in pending_apt}
+    if any(not installed[tool.name] and tool.method == InstallMethod.NPM
+           for tools in tools_by_category.values() for tool in tools):
+        if not SystemChecker.has_command("npm"):
+            # install_via_npm pulls npm itself from apt
+            apt_packages.add("npm")
+    pending_pip = [
+        tool
+        for tools in tools_by_category.values()
+        for tool in sorted(tools, key=lambda t: t.name)
+        if not installed[tool.name] and tool.method == InstallMethod.PIP
+    ]
+    if pending_pip and Installer.venv_needs_apt():
+        apt_packages.add("python3-venv")
+
+    # Everything else, bar built-ins; APT and PIP tools join their single batch instead
+    batch = pending_apt if apt_batch else []
+    pending_rest = [
+        tool
+        for tools in tools_by_category.values()
+        for tool in sorted(tools, key=lambda t: t.name)
+        if not installed[tool.name] and tool not in batch and tool not in pending_pip
+        and tool.method != InstallMethod.BUILTIN
+    ]
+
+    def prepare_apt() -> bool:
+        return prepare_apt_packages(apt_packages, dry_run=dry_run, max_age=args.apt_max_age,
+                                    lazy=args.lazy_update)
+
+    batch_results: Dict[str, bool] = {}
+    engine_results: Dict[str, Tuple[bool, str]] = {}
+    if args.from_bundle:
+        with tempfile.TemporaryDirectory(prefix="bundle-", dir=Installer.spool_dir) as bundle_root:
+            manifest = Bundle.unpack(args.from_bundle, bundle_root)
+            if manifest is None:
+                print(f"Error: {args.from_bundle} is not a usable bundle", file=sys.stderr)
+                sys.exit(1)
+            Installer.offline = True
+            print(f"\n📦 [Bundle: {os.path.basename(args.from_bundle)}]")
+            print("-" * 70)
+            batch_results = Bundle.install(bundle_root, manifest, batch + pending_pip + pending_rest,
+                                           dry_run=dry_run)
+    elif dry_run or args.jobs <= 1:
+        prepare_apt()
+
+        # Release metadata for GitHub-hosted installs downloads while apt works
+        prefetch = None
+        if not dry_run:
+            repos = ["schollz/croc"] if any(tool.name == "croc" for tool in pending_rest) else []
+            repos += [tool.github_repo for tool in pending_rest if tool.method == InstallMethod.EGET]
+            if repos:
+                prefetch = threading.Thread(target=Installer.prefetch_release_metadata, args=(repos,), daemon=True)
+                prefetch.start()
+
+        if batch:
+            print("\n📦 [APT packages]")
+            print("-" * 70)
+            batch_results.update(ToolManager.install_apt_tools(batch, dry_run=dry_run))
+        if pending_pip:
+            print("\n📦 [PIP packages]")
+            print("-" * 70)
+            batch_results.update(ToolManager.install_pip_tools(pending_pip, dry_run=dry_run))
+        if prefetch:
+            prefetch.join()
+    else:
+        # One DAG: bootstraps (apt lists, npm, venv) first, then everything waiting
+        # on them. Output is held back and printed below in catalog order.
+        total = len(pending_rest) + len(batch) + len(pending_pip)
+        if total and not Installer.acquire_sudo():
+            print("Error: could not get sudo credentials (rerun with --jobs 1 to answer prompts as they come)",
+                  file=sys.stderr)
+            sys.exit(1)
+        print(f"\n⚙ Installing {total} tool(s), up to {args.jobs} at a time...")
+        jobs, batch_results = ToolManager.plan_jobs(pending_rest, batch, prepare_apt, pending_pip)
+        with Tracer.span("install", jobs=len(jobs), workers=args.jobs), Installer.sudo_keepalive():
+            engine_results = InstallEngine.run(jobs, args.jobs)
+        for name in ToolManager.BOOTSTRAP_NEEDS:
+            if name in engine_results:
+                sys.stdout.write(engine_results[name][1])
+        for name, title in (("apt-batch", "APT packages"), ("pip-batch", "PIP packages")):
+            if name in engine_results:
+                print(f"\n📦 [{title}]")
+                print("-" * 70)
+                sys.stdout.write(engine_results[name][1])
+
+    # Process tools by category
+    newly = set()
+    for category, tools in tools_by_category.items():
+        print(f"\n📦 [{category}]")
+        print("-" * 70)
+        
+        # Sort alphabetically for consistent output
+        for tool in sorted(tools, key=lambda t: t.name):
+            if installed[tool.name]:
+                print(f"✓ {tool.name:30} - Already installed")
+                skipped_count += 1
+                Metrics.outcome(tool, "skipped")
+            else:
+                print(f"✗ {tool.name:30} - Not installed, {'would install' if dry_run else 'installing'}...")
+                if tool.name in batch_results:
+                    ok = batch_results[tool.name]
+                elif tool.name in engine_results:
+                    ok, output = engine_results[tool.name]
+                    sys.stdout.write(output)
+                else:
+                    ok = ToolManager.install_tool(tool, dry_run=dry_run)
+                if ok:
+                    if dry_run:
+                        print(f"  ✓ {tool.name} would be installed successfully")
+                    else:
+                        print(f"  ✓ {tool.name} installed successfully")
+                        newly.add(tool.name)
+                    installed_count += 1
+                else:
+                    print(f"  ✗ {tool.name} installation failed")
+                    failed_count += 1
+                Metrics.outcome(tool, "installed" if ok else "failed")
+    
+    if not dry_run:
+        StateManifest.update(state, all_tools, statuses, installed, newly)
+
+    # Summary - clear and friendly for lazy users
+    print("\n" + "="*70)
+    if dry_run:
+        print("👀 DRY RUN Complete!")
+    else:
+        print("✨ Installation Complete!")
+    print("="*70)
+    print(f"✓ Already installed: {skipped_count}")
+    if dry_run:
+        print(f"👀 Would install:      {installed_count}")
+    else:
+        print(f"✓ Newly installed:   {installed_count}")
+    if failed_count > 0:
+        print(f"⚠ Failed:            {failed_count}")
+    else:
+        print(f"✓ Failed:            {failed_count}")
+    print("="*70)
+    
+    if dry_run:
+        print("\n👀 This was a DRY RUN - no changes were made.")
+        print("   Run without --dry-run to actually install the tools.")
+    elif failed_count > 0:
+        print("\n⚠ Some tools failed to install. Check the output above for details.")
+        print("   Some tools may require manual installation or different methods.")
+    else:
+        print("\n🎉 All tools installed successfully! You're all set!")
+    
+    print("\n💡 Tip: You can run this script again anytime to check for updates.")
+    if args.fleet_report:
+        print(FLEET_REPORT_PREFIX + json.dumps(
+            {"installed": installed_count, "skipped": skipped_count, "failed": failed_count}))
+    return not dry_run and not args.yes and not converged
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for Lazy-Linux-Tool-Installer.py
+Measures the installer's own overhead, without installing anything.
+
+  startup   import + argument parsing + `--check`, each in a fresh interpreter,
+            against a millisecond budget (for health checks run every few minutes)
+  catalog   synthetic catalogs of 100-10,000 tools on a fake machine (subprocess and
+            network stubbed with configurable latencies): categorize, installed-state
+            check, planning and the full main() loop, as per-phase percentiles
+"""
+
+import argparse
+import contextlib
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from unittest.mock import patch
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Lazy-Linux-Tool-Installer.py")
+
+# Median import + parse + check, in ms, that `startup` accepts
+STARTUP_BUDGET_MS = 100
+# Modules the --check path must never import (they are what made startup slow)
+CHECK_FORBIDDEN_MODULES = ("http.client", "ssl", "subprocess", "tarfile", "hashlib", "json",
+                           "tempfile", "platform", "concurrent.futures")
+
+# Bumped whenever the JSON report layout changes
+REPORT_SCHEMA = 1
+CATALOG_SIZES = (100, 1000, 10000)
+CATALOG_PHASES = ("categorize", "check", "plan", "main", "rerun")
+# Share of synthetic tools per install method (weights)
+METHOD_MIX = (("APT", 50), ("EGET", 20), ("PIP", 10), ("NPM", 8), ("SNAP", 7), ("BUILTIN", 5))
+# Unrelated packages in the fake dpkg database, as on a typical desktop
+BACKGROUND_PACKAGES = 1500
+# Commands that would talk to the network on a real machine
+NETWORK_COMMANDS = ("apt-get", "npm", "snap", "pip")
+
+# Runs inside a fresh interpreter: time each phase, report them as JSON on stdout
+_STARTUP_CHILD = """
+import contextlib, importlib.util, io, sys, time
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location("dlt", sys.argv[1])
+dlt = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(dlt)
+imported = time.perf_counter()
+sys.argv = ["Lazy-Linux-Tool-Installer.py", "--check"]
+args = dlt.parse_arguments()
+parsed = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    dlt.check_installed(server_mode=args.server)
+checked = time.perf_counter()
+modules = sorted(sys.modules)
+import json
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "parse_ms": (parsed - imported) * 1000,
+    "check_ms": (checked - parsed) * 1000,
+    "modules": modules,
+}))
+"""
+
+
+def percentiles(samples):
+    """p50/p90/p99/max of samples, rounded for stable output."""
+    ordered = sorted(samples)
+
+    def pick(fraction):
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 3)
+
+    return {"p50": round(statistics.median(ordered), 3), "p90": pick(0.9), "p99": pick(0.99),
+            "max": round(ordered[-1], 3)}
+
+
+def bench_startup(runs, budget_ms):
+    """Import, parse and --check in fresh interpreters; returns (report, within_budget)."""
+    # Hosts keep bytecode caches; measure loading them, not compiling (even if this shell disables them)
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONDONTWRITEBYTECODE"}
+    subprocess.run([sys.executable, "-c", _STARTUP_CHILD, SCRIPT_PATH], check=True, capture_output=True, env=env)
+    phases = {"import_ms": [], "parse_ms": [], "check_ms": [], "total_ms": [], "script_ms": []}
+    leaked = set()
+    for _ in range(runs):
+        child = subprocess.run([sys.executable, "-c", _STARTUP_CHILD, SCRIPT_PATH],
+                               check=True, capture_output=True, text=True, env=env)
+        sample = json.loads(child.stdout)
+        for phase in ("import_ms", "parse_ms", "check_ms"):
+            phases[phase].append(sample[phase])
+        phases["total_ms"].append(sample["import_ms"] + sample["parse_ms"] + sample["check_ms"])
+        leaked.update(name for name in CHECK_FORBIDDEN_MODULES if name in sample["modules"])
+
+        # What a health check actually runs; includes interpreter start and compiling the script
+        start = time.perf_counter()
+        subprocess.run([sys.executable, SCRIPT_PATH, "--check"], capture_output=True, env=env)
+        phases["script_ms"].append((time.perf_counter() - start) * 1000)
+
+    report = {
+        "benchmark": "startup",
+        "runs": runs,
+        "budget_ms": budget_ms,
+        "phases": {phase: percentiles(samples) for phase, samples in phases.items()},
+        "forbidden_modules_loaded": sorted(leaked),
+    }
+    ok = report["phases"]["total_ms"]["p50"] <= budget_ms and not leaked
+    return report, ok
+
+
+def load_installer():
+    """A fresh copy of the installer module (so no cache survives from one run to the next)."""
+    spec = importlib.util.spec_from_file_location("lazy_linux_tool_installer", SCRIPT_PATH)
+    dlt = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(dlt)
+    return dlt
+
+
+def synthetic_catalog(dlt, size, seed=0):
+    """size Tool entries across twelve categories, methods mixed as METHOD_MIX."""
+    rng = random.Random(seed)
+    methods = [getattr(dlt.InstallMethod, name) for name, weight in METHOD_MIX for _ in range(weight)]
+    tools = {}
+    for index in range(size):
+        name = f"tool{index:05d}"
+        method = rng.choice(methods)
+        tools[name] = dlt.Tool(
+            name=name,
+            command=name,
+            method=method,
+            package=f"pkg-{name}" if method == dlt.InstallMethod.APT else name,
+            description=f"Synthetic tool {index}",
+            category=f"Category {index % 12:02d}",
+            requires_gui=index % 10 == 0,
+            github_repo=f"synthetic/{name}" if method == dlt.InstallMethod.EGET else None,
+        )
+    return tools
+
+
+class FakeMachine:
+    """A throwaway host for one run: PATH, dpkg database, venv and caches in a temp dir.
+
+    subprocess is replaced by a backend that sleeps the configured latency
+    and acts out what the real command would leave behind (mv, ln and pip
+    outputs), and downloads by one that serves synthetic GitHub releases,
+    so the installer's own bookkeeping runs for real.
+    """
+
+    def __init__(self, dlt, catalog, installed, cmd_latency, net_latency, seed=0):
+        self.dlt = dlt
+        self.catalog = catalog
+        self.cmd_latency = cmd_latency
+        self.net_latency = net_latency
+        rng = random.Random(seed + 1)
+        self.installed = {name for name in catalog if rng.random() < installed}
+        self._stack = contextlib.ExitStack()
+
+    def __enter__(self):
+        dlt = self.dlt
+        root = self._stack.enter_context(tempfile.TemporaryDirectory(prefix="lazy-bench-"))
+        self.bin_dir = os.path.join(root, "bin")
+        venv = os.path.join(root, "venv")
+        for directory in (self.bin_dir, os.path.join(venv, "bin"), os.path.join(root, "lists"),
+                          os.path.join(root, "work")):
+            os.makedirs(directory)
+        self._touch(os.path.join(venv, "bin", "python"))
+        for command in ("sudo", "apt-get", "apt-cache", "dpkg", "curl", "npm", "snap"):
+            self._touch(os.path.join(self.bin_dir, command))
+
+        stanzas = [f"Package: base{index:05d}\nStatus: install ok installed\nVersion: 1.0\n"
+                   f"Architecture: amd64\nDescription: background package\n continuation line\n"
+                   for index in range(BACKGROUND_PACKAGES)]
+        for name in sorted(self.installed):
+            tool = self.catalog[name]
+            if tool.method == dlt.InstallMethod.APT:
+                stanzas.append(f"Package: {tool.package}\nStatus: install ok installed\nVersion: 1.0\n"
+                               f"Architecture: amd64\n")
+            elif tool.method != dlt.InstallMethod.BUILTIN:
+                self._touch(os.path.join(self.bin_dir, tool.command))
+        status = os.path.join(root, "status")
+        with open(status, "w", encoding="utf-8") as handle:
+            handle.write("\n".join(stanzas))
+
+        elf = shutil.which("true")
+        if elf and open(elf, "rb").read(4) == dlt.ELF_MAGIC:
+            with open(elf, "rb") as handle:
+                self.binary = handle.read()
+        else:
+            self.binary = b"#!/bin/sh\n"
+        self.binary_digest = hashlib.sha256(self.binary).hexdigest()
+        fake_subprocess = types.SimpleNamespace(
+            run=self.run, Popen=self.popen, CompletedProcess=subprocess.CompletedProcess,
+            TimeoutExpired=subprocess.TimeoutExpired, CalledProcessError=subprocess.CalledProcessError,
+            DEVNULL=subprocess.DEVNULL, PIPE=subprocess.PIPE,
+        )
+        for name, value in (("subprocess", fake_subprocess), ("INSTALL_BIN_DIR", self.bin_dir),
+                            ("DPKG_STATUS_PATH", status), ("APT_LISTS_DIR", os.path.join(root, "lists")),
+                            ("CACHE_DIR", os.path.join(root, "cache")), ("PIP_VENV_DIR", venv),
+                            ("PIP_WHEELHOUSE", os.path.join(root, "cache", "wheels")),
+                            ("STATE_DIR", os.path.join(root, "state"))):
+            self._stack.enter_context(patch.object(dlt, name, value))
+        self._stack.enter_context(patch.object(dlt.DownloadManager, "fetch", staticmethod(self.fetch)))
+        self._stack.enter_context(patch.dict(os.environ, {"PATH": self.bin_dir}))
+        self._stack.enter_context(patch.object(dlt.ToolManager, "TOOLS", self.catalog))
+        cwd = os.getcwd()
+        os.chdir(os.path.join(root, "work"))
+        self._stack.callback(os.chdir, cwd)
+        return self
+
+    def __exit__(self, *exc):
+        self._stack.close()
+
+    @staticmethod
+    def _touch(path):
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write("#!/bin/sh\n")
+        os.chmod(path, 0o755)
+
+    def _sleep(self, argv):
+        network = any(name in NETWORK_COMMANDS for name in map(os.path.basename, argv[:3]))
+        delay = self.cmd_latency + (self.net_latency if network else 0.0)
+        if delay:
+            time.sleep(delay)
+
+    def run(self, cmd, capture_output=False, text=False, **kwargs):
+        argv = cmd[1:] if cmd[0] == "sudo" else list(cmd)
+        self._sleep(argv)
+        program = os.path.basename(argv[0])
+        stdout = f"{program} 1.0\n"
+        if program == "apt-cache" and argv[1:2] == ["policy"]:
+            stdout = "".join(f"{package}:\n  Installed: (none)\n  Candidate: 1.0\n" for package in argv[2:])
+        elif program == "mv":
+            shutil.move(argv[1], argv[2])
+        elif program == "ln":
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(argv[-1])
+            os.symlink(argv[-2], argv[-1])
+        elif "pip" in argv and "install" in argv:
+            packages = argv[argv.index("install") + 1:]
+            skip = False
+            for arg in packages:
+                if skip or arg.startswith("-"):
+                    skip = arg in ("--find-links", "--wheel-dir")
+                    continue
+                self._touch(os.path.join(self.dlt.PIP_VENV_DIR, "bin", arg))
+        if not text:
+            stdout = stdout.encode()
+        return subprocess.CompletedProcess(cmd, 0, stdout, "" if text else b"")
+
+    def popen(self, cmd, **kwargs):
+        """Version probes: answer at once, like a healthy binary."""
+        self._sleep(cmd)
+        return types.SimpleNamespace(
+            args=cmd, returncode=0, pid=2 ** 30,  # Never a real process group, should anything kill it
+            communicate=lambda input=None, timeout=None: (f"{os.path.basename(cmd[0])} 1.0\n", ""),
+            poll=lambda: 0, wait=lambda timeout=None: 0, kill=lambda: None,
+        )
+
+    def fetch(self, url, dest=None, headers=None, max_time=None, body=None, resume=False):
+        """Serve synthetic/<name> latest-release metadata and its bare linux binary; 503 otherwise."""
+        if self.net_latency:
+            time.sleep(self.net_latency)
+        DownloadResult = self.dlt.DownloadResult
+        match = re.search(r"/repos/synthetic/([^/]+)/releases/latest$", url)
+        if match:
+            name = f"{match.group(1)}-linux-{self.dlt.Installer.linux_goarch()}"
+            release = {"tag_name": "v1.0", "assets": [{
+                "name": name, "size": len(self.binary), "digest": f"sha256:{self.binary_digest}",
+                "browser_download_url": f"https://github.com/synthetic/{match.group(1)}/releases/download/v1.0/{name}",
+            }]}
+            return DownloadResult(url, status=200, content=json.dumps(release).encode())
+        if "/synthetic/" in url and "/releases/download/" in url and dest:
+            with open(dest, "wb") as handle:
+                handle.write(self.binary)
+            return DownloadResult(url, status=200, size=len(self.binary), digest=self.binary_digest, path=dest)
+        return DownloadResult(url, status=503, error="network stubbed by benchmark")
+
+
+def _timed(function):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        result = function()
+    return (time.perf_counter() - start) * 1000, result, output.getvalue()
+
+
+def run_catalog_once(size, jobs, installed, cmd_latency, net_latency, seed):
+    """One pass over every phase on a fresh module and machine; returns ({phase: ms}, main outcome)."""
+    dlt = load_installer()
+    catalog = synthetic_catalog(dlt, size, seed)
+    with FakeMachine(dlt, catalog, installed, cmd_latency, net_latency, seed):
+        timings = {}
+        timings["categorize"], categories, _ = _timed(dlt.ToolManager.get_tools_by_category)
+        tools = [tool for group in categories.values() for tool in group]
+
+        timings["check"], state, _ = _timed(
+            lambda: {tool.name: dlt.ToolManager.check_tool_installed(tool) for tool in tools})
+
+        def plan():
+            pending = [tool for tool in tools if not state[tool.name]]
+            apt = [tool for tool in pending if tool.method == dlt.InstallMethod.APT]
+            pip = [tool for tool in pending if tool.method == dlt.InstallMethod.PIP]
+            rest = [tool for tool in pending if tool.method not in
+                    (dlt.InstallMethod.APT, dlt.InstallMethod.PIP, dlt.InstallMethod.BUILTIN)]
+            jobs_, _ = dlt.ToolManager.plan_jobs(rest, apt, lambda: True, pip)
+            return dlt.InstallEngine.chain_lengths(jobs_)
+        timings["plan"], _, _ = _timed(plan)
+
+        # main() checks everything again itself; start it from cold caches as a real run would
+        dlt.DpkgStatus._packages = None
+        dlt.PathIndex.invalidate()
+
+        def run_main():
+            argv = ["Lazy-Linux-Tool-Installer.py", "--yes", "--fleet-report", "--jobs", str(jobs)]
+            with patch.object(sys, "argv", argv), contextlib.suppress(SystemExit):
+                dlt.main()
+        timings["main"], _, output = _timed(run_main)
+        # Same machine again: converged tools are answered from the state manifest
+        timings["rerun"], _, _ = _timed(run_main)
+    return timings, dlt.Fleet.parse_report(output)
+
+
+def bench_catalog(sizes, repeat, jobs, installed, cmd_latency, net_latency, seed):
+    """Per-phase percentiles and throughput for each catalog size."""
+    results = []
+    for size in sizes:
+        samples = {phase: [] for phase in CATALOG_PHASES}
+        outcome = None
+        for _ in range(repeat):
+            timings, outcome = run_catalog_once(size, jobs, installed, cmd_latency, net_latency, seed)
+            for phase, elapsed in timings.items():
+                samples[phase].append(elapsed)
+        phases = {}
+        for phase, values in samples.items():
+            stats = percentiles(values)
+            stats["tools_per_s"] = round(size / (stats["p50"] / 1000), 1) if stats["p50"] else None
+            phases[phase] = stats
+        results.append({"size": size, "phases": phases, "main_outcome": outcome})
+    return {
+        "schema": REPORT_SCHEMA,
+        "benchmark": "catalog",
+        "config": {"sizes": list(sizes), "repeat": repeat, "jobs": jobs, "installed": installed,
+                   "cmd_latency_ms": cmd_latency * 1000, "net_latency_ms": net_latency * 1000, "seed": seed},
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Lazy-Linux-Tool-Installer.py overhead")
+    sub = parser.add_subparsers(dest="benchmark", required=True)
+    startup = sub.add_parser("startup", help="import + parse + --check time against a budget")
+    startup.add_argument("--runs", type=int, default=10)
+    startup.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    catalog = sub.add_parser("catalog", help="per-phase overhead on synthetic catalogs")
+    catalog.add_argument("--sizes", default=",".join(map(str, CATALOG_SIZES)),
+                         help="comma-separated catalog sizes")
+    catalog.add_argument("--repeat", type=int, default=3)
+    catalog.add_argument("--jobs", type=int, default=4, help="--jobs passed to main()")
+    catalog.add_argument("--installed", type=float, default=0.5, help="share of tools already installed")
+    catalog.add_argument("--cmd-latency-ms", type=float, default=0.0, help="added to every stubbed command")
+    catalog.add_argument("--net-latency-ms", type=float, default=0.0,
+                         help="added to stubbed downloads and network-bound commands")
+    catalog.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.benchmark == "catalog":
+        sizes = [int(size) for size in args.sizes.split(",") if size]
+        report = bench_catalog(sizes, args.repeat, args.jobs, args.installed,
+                               args.cmd_latency_ms / 1000, args.net_latency_ms / 1000, args.seed)
+        ok = True
+    else:
+        report, ok = bench_startup(args.runs, args.budget_ms)
+    print(json.dumps(report, indent=2, sort_keys=True))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,11 +11,21 @@ import sys
 import os
 import subprocess
 import shutil
+import struct
 import io
+import tarfile
 import json
+import hashlib
 import contextlib
+import tempfile
+import time
 import urllib.request
+import http.server
+import threading
 import urllib.error
+import types
+import zipfile
+import re
 
 # Import the module to test (handle hyphen in filename)
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -26,6 +36,13 @@ spec = importlib.util.spec_from_file_location(
 )
 dlt = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(dlt)
+# Never read or write this machine's real install-state manifest
+dlt.STATE_DIR = os.path.join(os.devnull, 'lazy-linux-tools')
+# Download retries happen at once rather than after a real backoff
+dlt.DOWNLOAD_BACKOFF = 0
+# Parallel installs never ask this machine's real sudo for a password
+acquire_sudo = dlt.Installer.acquire_sudo
+dlt.Installer.acquire_sudo = staticmethod(lambda: True)
 
 
 class TestSystemChecker(unittest.TestCase):
@@ -112,7 +129,7 @@ class TestSystemChecker(unittest.TestCase):
 
     @patch.object(dlt, 'shutil')
     def test_check_system_no_curl(self, mock_shutil):
-        """Test system check when curl is missing."""
+        """Test system check passes without curl (downloads run in-process)."""
         def which_side_effect(cmd):
             if cmd == 'apt-get':
                 return '/usr/bin/apt-get'
@@ -123,13 +140,17 @@ class TestSystemChecker(unittest.TestCase):
             return None
         mock_shutil.which.side_effect = which_side_effect
         is_compatible, error = dlt.SystemChecker.check_system()
-        self.assertFalse(is_compatible)
-        self.assertIsNotNone(error)
-        self.assertIn('curl', error)
+        self.assertTrue(is_compatible)
+        self.assertIsNone(error)
 
 
 class TestInstaller(unittest.TestCase):
     """Test Installer class."""
+
+    def setUp(self):
+        patcher = patch.object(dlt.Installer, '_bootstrap_failed', set())
+        patcher.start()
+        self.addCleanup(patcher.stop)
     
     @patch.object(dlt, 'subprocess')
     def test_run_command_success(self, mock_subprocess):
@@ -200,15 +221,92 @@ class TestInstaller(unittest.TestCase):
         result = dlt.Installer.install_via_apt('vim')
         self.assertFalse(result)
     
+    @patch.object(dlt, 'subprocess')
+    def test_install_apt_batch_single_transaction(self, mock_subprocess):
+        """All packages go to apt-get together when the batch succeeds."""
+        mock_subprocess.run.return_value = subprocess.CompletedProcess(['sudo'], 0)
+        with patch('builtins.print'):
+            failed = dlt.Installer.install_apt_batch(['vim', 'htop', 'nnn'])
+        self.assertEqual(failed, [])
+        mock_subprocess.run.assert_called_once()
+        self.assertEqual(mock_subprocess.run.call_args[0][0][-3:], ['vim', 'htop', 'nnn'])
+
+    @patch.object(dlt.subprocess, 'run')
+    def test_install_apt_batch_bisects_to_the_bad_package(self, mock_run):
+        """One broken package is isolated without sinking the rest."""
+        def run_side_effect(cmd, **kwargs):
+            return subprocess.CompletedProcess(cmd, 100 if 'broken' in cmd else 0)
+        mock_run.side_effect = run_side_effect
+        with patch('builtins.print'):
+            failed = dlt.Installer.install_apt_batch(['vim', 'htop', 'broken', 'nnn'])
+        self.assertEqual(failed, ['broken'])
+        installed = [c[0][0][4:] for c in mock_run.call_args_list if 'broken' not in c[0][0]]
+        self.assertEqual(sorted(p for batch in installed for p in batch), ['htop', 'nnn', 'vim'])
+
+    def _fake_venv(self, *commands):
+        """Point the managed venv and wheelhouse at a temp dir holding these entry points."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        venv = os.path.join(tmp.name, 'venv')
+        os.makedirs(os.path.join(venv, 'bin'))
+        for name in ('python',) + commands:
+            open(os.path.join(venv, 'bin', name), 'w').close()
+        for patcher in (patch.object(dlt, 'PIP_VENV_DIR', venv),
+                        patch.object(dlt, 'PIP_WHEELHOUSE', os.path.join(tmp.name, 'wheels'))):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        return venv
+
     @patch.object(dlt, 'subprocess')
     def test_install_via_pip_success(self, mock_subprocess):
         """Test successful pip installation."""
-        mock_subprocess.run.return_value = subprocess.CompletedProcess(['pip3'], 0)
+        venv = self._fake_venv('glances')
+        mock_subprocess.run.return_value = subprocess.CompletedProcess(['pip'], 0)
         result = dlt.Installer.install_via_pip('glances')
         self.assertTrue(result)
         # Verify timeout is set
-        call_kwargs = mock_subprocess.run.call_args[1]
+        call_kwargs = mock_subprocess.run.call_args_list[0][1]
         self.assertIn('timeout', call_kwargs)
+        # Installed into the managed venv (not pip3 --user), then linked onto PATH
+        pip_cmd = mock_subprocess.run.call_args_list[0][0][0]
+        self.assertEqual(pip_cmd[:3], [os.path.join(venv, 'bin', 'python'), '-m', 'pip'])
+        self.assertIn('--no-index', pip_cmd)
+        self.assertEqual(mock_subprocess.run.call_args[0][0][:3], ['sudo', 'ln', '-sfn'])
+
+    @patch.object(dlt.Installer, 'run_command')
+    def test_pip_install_builds_wheels_only_on_a_cache_miss(self, mock_run):
+        """A warm wheelhouse installs offline; a cold one runs pip wheel once, then installs offline."""
+        self._fake_venv()
+        mock_run.return_value = subprocess.CompletedProcess([], 0)
+        self.assertTrue(dlt.Installer._pip_install(['glances', 'tldr']))
+        self.assertEqual(mock_run.call_count, 1)
+
+        mock_run.reset_mock()
+        mock_run.side_effect = [subprocess.CompletedProcess([], 1), subprocess.CompletedProcess([], 0),
+                                subprocess.CompletedProcess([], 0)]
+        self.assertTrue(dlt.Installer._pip_install(['glances', 'tldr']))
+        commands = [c[0][0][4] for c in mock_run.call_args_list]
+        self.assertEqual(commands, ['install', 'wheel', 'install'])
+        self.assertIn('tldr', mock_run.call_args_list[1][0][0])
+
+    @patch.object(dlt.Installer, '_pip_install')
+    def test_install_pip_batch_bisects_failures(self, mock_install):
+        """One unresolvable package does not take the rest of the batch down."""
+        self._fake_venv()
+        mock_install.side_effect = lambda packages: 'broken' not in packages
+        with patch('builtins.print'):
+            failed = dlt.Installer.install_pip_batch(['glances', 'broken', 'tldr', 'eg'])
+        self.assertEqual(failed, ['broken'])
+
+    @patch.object(dlt.Installer, 'create_venv', return_value=False)
+    def test_install_pip_batch_fails_without_venv(self, mock_create):
+        """No venv means every package fails, and creation is attempted once."""
+        self._fake_venv()
+        os.unlink(dlt.Installer.venv_python())
+        with patch('builtins.print'):
+            self.assertEqual(dlt.Installer.install_pip_batch(['a', 'b']), ['a', 'b'])
+            self.assertEqual(dlt.Installer.install_pip_batch(['a']), ['a'])
+        mock_create.assert_called_once()
     
     @patch.object(dlt, 'subprocess')
     def test_install_via_snap_success(self, mock_subprocess):
@@ -248,37 +346,26 @@ class TestInstaller(unittest.TestCase):
         mock_apt.return_value = False
         self.assertFalse(dlt.Installer.install_via_npm('neoss'))
 
-    @patch.object(dlt.Installer, 'install_binary_to_path')
-    @patch.object(dlt, 'subprocess')
-    @patch.object(dlt, 'os')
-    @patch.object(dlt, 'shutil')
-    def test_install_via_eget_success(self, mock_shutil, mock_os, mock_subprocess, mock_install_bin):
-        """Test successful eget installation."""
-        mock_shutil.which.return_value = '/usr/local/bin/eget'
-        mock_subprocess.run.return_value = subprocess.CompletedProcess(['eget'], 0)
-        mock_os.path.exists.return_value = True
-        mock_install_bin.return_value = True
-        
-        result = dlt.Installer.install_via_eget('sharkdp/bat', 'bat')
-        self.assertTrue(result)
-        mock_install_bin.assert_called_once_with('bat', 'bat')
-        # Verify timeout is set for network operations
-        call_kwargs = mock_subprocess.run.call_args[1]
-        self.assertIn('timeout', call_kwargs)
-        self.assertGreaterEqual(call_kwargs['timeout'], 30)
+    @patch.object(dlt.Installer, 'run_command')
+    @patch.object(dlt.Installer, 'install_binary_to_path', return_value=True)
+    @patch.object(dlt.Installer, 'fetch_release_binary')
+    def test_install_via_eget_resolves_in_process(self, mock_fetch, mock_install_bin, mock_run):
+        """No eget binary and no eget process: the release asset is fetched into a private spool dir."""
+        mock_fetch.side_effect = lambda repo, name, dest: os.path.join(dest, name)
+        with patch('builtins.print'):
+            self.assertTrue(dlt.Installer.install_via_eget('sharkdp/bat', 'bat'))
+        repo, name, spool = mock_fetch.call_args[0]
+        self.assertEqual((repo, name), ('sharkdp/bat', 'bat'))
+        self.assertNotEqual(os.path.realpath(spool), os.path.realpath(os.getcwd()))
+        mock_install_bin.assert_called_once_with(os.path.join(spool, 'bat'), 'bat')
+        mock_run.assert_not_called()
 
-    @patch.object(dlt.Installer, 'install_eget')
-    @patch.object(dlt, 'subprocess')
-    @patch.object(dlt, 'os')
-    @patch.object(dlt, 'shutil')
-    def test_install_via_eget_no_eget(self, mock_shutil, mock_os, mock_subprocess, mock_install_eget):
-        """Test eget installation when eget is not installed."""
-        mock_shutil.which.return_value = None
-        mock_install_eget.return_value = False
-        
-        result = dlt.Installer.install_via_eget('sharkdp/bat', 'bat')
-        self.assertFalse(result)
-        mock_install_eget.assert_called_once()
+    @patch.object(dlt.Installer, 'install_binary_to_path')
+    @patch.object(dlt.Installer, 'fetch_release_binary', return_value=None)
+    def test_install_via_eget_failure(self, mock_fetch, mock_install_bin):
+        with patch('builtins.print'):
+            self.assertFalse(dlt.Installer.install_via_eget('sharkdp/bat', 'bat'))
+        mock_install_bin.assert_not_called()
 
     def test_parse_checksums_file(self):
         """Test checksum file parsing."""
@@ -291,6 +378,59 @@ class TestInstaller(unittest.TestCase):
         """Test binary sanity check rejects missing paths."""
         self.assertFalse(dlt.Installer.is_plausible_binary('/tmp/definitely-missing-linux-tools-bin'))
 
+    def _elf(self, machine=62, elf_class=2, data=1, interp=None):
+        """Write a minimal ELF file with an optional PT_INTERP segment."""
+        endian = '<' if data == 1 else '>'
+        if elf_class == 2:
+            layout, ph_layout, ehsize = 'HHIQQQIHHHHHH', 'IIQQQQQQ', 64
+        else:
+            layout, ph_layout, ehsize = 'HHIIIIIHHHHHH', 'IIIIIIII', 52
+        phentsize = struct.calcsize(endian + ph_layout)
+        interp_bytes = (interp.encode() + b'\0') if interp else b''
+        phnum = 1 if interp else 0
+        interp_offset = ehsize + phentsize * phnum
+        ident = b'\x7fELF' + bytes([elf_class, data, 1]) + b'\0' * 9
+        header = struct.pack(endian + layout, 2, machine, 1, 0, ehsize, 0, 0,
+                             ehsize, phentsize, phnum, 0, 0, 0)
+        program_headers = b''
+        if interp:
+            if elf_class == 2:
+                program_headers = struct.pack(endian + ph_layout, 3, 4, interp_offset, 0, 0,
+                                              len(interp_bytes), len(interp_bytes), 1)
+            else:
+                program_headers = struct.pack(endian + ph_layout, 3, interp_offset, 0, 0,
+                                              len(interp_bytes), len(interp_bytes), 4, 1)
+        handle = tempfile.NamedTemporaryFile(delete=False)
+        handle.write(ident + header + program_headers + interp_bytes)
+        handle.close()
+        self.addCleanup(os.unlink, handle.name)
+        return handle.name
+
+    @patch.object(dlt.Installer, 'linux_goarch', return_value='amd64')
+    def test_is_plausible_binary_accepts_matching_elf(self, mock_arch):
+        """A static amd64 ELF, or one whose loader exists, passes on amd64."""
+        self.assertTrue(dlt.Installer.is_plausible_binary(self._elf()))
+        self.assertTrue(dlt.Installer.is_plausible_binary(self._elf(interp=sys.executable)))
+
+    @patch.object(dlt.Installer, 'linux_goarch', return_value='amd64')
+    def test_is_plausible_binary_rejects_unrunnable_elf(self, mock_arch):
+        """Wrong machine, wrong class, big-endian, or a missing loader are refused."""
+        cases = {
+            'arm64 binary': self._elf(machine=183),
+            '32-bit class': self._elf(elf_class=1),
+            'big-endian': self._elf(data=2),
+            'missing loader': self._elf(interp='/lib/ld-musl-x86_64.so.1-not-here'),
+        }
+        for label, path in cases.items():
+            with self.subTest(label), patch('builtins.print'):
+                self.assertFalse(dlt.Installer.is_plausible_binary(path))
+
+    def test_read_elf_header_32_bit_interp(self):
+        """32-bit program headers are decoded with their own field layout."""
+        header = dlt.Installer.read_elf_header(self._elf(machine=40, elf_class=1, interp='/lib/ld-linux-armhf.so.3'))
+        self.assertEqual(header, {'class': 1, 'endian': '<', 'machine': 40,
+                                  'interp': '/lib/ld-linux-armhf.so.3'})
+
     def test_no_curl_pipe_to_shell_in_installer_source(self):
         """Guard against reintroducing curl|sh / curl|bash bootstrap."""
         source_path = os.path.join(os.path.dirname(__file__), 'Lazy-Linux-Tool-Installer.py')
@@ -321,9 +461,55 @@ class TestInstaller(unittest.TestCase):
         result = dlt.Installer.check_apt_available('nonexistent')
         self.assertFalse(result)
 
+    def test_parse_apt_policy(self):
+        """Candidates are read per stanza; '(none)' means not installable."""
+        content = (
+            "vim:\n"
+            "  Installed: (none)\n"
+            "  Candidate: 2:9.0.1378-2\n"
+            "  Version table:\n"
+            "     2:9.0.1378-2 500\n"
+            "        500 http://deb.debian.org/debian bookworm/main amd64 Packages\n"
+            "libc6:i386:\n"
+            "  Installed: (none)\n"
+            "  Candidate: (none)\n"
+        )
+        self.assertEqual(
+            dlt.Installer.parse_apt_policy(content),
+            {'vim': '2:9.0.1378-2', 'libc6': None},
+        )
+
+    @patch.dict(dlt.Installer._apt_candidates, {}, clear=True)
+    @patch.object(dlt, 'subprocess')
+    def test_resolve_apt_packages_single_call_then_lookup(self, mock_subprocess):
+        """One apt-cache policy call answers every later availability check."""
+        mock_subprocess.run.return_value = subprocess.CompletedProcess(
+            ['apt-cache'], 0, stdout="vim:\n  Installed: (none)\n  Candidate: 2:9.0\n"
+        )
+        resolved = dlt.Installer.resolve_apt_packages(['vim', 'nosuchpkg'])
+        self.assertEqual(resolved, {'vim': '2:9.0', 'nosuchpkg': None})
+        self.assertTrue(dlt.Installer.check_apt_available('vim'))
+        self.assertFalse(dlt.Installer.check_apt_available('nosuchpkg'))
+        mock_subprocess.run.assert_called_once()
+        self.assertEqual(mock_subprocess.run.call_args[0][0][:2], ['apt-cache', 'policy'])
+
+    @patch.dict(dlt.Installer._apt_candidates, {}, clear=True)
+    @patch.object(dlt, 'subprocess')
+    def test_resolve_apt_packages_failure_is_not_cached(self, mock_subprocess):
+        """A failed policy call must not mark packages unavailable."""
+        mock_subprocess.run.return_value = subprocess.CompletedProcess(['apt-cache'], 100, stdout='')
+        self.assertEqual(dlt.Installer.resolve_apt_packages(['vim']), {})
+        self.assertNotIn('vim', dlt.Installer._apt_candidates)
+
 
 class TestToolManager(unittest.TestCase):
     """Test ToolManager class."""
+
+    def setUp(self):
+        # Never consult the dpkg database of the machine running the tests
+        patcher = patch.object(dlt, 'DPKG_STATUS_PATH', '/nonexistent/dpkg/status')
+        patcher.start()
+        self.addCleanup(patcher.stop)
     
     def test_tools_dict_not_empty(self):
         """Test that TOOLS dictionary is populated."""
@@ -351,22 +537,37 @@ class TestToolManager(unittest.TestCase):
         total_in_categories = sum(len(tools) for tools in categories.values())
         self.assertEqual(total_in_categories, len(dlt.ToolManager.TOOLS))
     
-    @patch.object(dlt, 'shutil')
-    def test_check_tool_installed_true(self, mock_shutil):
+    @patch.object(dlt.PathIndex, 'find', return_value='/usr/bin/vim')
+    def test_check_tool_installed_true(self, mock_find):
         """Test tool installation check when installed."""
-        mock_shutil.which.return_value = '/usr/bin/vim'
         tool = dlt.ToolManager.TOOLS['vim']
         result = dlt.ToolManager.check_tool_installed(tool)
         self.assertTrue(result)
+        mock_find.assert_called_once_with('vim')
     
-    @patch.object(dlt, 'shutil')
-    def test_check_tool_installed_false(self, mock_shutil):
+    @patch.object(dlt.PathIndex, 'find', return_value=None)
+    def test_check_tool_installed_false(self, mock_find):
         """Test tool installation check when not installed."""
-        mock_shutil.which.return_value = None
         tool = dlt.ToolManager.TOOLS['vim']
         result = dlt.ToolManager.check_tool_installed(tool)
         self.assertFalse(result)
     
+    @patch.object(dlt.PathIndex, 'find', return_value=None)
+    @patch.object(dlt.DpkgStatus, 'is_installed', return_value=True)
+    def test_check_tool_installed_uses_dpkg_for_apt_tools(self, mock_dpkg, mock_find):
+        """A dpkg-installed package counts even when its command is not on PATH."""
+        tool = dlt.ToolManager.TOOLS['network-manager']
+        self.assertTrue(dlt.ToolManager.check_tool_installed(tool))
+        mock_dpkg.assert_called_once_with('network-manager')
+        mock_find.assert_not_called()
+
+    @patch.object(dlt.PathIndex, 'find', return_value='/usr/local/bin/glances')
+    @patch.object(dlt.DpkgStatus, 'is_installed')
+    def test_check_tool_installed_skips_dpkg_for_other_methods(self, mock_dpkg, mock_find):
+        """Only APT tools are looked up in the dpkg database."""
+        self.assertTrue(dlt.ToolManager.check_tool_installed(dlt.ToolManager.TOOLS['glances']))
+        mock_dpkg.assert_not_called()
+
     @patch.object(dlt, 'shutil')
     @patch.object(dlt.Installer, 'check_apt_available')
     @patch.object(dlt.Installer, 'install_via_apt')
@@ -425,6 +626,19 @@ class TestToolManager(unittest.TestCase):
         self.assertTrue(dlt.ToolManager.install_tool(tool))
         mock_install.assert_called_once_with('neoss')
 
+    @patch.object(dlt.ToolManager, 'report_path_visibility')
+    @patch.object(dlt.Installer, 'install_apt_batch')
+    @patch.object(dlt.Installer, 'check_apt_available')
+    def test_install_apt_tools_batches_available_packages(self, mock_check, mock_batch, mock_report):
+        """Unavailable packages fail up front; the rest share one transaction."""
+        mock_check.side_effect = lambda pkg: pkg != 'fd-find'
+        mock_batch.return_value = ['htop']
+        tools = [dlt.ToolManager.TOOLS[name] for name in ('vim', 'htop', 'fd')]
+        with patch('builtins.print'):
+            results = dlt.ToolManager.install_apt_tools(tools)
+        mock_batch.assert_called_once_with(['vim', 'htop'])
+        self.assertEqual(results, {'vim': True, 'htop': False, 'fd': False})
+
     def test_every_method_is_handled_by_install_tool(self):
         """Every InstallMethod a tool actually uses must have a dry-run branch.
 
@@ -529,6 +743,1723 @@ class TestGetUserConsent(unittest.TestCase):
         self.assertFalse(result)
 
 
+class TestPathIndex(unittest.TestCase):
+    """Test the single-scan PATH index."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.bin_dir = os.path.join(self._tmp.name, 'bin')
+        self.local_dir = os.path.join(self._tmp.name, 'local')
+        os.makedirs(self.bin_dir)
+        os.makedirs(self.local_dir)
+        for patcher in (patch.dict(os.environ, {'PATH': self.bin_dir}),
+                        patch.object(dlt, 'INSTALL_BIN_DIR', self.local_dir),
+                        patch.dict(dlt.PathIndex._listings, {}, clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        dlt.PathIndex.invalidate()
+
+    def _executable(self, directory, name, mode=0o755):
+        path = os.path.join(directory, name)
+        with open(path, 'w') as handle:
+            handle.write('#!/bin/sh\n')
+        os.chmod(path, mode)
+        return path
+
+    def test_find_matches_path_entries_and_skips_non_executables(self):
+        """Hits are executable files; plain files are ignored like shutil.which does."""
+        vim = self._executable(self.bin_dir, 'vim')
+        self._executable(self.bin_dir, 'notes', mode=0o644)
+        self.assertEqual(dlt.PathIndex.find('vim'), vim)
+        self.assertIsNone(dlt.PathIndex.find('notes'))
+        self.assertIsNone(dlt.PathIndex.find('missing'))
+
+    def test_install_bin_dir_is_searched_even_off_path(self):
+        """A binary just moved into INSTALL_BIN_DIR is found before PATH is updated."""
+        eget = self._executable(self.local_dir, 'eget')
+        self.assertEqual(dlt.PathIndex.find('eget'), eget)
+
+    def test_each_directory_is_listed_once(self):
+        """Many lookups share one listing per directory until something changes."""
+        self._executable(self.bin_dir, 'vim')
+        with patch.object(dlt.os, 'listdir', wraps=os.listdir) as mock_listdir:
+            for _ in range(20):
+                dlt.PathIndex.find('vim')
+                dlt.PathIndex.find('htop')
+        self.assertEqual(mock_listdir.call_count, 2)
+
+    def test_changed_directory_is_relisted_after_invalidate(self):
+        """A new file bumps the directory mtime and shows up after invalidation."""
+        self.assertIsNone(dlt.PathIndex.find('htop'))
+        htop = self._executable(self.bin_dir, 'htop')
+        os.utime(self.bin_dir, (time.time() + 5, time.time() + 5))
+        dlt.PathIndex.invalidate()
+        self.assertEqual(dlt.PathIndex.find('htop'), htop)
+
+    def test_file_added_in_the_same_mtime_tick_is_still_found(self):
+        """A directory listed moments after a change cannot trust its mtime; misses there are stat'ed."""
+        self.assertIsNone(dlt.PathIndex.find('htop'))
+        mtime = os.stat(self.bin_dir).st_mtime
+        htop = self._executable(self.bin_dir, 'htop')
+        os.utime(self.bin_dir, (mtime, mtime))  # Same coarse clock tick as the listing
+        dlt.PathIndex.invalidate()
+        self.assertEqual(dlt.PathIndex.find('htop'), htop)
+
+    def test_invalidate_during_a_refresh_forces_another(self):
+        """A refresh that overlapped an invalidate() does not leave the index marked fresh."""
+        real_listdir = os.listdir
+        old = time.time() - 3600
+        os.utime(self.local_dir, (old, old))
+
+        def listdir_then_install(path):
+            names = real_listdir(path)
+            if path == self.local_dir:
+                self._executable(self.local_dir, 'eget')
+                os.utime(self.local_dir, (old + 10, old + 10))
+                dlt.PathIndex.invalidate()
+            return names
+
+        with patch.object(dlt.os, 'listdir', side_effect=listdir_then_install):
+            self.assertIsNone(dlt.PathIndex.find('eget'))
+        self.assertEqual(dlt.PathIndex.find('eget'), os.path.join(self.local_dir, 'eget'))
+
+
+@unittest.skipIf(os.name != 'posix', "probe scripts need a POSIX shell")
+class TestValidationProbes(unittest.TestCase):
+    """Test learned probe flags and concurrent post-install probes."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.bin_dir = os.path.join(self._tmp.name, 'bin')
+        os.makedirs(self.bin_dir)
+        for patcher in (patch.object(dlt, 'CACHE_DIR', os.path.join(self._tmp.name, 'cache')),
+                        patch.object(dlt, 'INSTALL_BIN_DIR', self.bin_dir),
+                        patch.object(dlt, 'VALIDATE_CMD_TIMEOUT', 10),
+                        patch.object(dlt.ProbeFlagCache, '_flags', None),
+                        patch('builtins.print')):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _tool(self, name, answers_to):
+        """A fake TUI that hangs on every flag except the one it understands."""
+        path = os.path.join(self.bin_dir, name)
+        with open(path, 'w') as handle:
+            handle.write(f'#!/bin/sh\nif [ "$1" = "{answers_to}" ]; then echo usage; exit 0; fi\nsleep 30\n')
+        os.chmod(path, 0o755)
+        return path
+
+    @patch.object(dlt.Installer, 'race_probes')
+    def test_cold_run_tries_version_alone_first(self, mock_race):
+        """With nothing learned, --version is spawned alone and no race starts."""
+        self._tool('cli', '--version')
+        with patch.object(dlt.Installer, 'run_command', wraps=dlt.Installer.run_command) as mock_run:
+            self.assertTrue(dlt.Installer.validate_installed_command('cli'))
+        mock_run.assert_called_once()
+        self.assertEqual(mock_run.call_args[0][0][1], '--version')
+        mock_race.assert_not_called()
+        self.assertEqual(dlt.ProbeFlagCache.get('cli'), '--version')
+
+    @patch.object(dlt, 'VALIDATE_CMD_TIMEOUT', 2)
+    def test_probes_race_and_the_winner_is_learned(self):
+        """After --version times out, the other hanging flags do not serialize."""
+        self._tool('tui', '-h')
+        started = time.monotonic()
+        self.assertTrue(dlt.Installer.validate_installed_command('tui'))
+        self.assertLess(time.monotonic() - started, 2 * dlt.VALIDATE_CMD_TIMEOUT)
+        self.assertEqual(dlt.ProbeFlagCache.get('tui'), '-h')
+        with open(dlt.ProbeFlagCache.path()) as handle:
+            self.assertEqual(json.load(handle), {'tui': '-h'})
+
+    @patch.object(dlt.Installer, 'race_probes')
+    def test_learned_flag_needs_one_spawn(self, mock_race):
+        """On a warm run the remembered flag is tried alone and first."""
+        self._tool('tui', 'version')
+        dlt.ProbeFlagCache.remember('tui', 'version')
+        with patch.object(dlt.Installer, 'run_command', wraps=dlt.Installer.run_command) as mock_run:
+            self.assertTrue(dlt.Installer.validate_installed_command('tui'))
+        mock_run.assert_called_once()
+        self.assertEqual(mock_run.call_args[0][0][1], 'version')
+        mock_race.assert_not_called()
+
+    def test_no_answer_fails(self):
+        """A command that answers nothing fails validation."""
+        path = os.path.join(self.bin_dir, 'mute')
+        with open(path, 'w') as handle:
+            handle.write('#!/bin/sh\nexit 3\n')
+        os.chmod(path, 0o755)
+        self.assertFalse(dlt.Installer.validate_installed_command('mute'))
+        self.assertIsNone(dlt.ProbeFlagCache.get('mute'))
+
+
+class TestDpkgStatus(unittest.TestCase):
+    """Test the in-process dpkg status reader."""
+
+    STATUS = (
+        "Package: bat\n"
+        "Status: install ok installed\n"
+        "Architecture: amd64\n"
+        "Version: 0.22.1-4\n"
+        "Description: cat(1) clone with syntax highlighting\n"
+        " Package: not-a-real-field\n"
+        "\n"
+        "Package: nmap\n"
+        "Status: deinstall ok config-files\n"
+        "Version: 7.93+dfsg1-1\n"
+    )
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = os.path.join(self._tmp.name, 'status')
+        with open(self.path, 'w') as handle:
+            handle.write(self.STATUS)
+        for patcher in (patch.object(dlt, 'DPKG_STATUS_PATH', self.path),
+                        patch.object(dlt.DpkgStatus, '_packages', None),
+                        patch.object(dlt.DpkgStatus, '_mtime', None)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_parse_states_versions_and_arch_keys(self):
+        """Each stanza yields (state, version); continuation lines are ignored."""
+        packages = dlt.DpkgStatus.parse(self.STATUS)
+        self.assertEqual(packages['bat'], ('installed', '0.22.1-4'))
+        self.assertEqual(packages['bat:amd64'], ('installed', '0.22.1-4'))
+        self.assertEqual(packages['nmap'], ('config-files', '7.93+dfsg1-1'))
+        self.assertNotIn('not-a-real-field', packages)
+
+    def test_is_installed(self):
+        """Removed-but-configured and unknown packages are not installed."""
+        self.assertTrue(dlt.DpkgStatus.is_installed('bat'))
+        self.assertFalse(dlt.DpkgStatus.is_installed('nmap'))
+        self.assertFalse(dlt.DpkgStatus.is_installed('fd-find'))
+
+    def test_file_is_parsed_once_until_it_changes(self):
+        """Repeated lookups reuse the parsed map; a new mtime forces a re-read."""
+        with patch.object(dlt.DpkgStatus, 'parse', wraps=dlt.DpkgStatus.parse) as mock_parse:
+            for _ in range(10):
+                dlt.DpkgStatus.is_installed('bat')
+            self.assertEqual(mock_parse.call_count, 1)
+            with open(self.path, 'a') as handle:
+                handle.write("\nPackage: fd-find\nStatus: install ok installed\nVersion: 8.6.0-3\n")
+            os.utime(self.path, (time.time() + 5, time.time() + 5))
+            self.assertTrue(dlt.DpkgStatus.is_installed('fd-find'))
+            self.assertEqual(mock_parse.call_count, 2)
+
+    def test_missing_database_is_unknown(self):
+        """Without a dpkg database the answer is None, not False."""
+        os.unlink(self.path)
+        self.assertIsNone(dlt.DpkgStatus.is_installed('bat'))
+
+
+class TestReleaseCache(unittest.TestCase):
+    """Test the on-disk GitHub release metadata cache."""
+
+    RELEASE = {
+        'tag_name': 'v1.2.3',
+        'body': 'long release notes that should not be cached',
+        'assets': [{'name': 'tool_linux_amd64.tar.gz',
+                    'browser_download_url': 'https://example.invalid/tool.tar.gz',
+                    'size': 10, 'uploader': {'login': 'someone'}}],
+    }
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        for patcher in (patch.object(dlt, 'CACHE_DIR', self._tmp.name),
+                        patch.dict(dlt.ReleaseCache._memo, {}, clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _serve(self, status, etag='"abc"'):
+        def fetch(url, dest=None, headers=None, max_time=None):
+            content = json.dumps(self.RELEASE).encode() if status == 200 else None
+            return dlt.DownloadResult(url=url, status=status, content=content, headers={'etag': etag})
+        return fetch
+
+    def test_first_fetch_stores_compacted_entry(self):
+        """Only tag, asset names/URLs and validators are kept on disk."""
+        with patch.object(dlt.DownloadManager, 'fetch', side_effect=self._serve(200)):
+            tag, assets = dlt.Installer.fetch_latest_release_assets('owner/tool')
+        self.assertEqual(tag, 'v1.2.3')
+        with open(dlt.ReleaseCache.path_for('owner/tool')) as handle:
+            entry = json.load(handle)
+        self.assertEqual(entry['etag'], '"abc"')
+        self.assertNotIn('body', entry)
+        self.assertNotIn('uploader', entry['assets'][0])
+        self.assertEqual(assets[0]['name'], 'tool_linux_amd64.tar.gz')
+
+    def test_fresh_entry_needs_no_request(self):
+        """Within the TTL, repeated fetches never touch the network."""
+        with patch.object(dlt.DownloadManager, 'fetch', side_effect=self._serve(200)) as mock_get:
+            dlt.Installer.fetch_latest_release_assets('owner/tool')
+            dlt.ReleaseCache._memo.clear()
+            dlt.Installer.fetch_latest_release_assets('owner/tool')
+        mock_get.assert_called_once()
+
+    def test_stale_entry_revalidates_with_etag(self):
+        """An expired entry sends If-None-Match and a 304 keeps the cached data."""
+        with patch.object(dlt.DownloadManager, 'fetch', side_effect=self._serve(200)):
+            dlt.Installer.fetch_latest_release_assets('owner/tool')
+        dlt.ReleaseCache._memo['owner/tool']['fetched_at'] = 0
+        with patch.object(dlt.DownloadManager, 'fetch', side_effect=self._serve(304)) as mock_get:
+            tag, assets = dlt.Installer.fetch_latest_release_assets('owner/tool')
+        self.assertEqual(mock_get.call_args[1]['headers']['If-None-Match'], '"abc"')
+        self.assertEqual(tag, 'v1.2.3')
+        self.assertTrue(dlt.ReleaseCache.is_fresh(dlt.ReleaseCache.load('owner/tool')))
+
+    def test_refresh_failure_falls_back_to_stale_entry(self):
+        """A rate-limited refresh still returns what was cached."""
+        dlt.ReleaseCache.store('owner/tool', {'tag_name': 'v1', 'assets': [], 'fetched_at': 0})
+        with patch.object(dlt.DownloadManager, 'fetch', return_value=dlt.DownloadResult(url='x', status=403)), \
+             patch('builtins.print'):
+            self.assertEqual(dlt.Installer.fetch_latest_release_assets('owner/tool'), ('v1', []))
+
+    def test_prefetch_fills_cache_for_later_lookups(self):
+        """Prefetched repos are served from the cache by fetch_latest_release_assets."""
+        with patch.object(dlt.DownloadManager, 'fetch', side_effect=self._serve(200)) as mock_get:
+            dlt.Installer.prefetch_release_metadata(['owner/a', 'owner/b', 'owner/a'])
+            self.assertEqual(mock_get.call_count, 2)
+            self.assertEqual(dlt.Installer.fetch_latest_release_assets('owner/b')[0], 'v1.2.3')
+            self.assertEqual(mock_get.call_count, 2)
+
+    def test_evict_keeps_most_recent_entries(self):
+        """The cache is bounded by entry count, dropping the oldest first."""
+        for index in range(4):
+            dlt.ReleaseCache.store(f'owner/repo{index}', {'assets': []})
+            os.utime(dlt.ReleaseCache.path_for(f'owner/repo{index}'), (index, index))
+        dlt.ReleaseCache.evict(max_entries=2)
+        remaining = sorted(os.listdir(os.path.join(self._tmp.name, 'releases')))
+        self.assertEqual(remaining, ['owner__repo2.json', 'owner__repo3.json'])
+
+
+class TestArtifactCache(unittest.TestCase):
+    """Test the content-addressed download cache."""
+
+    URL = 'https://github.com/o/r/releases/download/v1/r_linux_amd64.tar.gz'
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        patcher = patch.object(dlt, 'CACHE_DIR', os.path.join(self._tmp.name, 'cache'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _file(self, name, data):
+        path = os.path.join(self._tmp.name, name)
+        with open(path, 'wb') as handle:
+            handle.write(data)
+        return path
+
+    def test_store_then_lookup_by_url_and_digest(self):
+        """A stored file is found again by URL and by its SHA-256."""
+        digest = dlt.ArtifactCache.store(self.URL, self._file('a', b'archive bytes'))
+        self.assertEqual(digest, dlt.Installer.sha256_file(self._file('b', b'archive bytes')))
+        self.assertEqual(dlt.ArtifactCache.lookup(url=self.URL), dlt.ArtifactCache.blob_path(digest))
+        self.assertEqual(dlt.ArtifactCache.lookup(digest=digest.upper()), dlt.ArtifactCache.blob_path(digest))
+        self.assertIsNone(dlt.ArtifactCache.lookup(url='https://other.invalid/x'))
+
+    def test_corrupt_blob_is_discarded(self):
+        """Bytes that no longer match their digest are never served."""
+        digest = dlt.ArtifactCache.store(self.URL, self._file('a', b'archive bytes'))
+        with open(dlt.ArtifactCache.blob_path(digest), 'wb') as handle:
+            handle.write(b'tampered')
+        self.assertIsNone(dlt.ArtifactCache.lookup(url=self.URL))
+        self.assertFalse(os.path.exists(dlt.ArtifactCache.blob_path(digest)))
+
+    def test_evict_drops_least_recently_used(self):
+        """Over the size cap, the oldest-used blobs go first and leave the index."""
+        old = dlt.ArtifactCache.store('https://x.invalid/old', self._file('old', b'o' * 100))
+        new = dlt.ArtifactCache.store('https://x.invalid/new', self._file('new', b'n' * 100))
+        os.utime(dlt.ArtifactCache.blob_path(old), (1, 1))
+        dlt.ArtifactCache.evict(max_bytes=150)
+        self.assertFalse(os.path.exists(dlt.ArtifactCache.blob_path(old)))
+        self.assertTrue(os.path.exists(dlt.ArtifactCache.blob_path(new)))
+        self.assertIsNone(dlt.ArtifactCache.lookup(url='https://x.invalid/old'))
+
+    @patch.object(dlt.DownloadManager, 'fetch')
+    def test_download_file_served_from_cache(self, mock_run):
+        """A cached artifact is materialized without touching the network."""
+        dlt.ArtifactCache.store(self.URL, self._file('a', b'archive bytes'))
+        dest = os.path.join(self._tmp.name, 'dest.tar.gz')
+        with patch('builtins.print'):
+            self.assertTrue(dlt.Installer.download_file(self.URL, dest))
+        mock_run.assert_not_called()
+        with open(dest, 'rb') as handle:
+            self.assertEqual(handle.read(), b'archive bytes')
+
+    @patch.object(dlt.DownloadManager, 'fetch')
+    def test_download_file_populates_cache(self, mock_fetch):
+        """A fresh download is added to the cache for next time."""
+        def fetch(url, dest=None, headers=None, max_time=None, resume=False):
+            with open(dest, 'wb') as handle:
+                handle.write(b'fresh bytes')
+            return dlt.DownloadResult(url=url, status=200, size=11,
+                                      digest=hashlib.sha256(b'fresh bytes').hexdigest())
+        mock_fetch.side_effect = fetch
+        dest = os.path.join(self._tmp.name, 'dest.tar.gz')
+        self.assertTrue(dlt.Installer.download_file(self.URL, dest))
+        self.assertIsNotNone(dlt.ArtifactCache.lookup(url=self.URL))
+        with open(dest, 'rb') as handle:
+            self.assertEqual(handle.read(), b'fresh bytes')
+        # Fetched into the URL's resumable slot in the cache, not straight to dest
+        partial = mock_fetch.call_args[0][1]
+        self.assertEqual(os.path.dirname(partial), os.path.join(dlt.ArtifactCache.root(), 'partial'))
+        self.assertTrue(mock_fetch.call_args[1]['resume'])
+
+    def test_evict_abandons_old_partial_downloads(self):
+        with dlt.ArtifactCache.partial('https://x.invalid/slow') as partial:
+            with open(partial, 'wb') as handle:
+                handle.write(b'half')
+        stale = time.time() - dlt.ARTIFACT_PARTIAL_MAX_AGE - 1
+        os.utime(partial, (stale, stale))
+        dlt.ArtifactCache.evict()
+        self.assertFalse(os.path.exists(partial))
+        self.assertTrue(os.path.exists(partial + '.lock'))
+
+
+class _LocalHandler(http.server.BaseHTTPRequestHandler):
+    """Tiny keep-alive server for DownloadManager tests."""
+
+    protocol_version = 'HTTP/1.1'
+    connections = set()
+    requests = []
+    FLAKY = bytes(range(256)) * 64
+    flaky_cut = False  # Whether /flaky already hung up halfway once
+    busy = 0  # How many more requests for /busy answer 503
+
+    def do_GET(self):
+        type(self).connections.add(self.client_address)
+        type(self).requests.append((self.path, dict(self.headers)))
+        if self.path == '/redirect':
+            self._reply(302, b'', {'Location': '/file'})
+        elif self.path == '/file':
+            self._reply(200, b'payload-' * 1000, {'ETag': '"v1"'})
+        elif self.path == '/flaky':
+            self._flaky()
+        elif self.path == '/busy':
+            type(self).busy -= 1
+            self._reply(503, b'busy') if type(self).busy >= 0 else self._reply(200, b'ready')
+        elif self.path == '/cond':
+            if self.headers.get('If-None-Match') == '"v1"':
+                self._reply(304, b'')
+            else:
+                self._reply(200, b'fresh', {'ETag': '"v1"'})
+        else:
+            self._reply(404, b'missing')
+
+    def _flaky(self):
+        """Serves Range requests (If-Range "v2"); the first plain GET hangs up halfway through."""
+        body, start = self.FLAKY, 0
+        if self.headers.get('Range') and self.headers.get('If-Range') in (None, '"v2"'):
+            start = int(self.headers['Range'][len('bytes='):-1])
+        if start:
+            self._reply(206, body[start:], {'ETag': '"v2"',
+                                            'Content-Range': f'bytes {start}-{len(body) - 1}/{len(body)}'})
+        elif type(self).flaky_cut:
+            self._reply(200, body, {'ETag': '"v2"'})
+        else:
+            type(self).flaky_cut = True
+            self.send_response(200)
+            self.send_header('ETag', '"v2"')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+
+    def _reply(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDownloadManager(unittest.TestCase):
+    """Test the in-process HTTP client against a local server."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _LocalHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        dlt.DownloadManager.close_all()
+        _LocalHandler.connections = set()
+        _LocalHandler.requests = []
+        _LocalHandler.flaky_cut = False
+        _LocalHandler.busy = 0
+        self.addCleanup(dlt.DownloadManager.close_all)
+
+    def test_fetch_follows_redirect_and_reports_result(self):
+        """The final status, size and SHA-256 are reported for the redirected body."""
+        result = dlt.DownloadManager.fetch(self.base + '/redirect')
+        body = b'payload-' * 1000
+        self.assertTrue(result.ok)
+        self.assertEqual((result.status, result.size), (200, len(body)))
+        self.assertEqual(result.digest, hashlib.sha256(body).hexdigest())
+        self.assertEqual(result.content, body)
+        self.assertEqual(result.headers['etag'], '"v1"')
+
+    def test_sequential_fetches_reuse_one_connection(self):
+        """Keep-alive: several requests to one host share a single TCP connection."""
+        for _ in range(3):
+            self.assertTrue(dlt.DownloadManager.fetch(self.base + '/file').ok)
+        self.assertEqual(len(_LocalHandler.connections), 1)
+
+    def test_not_modified_and_errors_are_statuses(self):
+        """304 and 404 come back as statuses without a body, not as errors."""
+        result = dlt.DownloadManager.fetch(self.base + '/cond', headers={'If-None-Match': '"v1"'})
+        self.assertEqual((result.status, result.error, result.content), (304, None, None))
+        missing = dlt.DownloadManager.fetch(self.base + '/nope')
+        self.assertEqual(missing.status, 404)
+        self.assertFalse(missing.ok)
+
+    def test_fetch_many_keeps_job_order_and_writes_files(self):
+        """Parallel jobs return results in submission order."""
+        with tempfile.TemporaryDirectory() as tmp:
+            dest = os.path.join(tmp, 'file')
+            results = dlt.DownloadManager.fetch_many([
+                (self.base + '/nope', None, None),
+                (self.base + '/file', dest, None),
+                (self.base + '/cond', None, None),
+            ])
+            self.assertEqual([r.status for r in results], [404, 200, 200])
+            with open(dest, 'rb') as handle:
+                self.assertEqual(handle.read(), b'payload-' * 1000)
+
+    def test_connection_failure_is_reported(self):
+        """An unreachable host yields status 0 with an error message."""
+        server = http.server.HTTPServer(('127.0.0.1', 0), _LocalHandler)
+        port = server.server_address[1]
+        server.server_close()
+        result = dlt.DownloadManager.fetch(f'http://127.0.0.1:{port}/file')
+        self.assertEqual(result.status, 0)
+        self.assertIsNotNone(result.error)
+
+    def test_token_only_sent_to_github_api(self):
+        """GITHUB_TOKEN never leaves for other hosts."""
+        with patch.dict(os.environ, {'GITHUB_TOKEN': 't0k'}):
+            self.assertEqual(dlt.DownloadManager.auth_headers('api.github.com'),
+                             {'Authorization': 'Bearer t0k'})
+            self.assertEqual(dlt.DownloadManager.auth_headers('objects.githubusercontent.com'), {})
+            dlt.DownloadManager.fetch(self.base + '/file')
+        self.assertNotIn('Authorization', _LocalHandler.requests[0][1])
+
+    def test_cut_off_download_resumes_with_range(self):
+        """A body cut off halfway costs a Range request for the missing tail, not a restart."""
+        body = _LocalHandler.FLAKY
+        with tempfile.TemporaryDirectory() as tmp:
+            dest = os.path.join(tmp, 'file')
+            result = dlt.DownloadManager.fetch(self.base + '/flaky', dest)
+            self.assertTrue(result.ok, result.error)
+            self.assertEqual((result.status, result.size), (206, len(body)))
+            self.assertEqual(result.digest, hashlib.sha256(body).hexdigest())
+            with open(dest, 'rb') as handle:
+                self.assertEqual(handle.read(), body)
+        retry = _LocalHandler.requests[1][1]
+        self.assertEqual((retry['Range'], retry['If-Range']), (f'bytes={len(body) // 2}-', '"v2"'))
+
+        stream, finish = dlt.DownloadManager.stream(self.base + '/flaky')  # Already cut once: served whole
+        self.assertEqual(stream.read(), body)
+        self.assertTrue(finish())
+        _LocalHandler.flaky_cut = False
+        stream, finish = dlt.DownloadManager.stream(self.base + '/flaky')
+        self.assertEqual(b''.join(iter(lambda: stream.read(1000), b'')), body)
+        self.assertTrue(finish())
+        self.assertEqual(stream.resumed, len(body) // 2)
+
+    def test_transient_status_is_retried_with_capped_backoff(self):
+        _LocalHandler.busy = 2
+        result = dlt.DownloadManager.fetch(self.base + '/busy')
+        self.assertEqual((result.status, result.content), (200, b'ready'))
+        self.assertEqual(len(_LocalHandler.requests), 3)
+        _LocalHandler.busy = dlt.DOWNLOAD_RETRIES + 1
+        self.assertEqual(dlt.DownloadManager.fetch(self.base + '/busy').status, 503)
+        self.assertEqual(dlt.DownloadManager.fetch(self.base + '/nope').status, 404)  # Not transient
+        self.assertEqual(len(_LocalHandler.requests), 3 + dlt.DOWNLOAD_RETRIES + 2)
+        with patch.object(dlt, 'DOWNLOAD_BACKOFF', 1.0):
+            self.assertTrue(all(0 <= dlt.DownloadManager.backoff(n) <= min(2 ** (n - 1), dlt.DOWNLOAD_BACKOFF_MAX)
+                                for n in range(1, 12)))
+
+    def test_partial_download_resumes_on_the_next_run(self):
+        """With resume, a partial file and its validators outlive a failed fetch."""
+        body = _LocalHandler.FLAKY
+        with tempfile.TemporaryDirectory() as tmp, patch.object(dlt, 'DOWNLOAD_RETRIES', 0):
+            dest = os.path.join(tmp, 'file')
+            self.assertFalse(dlt.DownloadManager.fetch(self.base + '/flaky', dest, resume=True).ok)
+            self.assertEqual(os.path.getsize(dest), len(body) // 2)
+            result = dlt.DownloadManager.fetch(self.base + '/flaky', dest, resume=True)
+            self.assertEqual((result.ok, result.digest), (True, hashlib.sha256(body).hexdigest()))
+            self.assertEqual(_LocalHandler.requests[-1][1]['Range'], f'bytes={len(body) // 2}-')
+            self.assertFalse(os.path.exists(dest + '.part.json'))
+
+            # Validators for a different body: If-Range gets the whole new one instead
+            with open(dest + '.part.json', 'w') as handle:
+                json.dump({'url': self.base + '/flaky', 'etag': '"v1"', 'length': len(body)}, handle)
+            result = dlt.DownloadManager.fetch(self.base + '/flaky', dest, resume=True)
+            self.assertEqual((result.status, result.size), (200, len(body)))
+            self.assertEqual(result.digest, hashlib.sha256(body).hexdigest())
+
+    def test_stream_reads_to_end(self):
+        """stream() hands back a readable body and finish() confirms it was complete."""
+        stream, finish = dlt.DownloadManager.stream(self.base + '/redirect')
+        self.assertEqual(stream.read(), b'payload-' * 1000)
+        self.assertTrue(finish())
+        with patch('builtins.print'):
+            stream, finish = dlt.DownloadManager.stream(self.base + '/nope')
+        self.assertIsNone(stream)
+        self.assertFalse(finish())
+
+
+class TestInstallEngine(unittest.TestCase):
+    """Test parallel installs with per-backend limits."""
+
+    def test_command_lock_by_backend(self):
+        """apt/dpkg share one lock, snap has its own, everything else runs free."""
+        apt = dlt.InstallEngine.command_lock(['sudo', 'apt-get', 'install', '-y', 'vim'])
+        self.assertIs(apt, dlt.InstallEngine.command_lock(['dpkg', '-i', 'x.deb']))
+        self.assertIsNotNone(dlt.InstallEngine.command_lock(['sudo', 'snap', 'install', 'code']))
+        self.assertIsNot(apt, dlt.InstallEngine.command_lock(['sudo', 'snap', 'install', 'code']))
+        self.assertIsNone(dlt.InstallEngine.command_lock(['pip3', 'install', 'glances']))
+        self.assertIsNone(dlt.InstallEngine.command_lock(['sudo']))
+
+    @patch.object(dlt.os, 'geteuid', return_value=1000)
+    @patch('builtins.print')
+    @patch.object(dlt.Installer, 'run_command')
+    def test_acquire_sudo_prompts_once_only_when_needed(self, mock_run, *_):
+        mock_run.return_value = subprocess.CompletedProcess([], 0)
+        self.assertTrue(acquire_sudo())
+        mock_run.assert_called_once_with(['sudo', '-n', 'true'], capture_output=True)
+
+        mock_run.reset_mock()
+        mock_run.side_effect = [subprocess.CompletedProcess([], 1), subprocess.CompletedProcess([], 1)]
+        self.assertFalse(acquire_sudo())
+        # The password prompt goes to the terminal, not into a capture buffer
+        self.assertEqual(mock_run.call_args_list[1], call(['sudo', '-v'], timeout=dlt.NETWORK_CMD_TIMEOUT))
+
+    def test_run_is_parallel_and_buffers_output_per_job(self):
+        """Independent jobs overlap; each job's prints come back separately."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def action(name):
+            def run():
+                print(f'installing {name}')
+                barrier.wait()  # Deadlocks (and times out) unless both run at once
+                return name == 'a'
+            return run
+
+        results = dlt.InstallEngine.run([dlt.Job('a', action('a')), dlt.Job('b', action('b'))], 2)
+        self.assertEqual(results, {'a': (True, 'installing a\n'), 'b': (False, 'installing b\n')})
+        self.assertNotIsInstance(sys.stdout, dlt._ThreadOutput)
+
+    def test_run_reports_unexpected_errors_as_failures(self):
+        """An exception in one job is contained to that job."""
+        def boom():
+            raise RuntimeError('boom')
+
+        results = dlt.InstallEngine.run([dlt.Job('a', boom), dlt.Job('b', lambda: True)], 2)
+        self.assertFalse(results['a'][0])
+        self.assertIn('boom', results['a'][1])
+        self.assertTrue(results['b'][0])
+
+    def test_prerequisite_runs_first_and_once(self):
+        """Dependents start only after their shared bootstrap, which runs once."""
+        events = []
+        lock = threading.Lock()
+
+        def record(name, ok=True):
+            def run():
+                with lock:
+                    events.append(name)
+                return ok
+            return run
+
+        jobs = [dlt.Job('tool-a', record('tool-a'), ('npm',)),
+                dlt.Job('tool-b', record('tool-b'), ('npm',)),
+                dlt.Job('other', record('other')),
+                dlt.Job('npm', record('npm'))]
+        results = dlt.InstallEngine.run(jobs, 4)
+        self.assertEqual(events.count('npm'), 1)
+        self.assertLess(events.index('npm'), events.index('tool-a'))
+        self.assertLess(events.index('npm'), events.index('tool-b'))
+        self.assertTrue(all(ok for ok, _ in results.values()))
+
+    def test_failed_prerequisite_skips_dependents(self):
+        """Nothing waiting on a failed bootstrap is attempted."""
+        attempted = []
+        jobs = [dlt.Job('npm', lambda: False),
+                dlt.Job('neoss', lambda: attempted.append('neoss') or True, ('npm',))]
+        results = dlt.InstallEngine.run(jobs, 2)
+        self.assertEqual(attempted, [])
+        self.assertFalse(results['neoss'][0])
+        self.assertIn('npm failed', results['neoss'][1])
+
+    def test_serial_jobs_never_overlap(self):
+        """Jobs sharing a serial key run one at a time even with idle workers."""
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def snap():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return True
+
+        dlt.InstallEngine.run([dlt.Job(f's{i}', snap, serial='snap') for i in range(3)], 4)
+        self.assertEqual(peak[0], 1)
+
+    def test_chain_lengths_rank_bootstraps_and_reject_bad_graphs(self):
+        """Bootstraps sit at the head of the longest chains; cycles and dangling needs raise."""
+        jobs = [dlt.Job('apt-lists', bool), dlt.Job('npm', bool, ('apt-lists',)),
+                dlt.Job('neoss', bool, ('npm',)), dlt.Job('glances', bool)]
+        self.assertEqual(dlt.InstallEngine.chain_lengths(jobs),
+                         {'apt-lists': 3, 'npm': 2, 'neoss': 1, 'glances': 1})
+        with self.assertRaises(ValueError):
+            dlt.InstallEngine.chain_lengths([dlt.Job('a', bool, ('b',)), dlt.Job('b', bool, ('a',))])
+        with self.assertRaises(ValueError):
+            dlt.InstallEngine.chain_lengths([dlt.Job('a', bool, ('missing',))])
+
+    def test_plan_jobs_adds_only_needed_bootstraps(self):
+        """The catalog's edges become jobs: npm pulls in apt-lists; APT tools share one batch."""
+        vim, neoss, lf, glances, code = (dlt.ToolManager.TOOLS[name]
+                                         for name in ('vim', 'neoss', 'lf', 'glances', 'code'))
+        with patch.object(dlt.Installer, 'venv_needs_apt', return_value=False):
+            jobs, _ = dlt.ToolManager.plan_jobs([neoss, lf, code], [vim], lambda: True, [glances])
+        needs = {job.name: job.needs for job in jobs}
+        self.assertEqual(needs, {
+            'apt-lists': (), 'npm': ('apt-lists',), 'venv': (),
+            'apt-batch': ('apt-lists',), 'pip-batch': ('venv',),
+            'neoss': ('npm',), 'lf': (), 'code': (),
+        })
+        jobs, _ = dlt.ToolManager.plan_jobs([code], [], lambda: True)
+        self.assertEqual([job.name for job in jobs], ['code'])
+
+    def test_plan_jobs_venv_waits_for_apt_only_when_python3_venv_is_missing(self):
+        """Without ensurepip the venv bootstrap needs apt (python3-venv) first."""
+        glances = dlt.ToolManager.TOOLS['glances']
+        with patch.object(dlt.Installer, 'venv_needs_apt', return_value=True):
+            jobs, _ = dlt.ToolManager.plan_jobs([], [], lambda: True, [glances])
+        self.assertEqual({job.name: job.needs for job in jobs}['venv'], ('apt-lists',))
+
+    @patch.object(dlt.subprocess, 'run')
+    def test_run_command_serializes_apt(self, mock_run):
+        """Concurrent apt-get commands never overlap."""
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def run(cmd, **kwargs):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return subprocess.CompletedProcess(cmd, 0)
+        mock_run.side_effect = run
+        threads = [threading.Thread(target=dlt.Installer.run_command,
+                                    args=(['sudo', 'apt-get', 'install', '-y', f'p{i}'],))
+                   for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(peak[0], 1)
+
+
+class TestBundle(unittest.TestCase):
+    """Test --export-bundle / --from-bundle."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        for patcher in (patch.object(dlt.Installer, 'linux_goarch', return_value='amd64'),
+                        patch.object(dlt, 'PIP_WHEELHOUSE', os.path.join(self.tmp, 'wheelhouse')),
+                        patch('builtins.print')):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _bundle(self, files, manifest_files=None):
+        """Write a bundle tar holding files (name -> bytes) with a manifest listing manifest_files."""
+        if manifest_files is None:
+            manifest_files = {name: hashlib.sha256(data).hexdigest() for name, data in files.items()}
+        manifest = {'format': dlt.BUNDLE_FORMAT, 'arch': 'amd64', 'tools': {}, 'files': manifest_files}
+        path = os.path.join(self.tmp, 'bundle.tar')
+        with tarfile.open(path, 'w') as tar:
+            for name, data in [('manifest.json', json.dumps(manifest).encode())] + list(files.items()):
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        return path
+
+    def test_parse_depends_keeps_real_packages_once(self):
+        """Top-level lines are packages; dependency lines and <virtual> names are skipped."""
+        content = "vim\n  Depends: vim-common\n  Depends: libc6\nvim-common\n<awk>\nlibc6\nvim\n"
+        self.assertEqual(dlt.Bundle.parse_depends(content), ['vim', 'vim-common', 'libc6'])
+
+    @patch.object(dlt.Installer, 'run_command')
+    def test_export_then_install_round_trip(self, mock_run):
+        """Exported debs and wheels unpack verified and install with apt --no-download and the wheelhouse."""
+        def export_run(cmd, **kwargs):
+            if cmd[0] == 'apt-cache':
+                return subprocess.CompletedProcess(cmd, 0, stdout="vim\n  Depends: libc6\nlibc6\n")
+            if cmd[:2] == ['apt-get', 'download']:
+                for package in cmd[2:]:
+                    with open(os.path.join(kwargs['cwd'], f'{package}_1.0_amd64.deb'), 'wb') as handle:
+                        handle.write(package.encode())
+            if 'wheel' in cmd:
+                wheel_dir = cmd[cmd.index('--wheel-dir') + 1]
+                os.makedirs(wheel_dir, exist_ok=True)
+                open(os.path.join(wheel_dir, 'glances-4.0-py3-none-any.whl'), 'w').close()
+            return subprocess.CompletedProcess(cmd, 0)
+
+        mock_run.side_effect = export_run
+        tools = [dlt.Tool('vim', 'vim', dlt.InstallMethod.APT, 'vim', 'Editor', 'Editors'),
+                 dlt.Tool('glances', 'glances', dlt.InstallMethod.PIP, 'glances', 'Monitor', 'System')]
+        path = os.path.join(self.tmp, 'tools.tar')
+        with patch.object(dlt.Installer, 'ensure_venv', return_value=True):
+            self.assertTrue(dlt.Bundle.export(path, tools))
+        wheel_cmd = next(call[0][0] for call in mock_run.call_args_list if 'wheel' in call[0][0])
+        self.assertEqual(wheel_cmd[0], dlt.Installer.venv_python())  # The managed venv's pip, not the system one
+        self.assertFalse(os.path.exists(path + '.tmp'))
+
+        root = os.path.join(self.tmp, 'root')
+        manifest = dlt.Bundle.unpack(path, root)
+        self.assertEqual(manifest['tools'], {'vim': 'apt', 'glances': 'pip'})
+        self.assertIn('debs/libc6_1.0_amd64.deb', manifest['files'])
+
+        mock_run.reset_mock(side_effect=True)
+        mock_run.return_value = subprocess.CompletedProcess([], 0)
+        with patch.object(dlt.DpkgStatus, 'is_installed', side_effect=lambda pkg: pkg == 'libc6'), \
+                patch.object(dlt.ToolManager, 'install_pip_tools', return_value={'glances': True}), \
+                patch.object(dlt.ToolManager, 'report_path_visibility'):
+            results = dlt.Bundle.install(root, manifest, tools)
+        self.assertEqual(results, {'vim': True, 'glances': True})
+        self.assertEqual(mock_run.call_args_list[0][0][0],
+                         ['sudo', 'apt-get', 'install', '-y', '--no-download',
+                          os.path.join(root, 'debs', 'vim_1.0_amd64.deb')])
+        self.assertTrue(os.path.isfile(os.path.join(dlt.PIP_WHEELHOUSE, 'glances-4.0-py3-none-any.whl')))
+
+    def test_unpack_rejects_tampered_or_unlisted_files(self):
+        """Any file whose hash differs from the manifest, or that it does not list, fails the bundle."""
+        good = hashlib.sha256(b'deb').hexdigest()
+        self.assertIsNotNone(dlt.Bundle.unpack(self._bundle({'debs/a.deb': b'deb'}),
+                                               os.path.join(self.tmp, 'ok')))
+        tampered = self._bundle({'debs/a.deb': b'evil'}, {'debs/a.deb': good})
+        self.assertIsNone(dlt.Bundle.unpack(tampered, os.path.join(self.tmp, 'bad')))
+        unlisted = self._bundle({'debs/a.deb': b'deb', 'bin/extra': b'x'}, {'debs/a.deb': good})
+        self.assertIsNone(dlt.Bundle.unpack(unlisted, os.path.join(self.tmp, 'extra')))
+
+    def test_unpack_refuses_path_traversal(self):
+        """Entries escaping the extraction directory are refused before anything is written."""
+        path = self._bundle({'../escape': b'x'})
+        self.assertIsNone(dlt.Bundle.unpack(path, os.path.join(self.tmp, 'root')))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp, 'escape')))
+
+    @patch.object(dlt.Installer, 'run_command')
+    def test_offline_pip_install_never_builds_wheels(self, mock_run):
+        """With Installer.offline set a wheelhouse miss fails instead of reaching for the index."""
+        mock_run.return_value = subprocess.CompletedProcess([], 1)
+        with patch.object(dlt.Installer, 'offline', True), \
+                patch.object(dlt.Installer, 'venv_python', return_value='/venv/bin/python'):
+            self.assertFalse(dlt.Installer._pip_install(['glances']))
+        self.assertEqual(mock_run.call_count, 1)
+        self.assertIn('--no-index', mock_run.call_args[0][0])
+
+    @patch.object(dlt.Installer, 'run_command')
+    @patch.object(dlt.Installer, 'venv_needs_apt', return_value=True)
+    def test_offline_venv_never_falls_back_to_apt(self, mock_needs, mock_run):
+        """A bundle install whose python3-venv .deb did not land fails the venv instead of using apt."""
+        with patch.object(dlt.Installer, 'offline', True):
+            self.assertFalse(dlt.Installer.create_venv())
+        mock_run.assert_not_called()
+
+    @patch.object(dlt.Installer, 'run_command')
+    @patch.object(dlt.SystemChecker, 'has_command', return_value=False)
+    def test_offline_npm_never_falls_back_to_apt(self, mock_has, mock_run):
+        """A bundle install whose npm .deb did not land fails the npm tools instead of using apt."""
+        root = os.path.join(self.tmp, 'root')
+        os.makedirs(root)
+        tool = dlt.Tool('tldr-npm', 'tldr', dlt.InstallMethod.NPM, 'tldr', 'Docs', 'Docs')
+        with patch.object(dlt.Installer, 'offline', True), \
+                patch.object(dlt.Installer, '_bootstrap_failed', set()):
+            results = dlt.Bundle.install(root, {'tools': {'tldr-npm': 'npm'}}, [tool])
+        self.assertEqual(results, {'tldr-npm': False})
+        mock_run.assert_not_called()
+
+    @patch.object(dlt.Installer, 'run_command')
+    def test_export_without_python3_venv_leaves_pip_tools_out(self, mock_run):
+        """pip tools are reported as failed when python3-venv cannot be bundled."""
+        def export_run(cmd, **kwargs):
+            if cmd[0] == 'apt-cache':
+                return subprocess.CompletedProcess(cmd, 0, stdout="python3-venv\n")
+            if cmd[:2] == ['apt-get', 'download']:
+                return subprocess.CompletedProcess(cmd, 100)
+            return subprocess.CompletedProcess(cmd, 0)
+
+        mock_run.side_effect = export_run
+        tools = [dlt.Tool('glances', 'glances', dlt.InstallMethod.PIP, 'glances', 'Monitor', 'System')]
+        path = os.path.join(self.tmp, 'tools.tar')
+        with patch.object(dlt.Installer, 'ensure_venv') as mock_venv:
+            self.assertFalse(dlt.Bundle.export(path, tools))
+        mock_venv.assert_not_called()
+        self.assertEqual(dlt.Bundle.unpack(path, os.path.join(self.tmp, 'root'))['tools'], {})
+
+
+class TestStartup(unittest.TestCase):
+    """Test the import-time budget and the --check fast path."""
+
+    def test_check_path_leaves_heavy_modules_unimported(self):
+        """Importing the module and running --check never loads networking, archive or process modules."""
+        child = (
+            "import contextlib, importlib.util, io, sys\n"
+            f"spec = importlib.util.spec_from_file_location('dlt', {spec.origin!r})\n"
+            "dlt = importlib.util.module_from_spec(spec)\n"
+            "spec.loader.exec_module(dlt)\n"
+            "sys.argv = ['x', '--check']\n"
+            "with contextlib.redirect_stdout(io.StringIO()), contextlib.suppress(SystemExit):\n"
+            "    dlt.main()\n"
+            "print(' '.join(sorted(sys.modules)))\n"
+        )
+        result = subprocess.run([sys.executable, '-c', child], capture_output=True, text=True, check=True)
+        loaded = set(result.stdout.split())
+        for module in ('http.client', 'ssl', 'subprocess', 'tarfile', 'hashlib', 'json', 'tempfile',
+                       'concurrent.futures', 'zipfile'):
+            self.assertNotIn(module, loaded)
+
+    def test_lazy_module_loads_on_use_and_forwards_patches(self):
+        lazy = dlt._LazyModule('colorsys')
+        with patch.object(lazy, 'rgb_to_hsv', return_value='patched'):
+            self.assertEqual(lazy.rgb_to_hsv(1, 0, 0), 'patched')
+            self.assertEqual(sys.modules['colorsys'].rgb_to_hsv(1, 0, 0), 'patched')
+        self.assertEqual(lazy.rgb_to_hsv(1, 0, 0), (0.0, 1.0, 1))
+
+    @patch.object(dlt.ToolManager, 'get_tools_by_category')
+    @patch.object(dlt.ToolManager, 'check_tool_installed')
+    @patch('builtins.input')
+    @patch.object(dlt.SystemChecker, 'check_system')
+    def test_main_check_reports_missing_without_prompting(self, mock_system, mock_input, mock_installed,
+                                                          mock_categories):
+        vim = dlt.Tool('vim', 'vim', dlt.InstallMethod.APT, 'vim', 'Editor', 'Editors')
+        fd = dlt.Tool('fd', 'fdfind', dlt.InstallMethod.APT, 'fd-find', 'Finder', 'Files')
+        mock_categories.return_value = {'Editors': [vim], 'Files': [fd]}
+        mock_installed.side_effect = lambda tool: tool is vim
+        output = io.StringIO()
+        with patch.object(sys, 'argv', ['x', '--check']), contextlib.redirect_stdout(output), \
+                self.assertRaises(SystemExit) as exit_:
+            dlt.main()
+        self.assertEqual(exit_.exception.code, 1)
+        self.assertEqual(output.getvalue().strip(), '1 of 2 tools missing: fd')
+        mock_input.assert_not_called()
+        mock_system.assert_not_called()
+
+        mock_installed.side_effect = None
+        mock_installed.return_value = True
+        with patch.object(sys, 'argv', ['x', '--check']), patch('builtins.print'), \
+                self.assertRaises(SystemExit) as exit_:
+            dlt.main()
+        self.assertEqual(exit_.exception.code, 0)
+
+
+class TestTracer(unittest.TestCase):
+    """Test --trace spans and --profile output."""
+
+    def setUp(self):
+        self.addCleanup(dlt.Tracer.stop)
+
+    def events(self, name):
+        return [event for event in dlt.Tracer._events if event['name'] == name]
+
+    def test_disabled_records_nothing(self):
+        dlt.Tracer.start()
+        dlt.Tracer.stop()
+        dlt.Installer.run_command(['true'])
+        with dlt.Tracer.span('phase'):
+            pass
+        self.assertEqual(dlt.Tracer._events, [])
+
+    def test_subprocess_span_carries_tool_tags_exit_code_and_stderr(self):
+        dlt.Tracer.start()
+        with dlt.Tracer.tagged(tool='fd', method='apt'):
+            dlt.Installer.run_command(['sh', '-c', 'echo boom >&2; exit 3'], capture_output=True)
+        dlt.Installer.run_command(['true'])
+        failed, = self.events('sh')
+        self.assertEqual(failed['ph'], 'X')
+        self.assertEqual(failed['cat'], 'subprocess')
+        self.assertGreaterEqual(failed['dur'], 0)
+        self.assertEqual(failed['args']['exit'], 3)
+        self.assertEqual(failed['args']['stderr'], 'boom')
+        self.assertEqual((failed['args']['tool'], failed['args']['method']), ('fd', 'apt'))
+        passed, = self.events('true')
+        self.assertEqual(passed['args'], {'cmd': 'true', 'exit': 0})
+
+    def test_probe_races_and_fleet_commands_get_subprocess_spans(self):
+        """Processes started outside run_command still show up with their flag, exit code and kill."""
+        with tempfile.TemporaryDirectory() as tmp:
+            tool = os.path.join(tmp, 'tui')
+            with open(tool, 'w') as handle:
+                handle.write('#!/bin/sh\nif [ "$1" = "-h" ]; then echo usage; exit 0; fi\nsleep 30\n')
+            os.chmod(tool, 0o755)
+            dlt.Tracer.start()
+            with dlt.Tracer.tagged(tool='tui'):
+                self.assertEqual(dlt.Installer.race_probes(tool, ['-v', '-h']), '-h')
+        probes = {event['args']['flag']: event['args'] for event in self.events('tui')}
+        self.assertEqual(probes['-h']['exit'], 0)
+        self.assertFalse(probes['-h']['killed'])
+        self.assertTrue(probes['-v']['killed'])
+        self.assertEqual(probes['-v']['tool'], 'tui')
+
+        dlt.LocalTransport().run('web1', ['--check'], b'import sys; sys.exit(4)')
+        fleet, = self.events(os.path.basename(sys.executable))
+        self.assertEqual((fleet['args']['host'], fleet['args']['exit']), ('web1', 4))
+
+    def test_traced_functions_record_argument_and_result(self):
+        dlt.Tracer.start()
+        with tempfile.NamedTemporaryFile() as handle:
+            digest = dlt.Installer.sha256_file(handle.name)
+        event, = self.events('Installer.sha256_file')
+        self.assertEqual(event['cat'], 'checksum')
+        self.assertEqual(event['args'], {'arg': handle.name, 'result': digest})
+
+    @patch.object(dlt.ToolManager, 'get_tools_by_category')
+    @patch.object(dlt.ToolManager, 'check_tool_installed', return_value=True)
+    def test_main_writes_trace_and_profile(self, mock_installed, mock_categories):
+        mock_categories.return_value = {'Editors': [dlt.Tool('vim', 'vim', dlt.InstallMethod.APT, 'vim',
+                                                             'Editor', 'Editors')]}
+        with tempfile.TemporaryDirectory() as tmp:
+            trace, profile = os.path.join(tmp, 'run.json'), os.path.join(tmp, 'run.prof')
+            with patch.object(sys, 'argv', ['x', '--check', '--trace', trace, '--profile', profile]), \
+                    patch('builtins.print'), self.assertRaises(SystemExit) as exit_:
+                dlt.main()
+            self.assertEqual(exit_.exception.code, 0)
+            with open(trace) as handle:
+                events = json.load(handle)['traceEvents']
+            main, = [event for event in events if event['name'] == 'main']
+            self.assertIn('--check', main['args']['argv'])
+            self.assertIn('thread_name', {event['name'] for event in events})
+            import pstats
+            self.assertTrue(pstats.Stats(profile).total_calls)
+            self.assertEqual(sorted(os.listdir(tmp)), ['run.json', 'run.prof'])  # No .tmp left behind
+        self.assertFalse(dlt.Tracer.enabled)
+
+
+class TestMetrics(unittest.TestCase):
+    """Test the --metrics-file textfile-collector output."""
+
+    def setUp(self):
+        dlt.Metrics.reset()
+        self.addCleanup(dlt.Metrics.reset)
+        self.addCleanup(dlt.Tracer.stop)
+
+    @staticmethod
+    def span(name, category, seconds, **args):
+        return {'name': name, 'cat': category, 'ph': 'X', 'ts': 0, 'dur': seconds * 1e6, 'args': args}
+
+    def test_render_histograms_outcomes_and_batch_durations(self):
+        dlt.Metrics.outcome(dlt.ToolManager.TOOLS['vim'], 'installed')
+        dlt.Metrics.outcome(dlt.ToolManager.TOOLS['lf'], 'failed')
+        dlt.Metrics.outcome(dlt.ToolManager.TOOLS['glances'], 'skipped')
+        events = [
+            self.span('main', 'phase', 42),
+            self.span('apt-get', 'subprocess', 7.5, cmd='sudo apt-get update', exit=0),
+            self.span('Installer.install_apt_batch', 'install', 20),
+            self.span('lf', 'tool', 3, tool='lf', method='eget', ok=False),
+            self.span('download', 'network', 0.2, url='https://github.com/a/b', bytes=100, tool='lf', method='eget'),
+            self.span('download', 'network', 40, url='https://mirror.example/"x"', bytes=5, attempts=3, resumed=70),
+            self.span('Installer.validate_installed_command', 'validate', 0.3, tool='lf', method='eget'),
+        ]
+        lines = dlt.Metrics.render(events, 1700000000.0).splitlines()
+        for line in (
+            'lazy_tools_last_run_timestamp_seconds 1700000000.0',
+            'lazy_tools_run_duration_seconds 42.0',
+            'lazy_tools_tools{outcome="installed"} 1',
+            'lazy_tools_tools{outcome="skipped"} 1',
+            'lazy_tools_tools{outcome="failed"} 1',
+            'lazy_tools_tool_outcome{tool="lf",method="eget",outcome="failed"} 1',
+            'lazy_tools_tool_install_duration_seconds{tool="vim",method="apt"} 20.0',
+            'lazy_tools_tool_install_duration_seconds{tool="lf",method="eget"} 3.0',
+            'lazy_tools_tool_download_bytes{tool="lf",method="eget"} 100',
+            'lazy_tools_download_bytes{host="github.com"} 100',
+            'lazy_tools_download_retries{host="github.com"} 0',
+            'lazy_tools_download_retries{host="mirror.example"} 2',
+            'lazy_tools_download_resumed_bytes{host="mirror.example"} 70',
+            'lazy_tools_apt_update_duration_seconds 7.5',
+            'lazy_tools_apt_update_success 1',
+            'lazy_tools_install_duration_seconds_bucket{method="apt",le="10"} 0',
+            'lazy_tools_install_duration_seconds_bucket{method="apt",le="30"} 1',
+            'lazy_tools_install_duration_seconds_count{method="eget"} 1',
+            'lazy_tools_download_duration_seconds_bucket{host="mirror.example",le="30"} 0',
+            'lazy_tools_download_duration_seconds_bucket{host="mirror.example",le="+Inf"} 1',
+            'lazy_tools_probe_duration_seconds_sum{method="eget"} 0.3',
+        ):
+            self.assertIn(line, lines)
+        self.assertFalse(any('glances' in line and 'duration' in line for line in lines))
+        self.assertEqual(dlt.Metrics.labels(path='a"b\\c\nd'), '{path="a\\"b\\\\c\\nd"}')
+
+    @patch.object(dlt, 'update_package_lists', return_value=True)
+    @patch.object(dlt.SystemChecker, 'check_system', return_value=(True, None))
+    @patch.object(dlt.Installer, 'resolve_apt_packages', return_value={})
+    @patch.object(dlt.ToolManager, 'install_apt_tools', return_value={'vim': True})
+    @patch.object(dlt.ToolManager, '_install_tool', return_value=False)
+    @patch('builtins.print')
+    def test_main_writes_prom_file_atomically(self, *_):
+        vim, lf, croc = (dlt.ToolManager.TOOLS[name] for name in ('vim', 'lf', 'croc'))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'lazy_tools.prom')
+            with patch.object(dlt.ToolManager, 'get_tools_by_category', return_value={'Mixed': [vim, lf, croc]}), \
+                    patch.object(dlt.ToolManager, 'check_tool_installed', side_effect=lambda t: t is croc), \
+                    patch.object(sys, 'argv', ['x', '--yes', '--jobs', '1', '--metrics-file', path]), \
+                    self.assertRaises(SystemExit):
+                dlt.main()
+            self.assertEqual(os.listdir(tmp), ['lazy_tools.prom'])
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o644)
+            with open(path) as handle:
+                text = handle.read()
+        self.assertIn('lazy_tools_tools{outcome="installed"} 1\n', text)
+        self.assertIn('lazy_tools_tools{outcome="skipped"} 1\n', text)
+        self.assertIn('lazy_tools_tools{outcome="failed"} 1\n', text)
+        self.assertIn('lazy_tools_tool_install_duration_seconds{tool="lf",method="eget"}', text)
+        self.assertFalse(dlt.Tracer.enabled)
+
+    @patch.object(dlt, 'update_package_lists', return_value=True)
+    @patch.object(dlt.SystemChecker, 'check_system', return_value=(True, None))
+    @patch.object(dlt, 'get_user_consent', return_value=True)
+    @patch.object(dlt.Installer, 'resolve_apt_packages', return_value={})
+    @patch.object(dlt.ToolManager, 'install_apt_tools', return_value={'vim': True})
+    @patch('builtins.print')
+    def test_metrics_are_written_before_the_exit_prompt(self, *_):
+        """A run left at "Press Enter to exit" (or interrupted there) already has its .prom file."""
+        vim = dlt.ToolManager.TOOLS['vim']
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'lazy_tools.prom')
+            seen = []
+            with patch.object(dlt.ToolManager, 'get_tools_by_category', return_value={'Editors': [vim]}), \
+                    patch.object(dlt.ToolManager, 'check_tool_installed', return_value=False), \
+                    patch.object(sys, 'argv', ['x', '--jobs', '1', '--metrics-file', path]), \
+                    patch('builtins.input', side_effect=lambda prompt: seen.append(os.path.exists(path))), \
+                    self.assertRaises(SystemExit):
+                dlt.main()
+        self.assertEqual(seen, [True])
+
+    def test_fleet_workers_write_their_own_metrics(self):
+        with patch.object(sys, 'argv', ['x', '--fleet', 'hosts', '--metrics-file', '/m.prom']):
+            args = dlt.parse_arguments()
+        self.assertEqual(dlt.Fleet.worker_args(args)[-2:], ['--metrics-file', '/m.prom'])
+
+
+class TestStateManifest(unittest.TestCase):
+    """Test the install-state manifest and converged reruns."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.bin_dir = os.path.join(self._tmp.name, 'bin')
+        os.makedirs(self.bin_dir)
+        self.binary = os.path.join(self.bin_dir, 'lazytool')
+        with open(self.binary, 'w') as handle:
+            handle.write('#!/bin/sh\n')
+        os.chmod(self.binary, 0o755)
+        self.tool = dlt.Tool('lazytool', 'lazytool', dlt.InstallMethod.EGET, 'lazytool', 'Test', 'Tests',
+                             github_repo='owner/lazytool')
+        for patcher in (patch.dict(os.environ, {'PATH': self.bin_dir}),
+                        patch.object(dlt, 'INSTALL_BIN_DIR', self.bin_dir),
+                        patch.object(dlt, 'STATE_DIR', os.path.join(self._tmp.name, 'state')),
+                        patch.dict(dlt.ToolManager.TOOLS, {'lazytool': self.tool}),
+                        patch.dict(dlt.PathIndex._listings, {}, clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        dlt.PathIndex.invalidate()
+
+    def test_status_trusts_unchanged_entries_only(self):
+        state = {'lazytool': dlt.StateManifest.entry(self.tool, installed_now=True)}
+        self.assertEqual(state['lazytool']['sha256'], hashlib.sha256(b'#!/bin/sh\n').hexdigest())
+        self.assertIs(dlt.StateManifest.status(state, self.tool), True)
+        self.assertIsNone(dlt.StateManifest.status({}, self.tool))
+
+        moved = dlt.Tool('lazytool', 'lazytool', dlt.InstallMethod.EGET, 'lazytool', 'Other text', 'Tests',
+                         github_repo='owner/fork')
+        self.assertIs(dlt.StateManifest.status(state, moved), False)
+
+        with open(self.binary, 'a') as handle:
+            handle.write('exit 0\n')
+        self.assertIsNone(dlt.StateManifest.status(state, self.tool))
+
+    @patch.object(dlt.ReleaseCache, 'load', return_value={'tag_name': 'v1.36.0', 'assets': []})
+    def test_release_tag_recorded_only_for_tools_installed_now(self, _):
+        """The cached tag is upstream's latest; a binary found on disk may be any older release."""
+        self.assertEqual(dlt.StateManifest.entry(self.tool, installed_now=True)['version'], 'v1.36.0')
+        adopted = dlt.StateManifest.entry(self.tool, installed_now=False)
+        self.assertEqual((adopted['version'], adopted['sha256']), (None, None))
+
+    def test_save_and_load_round_trip(self):
+        entry = dlt.StateManifest.entry(self.tool, installed_now=False)
+        self.assertTrue(dlt.StateManifest.save({'lazytool': entry}))
+        self.assertEqual(dlt.StateManifest.load(), {'lazytool': entry})
+        self.assertEqual(os.listdir(dlt.STATE_DIR), ['manifest.json'])
+        self.assertEqual(os.stat(dlt.StateManifest.path()).st_mode & 0o777, 0o644)
+
+        with open(dlt.StateManifest.path(), 'w') as handle:
+            json.dump({'format': dlt.STATE_FORMAT + 1, 'tools': {'lazytool': entry}}, handle)
+        self.assertEqual(dlt.StateManifest.load(), {})
+
+    @patch.object(dlt.SystemChecker, 'check_system', return_value=(True, None))
+    @patch('builtins.print')
+    def test_converged_rerun_skips_prompts_checks_and_commands(self, *_):
+        def run(argv):
+            with patch.object(dlt.ToolManager, 'get_tools_by_category', return_value={'Tests': [self.tool]}), \
+                    patch.object(sys, 'argv', ['x'] + argv), self.assertRaises(SystemExit) as exit_:
+                dlt.main()
+            self.assertEqual(exit_.exception.code, 0)
+
+        run(['--yes'])  # Found installed, so adopted into the manifest
+        self.assertIn('lazytool', dlt.StateManifest.load())
+        with patch('builtins.input') as mock_input, \
+                patch.object(dlt, 'get_user_consent') as mock_consent, \
+                patch.object(dlt.ToolManager, 'check_tool_installed') as mock_check, \
+                patch.object(dlt.Installer, 'run_command') as mock_run:
+            run([])
+        mock_input.assert_not_called()
+        mock_consent.assert_not_called()
+        mock_check.assert_not_called()
+        mock_run.assert_not_called()
+
+        # A changed catalog entry is reinstalled even though the command is on PATH
+        self.tool.github_repo = 'owner/fork'
+        with patch.object(dlt.ToolManager, '_install_tool', return_value=True) as mock_install:
+            run(['--yes', '--jobs', '1'])
+        mock_install.assert_called_once_with(self.tool, False)
+        self.assertIs(dlt.StateManifest.status(dlt.StateManifest.load(), self.tool), True)
+
+
+class _GitHubHandler(http.server.BaseHTTPRequestHandler):
+    """Stand-in for the GitHub API: REST latest-release lookups and aliased GraphQL queries."""
+
+    protocol_version = 'HTTP/1.1'
+    releases = {}
+    requests = []
+    graphql_status = 200
+
+    def do_GET(self):
+        type(self).requests.append(('GET', self.path, dict(self.headers)))
+        repo = self.path[len('/repos/'):-len('/releases/latest')]
+        tag = self.releases.get(repo)
+        if tag:
+            self._reply(200, {'tag_name': tag, 'assets': [{'name': f'{repo}-linux.tar.gz',
+                                                           'browser_download_url': 'http://x/a', 'size': 1}]})
+        else:
+            self._reply(404, {'message': 'Not Found'})
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        type(self).requests.append(('POST', self.path, dict(self.headers)))
+        if self.graphql_status != 200:
+            self._reply(self.graphql_status, {'message': 'Bad credentials'})
+            return
+        variables, data = request['variables'], {}
+        for alias in re.findall(r'(r\d+): repository', request['query']):
+            repo = f"{variables[alias + 'o']}/{variables[alias + 'n']}"
+            tag = self.releases.get(repo)
+            data[alias] = {'latestRelease': tag and {'tagName': tag}}
+        self._reply(200, {'data': data})
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestUpdateChecker(unittest.TestCase):
+    """Test --check-updates against a local stand-in for the GitHub API."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _GitHubHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        bin_dir = os.path.join(self._tmp.name, 'bin')
+        os.makedirs(bin_dir)
+        self.tools = []
+        # name -> (what --version prints, latest release tag)
+        for name, (output, tag) in {'current': ('current 1.4.0', 'v1.4.0'), 'stale': ('stale version 2.0.3', 'v2.1.0'),
+                                    'silent': ('usage: silent', 'v3.0'), 'unreleased': ('unreleased 0.1', None)}.items():
+            path = os.path.join(bin_dir, f'upd-{name}')
+            with open(path, 'w') as handle:
+                handle.write(f'#!/bin/sh\necho "{output}"\n')
+            os.chmod(path, 0o755)
+            self.tools.append(dlt.Tool(name, f'upd-{name}', dlt.InstallMethod.EGET, name, 'Test', 'Tests',
+                                       github_repo=f'owner/{name}'))
+            _GitHubHandler.releases[f'owner/{name}'] = tag
+        self.tools.append(dlt.Tool('absent', 'upd-absent', dlt.InstallMethod.EGET, 'absent', 'Test', 'Tests',
+                                   github_repo='owner/absent'))
+        _GitHubHandler.requests = []
+        _GitHubHandler.graphql_status = 200
+        for patcher in (patch.dict(os.environ, {'PATH': bin_dir}),
+                        patch.object(dlt, 'INSTALL_BIN_DIR', bin_dir),
+                        patch.object(dlt, 'CACHE_DIR', os.path.join(self._tmp.name, 'cache')),
+                        patch.object(dlt, 'GITHUB_API_URL', f'http://127.0.0.1:{self.server.server_address[1]}'),
+                        patch.object(dlt.ToolManager, 'get_tools_by_category', return_value={'Tests': self.tools}),
+                        patch.dict(dlt.ReleaseCache._memo, {}, clear=True),
+                        patch.dict(dlt.PathIndex._listings, {}, clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        dlt.PathIndex.invalidate()
+        dlt.DownloadManager.close_all()
+        self.addCleanup(dlt.DownloadManager.close_all)
+
+    def check(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            code = dlt.UpdateChecker.run()
+        return code, output.getvalue()
+
+    def assert_report(self, code, output):
+        self.assertEqual(code, 1)
+        self.assertIn('stale                2.0.3 → v2.1.0', output)
+        self.assertIn('silent               installed version unknown, latest is v3.0', output)
+        self.assertIn('unreleased           no release found for owner/unreleased', output)
+        self.assertNotIn('current ', output)
+        self.assertNotIn('absent', output)
+        self.assertIn('1 up to date, 1 with updates, 2 unknown', output)
+
+    def test_token_sends_one_graphql_request_for_every_repo(self):
+        rest_entry = {'tag_name': 'v2.0.3', 'etag': '"abc"', 'last_modified': None, 'fetched_at': 1.0,
+                      'assets': [{'name': 'stale-linux-amd64', 'browser_download_url': 'http://x/a',
+                                  'digest': 'sha256:' + '0' * 64}]}
+        dlt.ReleaseCache.store('owner/stale', dict(rest_entry))
+        with patch.dict(os.environ, {'GITHUB_TOKEN': 'secret'}):
+            code, output = self.check()
+        self.assert_report(code, output)
+        (method, path, headers), = _GitHubHandler.requests
+        self.assertEqual((method, path, headers['Authorization']), ('POST', '/graphql', 'Bearer secret'))
+        # Tags alone: REST entries (asset digests, ETag) in the release cache are left alone
+        self.assertEqual(dlt.ReleaseCache.load('owner/stale'), rest_entry)
+        self.assertIsNone(dlt.ReleaseCache.load('owner/current'))
+
+    def test_without_token_falls_back_to_rest(self):
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop('GITHUB_TOKEN', None)
+            code, output = self.check()
+        self.assert_report(code, output)
+        self.assertEqual(sorted(path for method, path, _ in _GitHubHandler.requests if method == 'GET'),
+                         [f'/repos/owner/{name}/releases/latest'
+                          for name in ('current', 'silent', 'stale', 'unreleased')])
+
+    def test_probed_version_outranks_the_manifest(self):
+        """The manifest's version is only a fallback for binaries that do not print one."""
+        state = {'stale': {'version': 'v2.1.0'}, 'current': {'version': 'v1.0.0'}, 'silent': {'version': 'v3.0'}}
+        with patch.object(dlt.StateManifest, 'load', return_value=state), patch.dict(os.environ, {}, clear=False):
+            os.environ.pop('GITHUB_TOKEN', None)
+            code, output = self.check()
+        self.assertEqual(code, 1)
+        self.assertIn('stale                2.0.3 → v2.1.0', output)
+        self.assertNotIn('current ', output)
+        self.assertNotIn('silent ', output)
+        self.assertIn('2 up to date, 1 with updates, 1 unknown', output)
+
+    def test_failed_graphql_query_falls_back_to_rest(self):
+        _GitHubHandler.graphql_status = 401
+        with patch.dict(os.environ, {'GITHUB_TOKEN': 'expired'}):
+            code, output = self.check()
+        self.assert_report(code, output)
+        self.assertEqual([method for method, _, _ in _GitHubHandler.requests].count('GET'), 4)
+
+
+class TestReleaseAssetResolver(unittest.TestCase):
+    """Test in-process release asset selection, verification and download."""
+
+    RIPGREP = ['ripgrep-14.1.0-aarch64-unknown-linux-gnu.tar.gz', 'ripgrep-14.1.0-aarch64-apple-darwin.tar.gz',
+               'ripgrep-14.1.0-x86_64-unknown-linux-musl.tar.gz', 'ripgrep-14.1.0-x86_64-unknown-linux-gnu.tar.gz',
+               'ripgrep-14.1.0-x86_64-unknown-linux-musl.tar.gz.sha256', 'ripgrep-14.1.0-i686-unknown-linux-gnu.tar.gz',
+               'ripgrep-14.1.0-x86_64-pc-windows-msvc.zip', 'ripgrep_14.1.0-1_amd64.deb',
+               'ripgrep-14.1.0-armv7-unknown-linux-gnueabihf.tar.gz']
+    LAZYGIT = ['checksums.txt', 'lazygit_0.40.2_Darwin_x86_64.tar.gz', 'lazygit_0.40.2_Linux_32-bit.tar.gz',
+               'lazygit_0.40.2_Linux_arm64.tar.gz', 'lazygit_0.40.2_Linux_armv6.tar.gz',
+               'lazygit_0.40.2_Linux_x86_64.tar.gz', 'lazygit_0.40.2_Windows_x86_64.zip']
+    BARE = ['tool-v2.0-linux-amd64', 'tool-v2.0-linux-amd64-debug', 'tool-v2.0-linux-386',
+            'tool-v2.0-linux-amd64.sbom.json', 'tool-v2.0-linux-x86_64.AppImage', 'tool-v2.0-darwin-amd64']
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.dest = os.path.join(self._tmp.name, 'spool')
+        os.makedirs(self.dest)
+        patcher = patch.object(dlt, 'CACHE_DIR', os.path.join(self._tmp.name, 'cache'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.served = {}
+        self.requested = []
+
+    @staticmethod
+    def assets(names):
+        return [{'name': name, 'browser_download_url': f'https://github.com/o/r/releases/download/v1/{name}'}
+                for name in names]
+
+    def pick(self, names, binary, arch):
+        asset = dlt.Installer.select_release_asset(self.assets(names), binary, arch)
+        return asset and asset['name']
+
+    def test_select_matches_os_arch_libc_and_archive_type(self):
+        self.assertEqual(self.pick(self.RIPGREP, 'rg', 'amd64'), 'ripgrep-14.1.0-x86_64-unknown-linux-musl.tar.gz')
+        self.assertEqual(self.pick(self.RIPGREP, 'rg', 'arm64'), 'ripgrep-14.1.0-aarch64-unknown-linux-gnu.tar.gz')
+        self.assertEqual(self.pick(self.RIPGREP, 'rg', '386'), 'ripgrep-14.1.0-i686-unknown-linux-gnu.tar.gz')
+        self.assertEqual(self.pick(self.RIPGREP, 'rg', 'arm'), 'ripgrep-14.1.0-armv7-unknown-linux-gnueabihf.tar.gz')
+        self.assertEqual(self.pick(self.LAZYGIT, 'lazygit', 'amd64'), 'lazygit_0.40.2_Linux_x86_64.tar.gz')
+        self.assertEqual(self.pick(self.LAZYGIT, 'lazygit', 'arm64'), 'lazygit_0.40.2_Linux_arm64.tar.gz')
+        self.assertEqual(self.pick(self.BARE, 'tool', 'amd64'), 'tool-v2.0-linux-amd64')
+        self.assertEqual(self.pick(self.BARE, 'tool', '386'), 'tool-v2.0-linux-386')
+        self.assertIsNone(self.pick(self.BARE, 'tool', 'arm64'))
+        # A multi-binary release: the asset named for the command wins
+        self.assertEqual(self.pick(['helper-linux-amd64.tar.gz', 'tool-linux-amd64.tar.gz'], 'tool', 'amd64'),
+                         'tool-linux-amd64.tar.gz')
+
+    def test_select_takes_tbz_and_a_lone_archless_linux_build(self):
+        btop = ['btop-x86_64-linux-musl.tbz', 'btop-aarch64-linux-musl.tbz', 'btop-i686-linux-musl.tbz']
+        self.assertEqual(self.pick(btop, 'btop', 'amd64'), 'btop-x86_64-linux-musl.tbz')
+        self.assertEqual(self.pick(['xplr-linux.tar.gz', 'xplr-macos.tar.gz'], 'xplr', 'amd64'), 'xplr-linux.tar.gz')
+        self.assertEqual(self.pick(['json-tui-1.4.0-Linux.tar.gz', 'json-tui-1.4.0-Windows.zip'], 'json-tui', 'arm64'),
+                         'json-tui-1.4.0-Linux.tar.gz')
+        # An arch-named build wins; arch-less builds are only the fallback
+        xplr = ['xplr-linux.tar.gz', 'xplr-linux-musl.tar.gz', 'xplr-linux-aarch64.tar.gz', 'xplr-macos.tar.gz']
+        self.assertEqual(self.pick(xplr, 'xplr', 'arm64'), 'xplr-linux-aarch64.tar.gz')
+        self.assertEqual(self.pick(xplr, 'xplr', 'amd64'), 'xplr-linux-musl.tar.gz')
+
+    def fake_fetch(self, url, dest=None, headers=None, max_time=None, resume=False):
+        self.requested.append(url)
+        if url not in self.served:
+            return dlt.DownloadResult(url, status=404)
+        data = self.served[url]
+        with open(dest, 'wb') as handle:
+            handle.write(data)
+        return dlt.DownloadResult(url, status=200, size=len(data), digest=hashlib.sha256(data).hexdigest(), path=dest)
+
+    def serve(self, name, data):
+        self.served[f'https://github.com/o/r/releases/download/v1/{name}'] = data
+
+    def fetch(self, assets, binary='tool'):
+        with patch.object(dlt.Installer, 'fetch_latest_release_assets', return_value=('v1', assets)), \
+                patch.object(dlt.DownloadManager, 'fetch', side_effect=self.fake_fetch), \
+                patch.object(dlt.Installer, 'open_url_stream',
+                             side_effect=lambda url: (io.BytesIO(self.served[url]), lambda: True)), \
+                patch.object(dlt.Installer, 'linux_goarch', return_value='amd64'), patch('builtins.print'):
+            return dlt.Installer.fetch_release_binary('o/r', binary, self.dest)
+
+    def test_bare_binary_verified_against_checksums_list(self):
+        binary = b'\x7fELF tool'
+        self.serve('tool-v2.0-linux-amd64', binary)
+        self.serve('checksums.txt', f'{hashlib.sha256(binary).hexdigest()}  tool-v2.0-linux-amd64\n'.encode())
+        path = self.fetch(self.assets(self.BARE + ['checksums.txt']))
+        self.assertEqual(path, os.path.join(self.dest, 'tool'))
+        with open(path, 'rb') as handle:
+            self.assertEqual(handle.read(), binary)
+
+        self.serve('tool-v2.0-linux-amd64', b'\x7fELF tampered')
+        shutil.rmtree(dlt.CACHE_DIR, ignore_errors=True)
+        self.assertIsNone(self.fetch(self.assets(self.BARE + ['checksums.txt'])))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, 'tool')))
+
+    def test_archive_member_extracted_using_github_digest(self):
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode='w:gz') as tar:
+            info = tarfile.TarInfo('tool-v2/tool')
+            info.size = len(b'\x7fELF tool')
+            tar.addfile(info, io.BytesIO(b'\x7fELF tool'))
+        self.serve('tool-linux-amd64.tar.gz', buf.getvalue())
+        assets = self.assets(['tool-linux-amd64.tar.gz'])
+        assets[0]['digest'] = 'sha256:' + hashlib.sha256(buf.getvalue()).hexdigest()
+        self.assertEqual(self.fetch(assets), os.path.join(self.dest, 'tool'))
+        self.assertEqual(self.requested, [])  # Streamed; no checksum file needed
+
+        assets[0]['digest'] = 'sha256:' + '0' * 64
+        shutil.rmtree(dlt.CACHE_DIR, ignore_errors=True)
+        self.assertIsNone(self.fetch(assets))
+
+    def test_published_checksum_that_cannot_be_fetched_blocks_the_install(self):
+        self.serve('tool-v2.0-linux-amd64', b'\x7fELF tool')
+        self.assertIsNone(self.fetch(self.assets(self.BARE + ['tool-v2.0-linux-amd64.sha256'])))
+        self.assertNotIn('https://github.com/o/r/releases/download/v1/tool-v2.0-linux-amd64', self.requested)
+
+    @staticmethod
+    def tarball(mode, members):
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode=mode) as tar:
+            for name, data in members:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        return buf.getvalue()
+
+    def fetch_archive(self, name, data):
+        self.serve(name, data)
+        assets = self.assets([name])
+        assets[0]['digest'] = 'sha256:' + hashlib.sha256(data).hexdigest()
+        path = self.fetch(assets)
+        if path:
+            with open(path, 'rb') as handle:
+                return handle.read()
+
+    def test_xz_and_zip_archives(self):
+        members = [('tool-v2/README.md', b'docs'), ('tool-v2/tool', b'\x7fELF tool'), ('tool-v2/extra', b'x' * 4096)]
+        self.assertEqual(self.fetch_archive('tool-linux-amd64.tar.xz', self.tarball('w:xz', members)), b'\x7fELF tool')
+        os.unlink(os.path.join(self.dest, 'tool'))
+        self.assertEqual(self.fetch_archive('tool-linux-amd64.tbz', self.tarball('w:bz2', members)), b'\x7fELF tool')
+
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as archive:
+            link = zipfile.ZipInfo('docs/tool')
+            link.external_attr = (0o120777 << 16)
+            archive.writestr(link, 'tool-v2/tool')  # A symlink is never taken for the binary
+            for name, data in members:
+                archive.writestr(name, data)
+        self.assertEqual(self.fetch_archive('tool-linux-amd64.zip', buf.getvalue()), b'\x7fELF tool')
+        self.assertEqual(os.listdir(self.dest), ['tool'])  # The downloaded zip itself is gone
+
+        bad = self.assets(['tool-linux-amd64.zip'])
+        bad[0]['digest'] = 'sha256:' + '0' * 64
+        shutil.rmtree(dlt.CACHE_DIR, ignore_errors=True)
+        os.unlink(os.path.join(self.dest, 'tool'))
+        self.assertIsNone(self.fetch(bad))
+        self.assertEqual(os.listdir(self.dest), [])
+
+    def test_zstd_archives_need_a_zstd_module(self):
+        names = ['tool-linux-amd64.zip', 'tool-linux-amd64.tar.zst', 'tool-linux-amd64.tar.xz']
+        with patch.object(dlt.Installer, '_zstd', False):
+            self.assertEqual(dlt.Installer.archive_suffix('tool-linux-amd64.tar.zst'), '')
+            self.assertIsNone(self.pick(['tool-linux-amd64.tar.zst'], 'tool', 'amd64'))
+        # Same build in several formats: .tar.gz first, then by name
+        self.assertEqual(self.pick(names + ['tool-linux-amd64.tar.gz'], 'tool', 'amd64'), 'tool-linux-amd64.tar.gz')
+        self.assertEqual(self.pick(names, 'tool', 'amd64'), 'tool-linux-amd64.tar.xz')
+
+        # A stand-in decompressor that passes bytes through exercises the zst wiring
+        passthrough = types.SimpleNamespace(
+            __name__='zstandard', ZstdError=ValueError,
+            ZstdDecompressor=lambda: types.SimpleNamespace(stream_reader=lambda source, read_across_frames: source))
+        with patch.object(dlt.Installer, '_zstd', passthrough):
+            self.assertEqual(self.pick(['tool-linux-amd64.tar.zst'], 'tool', 'amd64'), 'tool-linux-amd64.tar.zst')
+            data = self.tarball('w', [('tool', b'\x7fELF tool')])
+            self.assertEqual(self.fetch_archive('tool-linux-amd64.tar.zst', data), b'\x7fELF tool')
+
+
+class TestFleet(unittest.TestCase):
+    """Test --fleet fan-out."""
+
+    # Stands in for the installer on each "host": reports counters, or fails on host "bad"
+    SCRIPT = b"""
+import json, os, sys, time
+host = os.environ["LAZY_FLEET_HOST"]
+time.sleep(0.4)
+if host == "bad":
+    print("sudo: a password is required")
+    sys.exit(1)
+print("argv", sys.argv[1:])
+print("LAZY-FLEET-REPORT " + json.dumps({"installed": 2, "skipped": 5, "failed": 0}))
+"""
+
+    def test_read_inventory_skips_comments_and_duplicates(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as handle:
+            handle.write("# web tier\nweb1\nadmin@web2  # primary\n\nweb1\n")
+        self.addCleanup(os.unlink, handle.name)
+        self.assertEqual(dlt.Fleet.read_inventory(handle.name), ['web1', 'admin@web2'])
+
+    def test_ssh_transport_quotes_remote_command(self):
+        """The script goes over stdin; the remote argv is shell-quoted and ssh never prompts."""
+        cmd = dlt.SshTransport(('-p', '2222')).command('web1', ['--yes', 'a b'])
+        self.assertEqual(cmd, ['ssh', '-o', 'BatchMode=yes', '-p', '2222', 'web1', "python3 - --yes 'a b'"])
+
+    def test_transport_without_command_cannot_be_created(self):
+        """A transport missing command() fails when built, not halfway through a fleet run."""
+        class Incomplete(dlt.Transport):
+            name = "incomplete"
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_worker_args_forward_plan_options(self):
+        with patch.object(sys, 'argv', ['x', '--fleet', 'hosts', '--server', '--dry-run', '-j', '2']):
+            args = dlt.parse_arguments()
+        argv = dlt.Fleet.worker_args(args)
+        self.assertEqual(argv[:2], ['--yes', '--fleet-report'])
+        self.assertIn('--server', argv)
+        self.assertIn('--dry-run', argv)
+        self.assertEqual(argv[argv.index('--jobs') + 1], '2')
+        self.assertNotIn('--fleet', argv)
+
+    def test_run_is_bounded_parallel_and_aggregates_counters(self):
+        """Six 0.4s hosts, three at a time, take about two rounds; results keep inventory order."""
+        hosts = ['h1', 'h2', 'bad', 'h4', 'h5', 'h6']
+        start = time.monotonic()
+        with patch('builtins.print'):
+            results = dlt.Fleet.run(hosts, dlt.LocalTransport(), ['--yes'], self.SCRIPT, parallelism=3)
+        self.assertLess(time.monotonic() - start, 6 * 0.4)
+        self.assertEqual([result.host for result in results], hosts)
+        self.assertEqual([result.ok for result in results], [True, True, False, True, True, True])
+        self.assertEqual(sum(result.installed for result in results), 10)
+        bad = results[2]
+        self.assertIn('without a report', bad.error)
+        self.assertIn('password is required', bad.output)
+        self.assertIn("['--yes']", results[0].output)
+
+    @patch.object(dlt.Fleet, 'run')
+    def test_main_fleet_mode_exits_nonzero_when_a_host_fails(self, mock_run):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as handle:
+            handle.write("web1\nweb2\n")
+        self.addCleanup(os.unlink, handle.name)
+        mock_run.return_value = [dlt.HostResult('web1', installed=1),
+                                 dlt.HostResult('web2', error='exited 255 without a report')]
+        with patch.object(sys, 'argv', ['x', '--fleet', handle.name, '--yes', '--transport', 'local']), \
+                patch('builtins.print'), self.assertRaises(SystemExit) as exit_:
+            dlt.main()
+        self.assertEqual(exit_.exception.code, 1)
+        hosts, transport, argv = mock_run.call_args[0][:3]
+        self.assertEqual(hosts, ['web1', 'web2'])
+        self.assertIsInstance(transport, dlt.LocalTransport)
+        self.assertIn('--fleet-report', argv)
+
+
+class TestStreamingExtract(unittest.TestCase):
+    """Test the download -> hash -> extract pipeline."""
+
+    URL = 'https://github.com/schollz/croc/releases/download/v10/croc_v10_Linux-64bit.tar.gz'
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.dest = os.path.join(self._tmp.name, 'spool')
+        os.makedirs(self.dest)
+        patcher = patch.object(dlt, 'CACHE_DIR', os.path.join(self._tmp.name, 'cache'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode='w:gz') as tar:
+            for name, data in (('croc_v10/LICENSE', b'MIT'), ('croc_v10/croc', b'\x7fELF binary'),
+                               ('croc_v10/README.md', b'x' * 50000)):
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        self.archive = buf.getvalue()
+        self.digest = hashlib.sha256(self.archive).hexdigest()
+
+    def _serve(self, data):
+        return patch.object(dlt.Installer, 'open_url_stream',
+                            return_value=(io.BytesIO(data), lambda: True))
+
+    def test_member_extracted_and_archive_cached_in_one_pass(self):
+        """The wanted member lands in the spool dir; the archive goes only to the cache."""
+        with self._serve(self.archive) as mock_open:
+            path = dlt.Installer.fetch_archive_member(self.URL, 'croc.tar.gz', 'croc', self.dest,
+                                                      sha256=self.digest)
+        mock_open.assert_called_once_with(self.URL)
+        self.assertEqual(path, os.path.join(self.dest, 'croc'))
+        with open(path, 'rb') as handle:
+            self.assertEqual(handle.read(), b'\x7fELF binary')
+        self.assertEqual(os.listdir(self.dest), ['croc'])
+        self.assertEqual(dlt.ArtifactCache.lookup(url=self.URL), dlt.ArtifactCache.blob_path(self.digest))
+
+    def test_checksum_mismatch_leaves_nothing_behind(self):
+        """A wrong digest yields no file to install and nothing in the cache."""
+        with self._serve(self.archive), patch('builtins.print'):
+            path = dlt.Installer.fetch_archive_member(self.URL, 'croc.tar.gz', 'croc', self.dest,
+                                                      sha256='0' * 64)
+        self.assertIsNone(path)
+        self.assertEqual(os.listdir(self.dest), [])
+        self.assertIsNone(dlt.ArtifactCache.lookup(url=self.URL))
+
+    def test_cached_archive_needs_no_download(self):
+        """A cached archive streams from disk, verified by its content address."""
+        with self._serve(self.archive):
+            dlt.Installer.fetch_archive_member(self.URL, 'croc.tar.gz', 'croc', self.dest, sha256=self.digest)
+        os.unlink(os.path.join(self.dest, 'croc'))
+        with patch.object(dlt.Installer, 'open_url_stream') as mock_open, patch('builtins.print'):
+            path = dlt.Installer.fetch_archive_member(self.URL, 'croc.tar.gz', 'croc', self.dest,
+                                                      sha256=self.digest)
+        mock_open.assert_not_called()
+        self.assertTrue(os.path.isfile(path))
+
+    def test_missing_member_reports_failure(self):
+        """An archive without the binary returns None but is still cached."""
+        with self._serve(self.archive), patch('builtins.print'):
+            path = dlt.Installer.fetch_archive_member(self.URL, 'croc.tar.gz', 'crocodile', self.dest)
+        self.assertIsNone(path)
+        self.assertIsNotNone(dlt.ArtifactCache.lookup(url=self.URL))
+
+
+class TestUpdatePackageLists(unittest.TestCase):
+    """Test the freshness-aware apt-get update stage."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.index = os.path.join(self._tmp.name, 'deb.debian.org_debian_dists_bookworm_main_binary-amd64_Packages')
+        with open(self.index, 'w') as handle:
+            handle.write('Package: vim\n')
+        patcher = patch.object(dlt, 'APT_LISTS_DIR', self._tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch.object(dlt.Installer, 'run_command')
+    def test_fresh_lists_skip_update(self, mock_run):
+        """Lists younger than max_age are trusted as-is."""
+        with patch('builtins.print'):
+            self.assertTrue(dlt.update_package_lists(max_age=3600))
+        mock_run.assert_not_called()
+
+    @patch.object(dlt.Installer, 'run_command')
+    def test_stale_lists_are_refreshed(self, mock_run):
+        """Lists older than max_age trigger apt-get update."""
+        old = time.time() - 7200
+        os.utime(self.index, (old, old))
+        mock_run.return_value = subprocess.CompletedProcess(['sudo'], 0)
+        with patch('builtins.print'):
+            self.assertTrue(dlt.update_package_lists(max_age=3600))
+        self.assertEqual(mock_run.call_args[0][0], ['sudo', 'apt-get', 'update'])
+
+    @patch.object(dlt.Installer, 'run_command')
+    def test_force_and_zero_max_age_always_update(self, mock_run):
+        """force=True and max_age=0 both bypass the freshness check."""
+        mock_run.return_value = subprocess.CompletedProcess(['sudo'], 0)
+        with patch('builtins.print'):
+            dlt.update_package_lists(max_age=3600, force=True)
+            dlt.update_package_lists(max_age=0)
+        self.assertEqual(mock_run.call_count, 2)
+
+    def test_missing_lists_have_no_age(self):
+        """No index files means unknown age, which is never fresh."""
+        os.unlink(self.index)
+        self.assertIsNone(dlt.apt_lists_age())
+        self.assertFalse(dlt.apt_lists_fresh(3600))
+
+
 class TestMainFunction(unittest.TestCase):
     """Test main function logic - simplified to avoid infinite loops and real execution."""
 
@@ -599,6 +2530,115 @@ class TestMainFunction(unittest.TestCase):
         # Should call input once for final "Press Enter"
         self.assertEqual(mock_input.call_count, 1)
 
+    @patch('builtins.input')
+    @patch.object(dlt, 'get_user_consent')
+    @patch.object(dlt.SystemChecker, 'check_system', return_value=(True, None))
+    @patch.object(dlt.ToolManager, 'get_tools_by_category', return_value={})
+    @patch('builtins.print')
+    def test_main_fleet_worker_is_non_interactive_and_reports(self, mock_print, mock_categories, mock_check,
+                                                              mock_consent, mock_input):
+        """--yes skips both prompts; --fleet-report ends with the counters for the controller."""
+        with patch.object(sys, 'argv', ['x', '--yes', '--fleet-report']), self.assertRaises(SystemExit):
+            dlt.main()
+        mock_consent.assert_not_called()
+        mock_input.assert_not_called()
+        last = mock_print.call_args_list[-1][0][0]
+        self.assertEqual(dlt.Fleet.parse_report(last), {'installed': 0, 'skipped': 0, 'failed': 0})
+
+    @patch('builtins.input', return_value='')
+    @patch.object(dlt, 'update_package_lists', return_value=True)
+    @patch.object(dlt, 'get_user_consent', return_value=True)
+    @patch.object(dlt.SystemChecker, 'check_system', return_value=(True, None))
+    @patch.object(dlt.ToolManager, 'check_tool_installed', return_value=False)
+    @patch.object(dlt.Installer, 'resolve_apt_packages', return_value={})
+    @patch.object(dlt.ToolManager, 'install_apt_tools')
+    @patch.object(dlt.ToolManager, 'install_pip_tools')
+    @patch.object(dlt.ToolManager, 'install_tool', return_value=True)
+    @patch('builtins.print')
+    def test_main_routes_apt_tools_through_one_batch(self, mock_print, mock_install, mock_pip_tools,
+                                                     mock_apt_tools, mock_resolve, *_):
+        """APT and PIP tools are installed as one batch each; other methods keep their own path."""
+        vim, glances, code = (dlt.ToolManager.TOOLS[name] for name in ('vim', 'glances', 'code'))
+        mock_apt_tools.return_value = {'vim': True}
+        mock_pip_tools.return_value = {'glances': True}
+        with patch.object(dlt.ToolManager, 'get_tools_by_category',
+                          return_value={'Mixed': [vim, glances, code]}), \
+             patch.object(dlt.Installer, 'ensure_venv', return_value=True), \
+             patch('sys.exit', side_effect=SystemExit(0)):
+            with self.assertRaises(SystemExit):
+                dlt.main()
+        mock_apt_tools.assert_called_once_with([vim], dry_run=False)
+        mock_pip_tools.assert_called_once_with([glances], dry_run=False)
+        mock_install.assert_called_once_with(code, dry_run=False)
+        mock_resolve.assert_called_once_with(['vim'])
+
+    def _run_main(self, tools, argv=()):
+        with patch.object(sys, 'argv', ['Lazy-Linux-Tool-Installer.py', *argv]), \
+             patch.object(dlt.ToolManager, 'get_tools_by_category', return_value={'T': tools}), \
+             patch('sys.exit', side_effect=SystemExit(0)):
+            with self.assertRaises(SystemExit):
+                dlt.main()
+
+    @patch('builtins.input', return_value='')
+    @patch.object(dlt, 'update_package_lists', return_value=True)
+    @patch.object(dlt, 'get_user_consent', return_value=True)
+    @patch.object(dlt.SystemChecker, 'check_system', return_value=(True, None))
+    @patch.object(dlt.ToolManager, 'check_tool_installed', return_value=False)
+    @patch.object(dlt.ToolManager, 'install_pip_tools', return_value={'glances': True})
+    @patch.object(dlt.Installer, 'ensure_venv', return_value=True)
+    @patch('builtins.print')
+    def test_main_skips_update_when_nothing_missing_uses_apt(self, mock_print, mock_venv, mock_install,
+                                                             mock_installed, mock_sys, mock_consent,
+                                                             mock_update, mock_input):
+        """A pip-only shortfall never pays for apt-get update."""
+        self._run_main([dlt.ToolManager.TOOLS['glances']])
+        mock_update.assert_not_called()
+
+    @patch('builtins.input', return_value='')
+    @patch.object(dlt, 'update_package_lists', return_value=True)
+    @patch.object(dlt, 'get_user_consent', return_value=True)
+    @patch.object(dlt.SystemChecker, 'check_system', return_value=(True, None))
+    @patch.object(dlt.ToolManager, 'check_tool_installed', return_value=False)
+    @patch.object(dlt.ToolManager, 'install_apt_tools', return_value={'vim': True})
+    @patch.object(dlt.Installer, 'resolve_apt_packages')
+    @patch('builtins.print')
+    def test_main_lazy_update_runs_only_on_a_miss(self, mock_print, mock_resolve, *mocks):
+        """--lazy-update refreshes once, after a package fails to resolve."""
+        mock_update = mocks[-2]
+        mock_resolve.side_effect = [{'vim': None}, {'vim': '2:9.0'}]
+        self._run_main([dlt.ToolManager.TOOLS['vim']], ['--lazy-update'])
+        mock_update.assert_called_once_with(force=True)
+        self.assertEqual(mock_resolve.call_count, 2)
+
+    @patch('builtins.input', return_value='')
+    @patch.object(dlt, 'get_user_consent', return_value=True)
+    @patch.object(dlt.SystemChecker, 'check_system', return_value=(True, None))
+    @patch.object(dlt.ToolManager, 'check_tool_installed', return_value=False)
+    @patch.object(dlt.Installer, 'acquire_sudo', return_value=False)
+    @patch.object(dlt.InstallEngine, 'run')
+    @patch('builtins.print')
+    def test_main_parallel_install_stops_without_sudo(self, mock_print, mock_engine, *_):
+        """No worker starts when sudo could not be unlocked up front."""
+        tools = {'T': [dlt.ToolManager.TOOLS['lf']]}
+        with patch.object(sys, 'argv', ['Lazy-Linux-Tool-Installer.py']), \
+                patch.object(dlt.ToolManager, 'get_tools_by_category', return_value=tools), \
+                self.assertRaises(SystemExit) as exit_:
+            dlt.main()
+        self.assertEqual(exit_.exception.code, 1)
+        mock_engine.assert_not_called()
+
+    @patch.object(dlt.SystemChecker, 'check_system')
+    def test_main_rejects_missing_spool_dir(self, mock_system):
+        """A bad --spool-dir stops the run with a message instead of a traceback mid-install."""
+        missing = os.path.join(os.devnull, 'spool')
+        stderr = io.StringIO()
+        with patch.object(sys, 'argv', ['x', '--spool-dir', missing, '--yes']), \
+                contextlib.redirect_stderr(stderr), self.assertRaises(SystemExit) as exit_:
+            dlt.main()
+        self.assertEqual(exit_.exception.code, 1)
+        self.assertIn('--spool-dir', stderr.getvalue())
+        mock_system.assert_not_called()
+
 
 @unittest.skipUnless(
     os.environ.get("LINUX_TOOLS_NETWORK_TESTS") == "1",
@@ -607,29 +2647,17 @@ class TestMainFunction(unittest.TestCase):
 class TestEgetToolsResolveUpstream(unittest.TestCase):
     """Ask GitHub whether every eget tool can still actually be fetched.
 
-    The mocked tests above prove the installer calls eget correctly. They
-    cannot prove eget will find anything at the other end, and that is the
-    failure that reached users: neoss stopped attaching release assets when it
-    moved to npm, and eg never cut a GitHub release at all. Both were declared
-    as eget tools for a long time, and both failed only at install time on a
-    real machine.
+    The mocked tests above prove the installer picks and verifies release
+    assets correctly. They cannot prove there is anything to pick at the
+    other end, and that is the failure that reached users: neoss stopped
+    attaching release assets when it moved to npm, and eg never cut a
+    GitHub release at all. Both were declared as eget tools for a long
+    time, and both failed only at install time on a real machine.
 
     This test is off by default because it needs the network and spends
     GitHub's unauthenticated rate limit. Set GITHUB_TOKEN to raise that limit.
     """
 
-    # Files that mention Linux but are not something eget can install: update
-    # manifests, checksums, signatures, and distro packages it will not unpack.
-    NON_BINARY_SUFFIXES = (
-        ".yml", ".yaml", ".json", ".txt", ".md", ".sha256", ".sha256sum",
-        ".sig", ".asc", ".pem", ".sbom", ".deb", ".rpm",
-    )
-
-    @classmethod
-    def _usable_linux_asset(cls, asset_name: str) -> bool:
-        lowered = asset_name.lower()
-        return "linux" in lowered and not lowered.endswith(cls.NON_BINARY_SUFFIXES)
-
     def _get(self, url: str) -> dict:
         headers = {
             "User-Agent": "Linux-Tools-test",
@@ -662,15 +2690,17 @@ class TestEgetToolsResolveUpstream(unittest.TestCase):
 
     def test_every_eget_tool_resolves_to_a_downloadable_asset(self):
         eget_tools = {
-            name: tool.github_repo
+            name: tool
             for name, tool in dlt.ToolManager.TOOLS.items()
             if tool.method == dlt.InstallMethod.EGET
         }
+        arch = dlt.Installer.linux_goarch() or "amd64"
         self.assertTrue(eget_tools, "expected the installer to define eget tools")
         self._require_api_budget(len(eget_tools))
 
         failures = []
-        for name, repo in sorted(eget_tools.items()):
+        for name, tool in sorted(eget_tools.items()):
+            repo = tool.github_repo
             try:
                 release = self._get(
                     f"https://api.github.com/repos/{repo}/releases/latest"
@@ -683,17 +2713,18 @@ class TestEgetToolsResolveUpstream(unittest.TestCase):
                     )
                 failures.append(
                     f"{name}: no published release at {repo} (HTTP {error.code}), "
-                    f"so eget has nothing to download"
+                    f"so there is nothing to download"
                 )
                 continue
             except urllib.error.URLError as error:
                 raise unittest.SkipTest(f"network unavailable: {error.reason}")
 
-            assets = [asset["name"] for asset in release.get("assets", [])]
-            if not [a for a in assets if self._usable_linux_asset(a)]:
+            assets = release.get("assets", [])
+            if not dlt.Installer.select_release_asset(assets, tool.command, arch):
+                names = [asset["name"] for asset in assets]
                 failures.append(
                     f"{name}: {repo} release {release.get('tag_name')!r} publishes "
-                    f"no Linux binary eget can install (assets: {assets or 'none'})"
+                    f"no linux/{arch} binary the installer can use (assets: {names or 'none'})"
                 )
 
         self.assertEqual(